@@ -14,6 +14,10 @@ const isAdminUser = (user: User | null): boolean => {
   return user.role?.toUpperCase() === 'ADMIN';
 };
 
+// How often restaurant status and orders are re-fetched when the server does not stream them
+const STATUS_POLL_INTERVAL_MS = 30000;
+const ORDERS_POLL_INTERVAL_MS = 30000;
+
 const App: React.FC = () => {
   const [currentUser, setCurrentUser] = useState<User | null>(null);
   const [view, setView] = useState<'menu' | 'login' | 'cart' | 'admin' | 'orders'>('menu');
@@ -22,6 +26,7 @@ const App: React.FC = () => {
   const [orders, setOrders] = useState<Order[]>([]);
   const [restaurantStatus, setRestaurantStatus] = useState<RestaurantStatus>({ isOpen: true });
   const [loading, setLoading] = useState(true);
+  const [liveUpdates, setLiveUpdates] = useState(false);
 
   // Load initial data from backend
   useEffect(() => {
@@ -47,6 +52,32 @@ const App: React.FC = () => {
     loadData();
   }, [currentUser?.role]);
 
+  // Stream live updates only if the server says streams are cheap there
+  useEffect(() => {
+    db.supportsLiveUpdates().then(setLiveUpdates);
+  }, []);
+
+  // Keep restaurant status current: pushed over SSE when available, polled otherwise
+  useEffect(() => {
+    if (liveUpdates) return db.subscribeRestaurantStatus(setRestaurantStatus);
+    const timer = setInterval(async () => setRestaurantStatus(await db.getRestaurantStatus()), STATUS_POLL_INTERVAL_MS);
+    return () => clearInterval(timer);
+  }, [liveUpdates]);
+
+  // Apply order changes as they happen when the server streams them; poll the list otherwise
+  useEffect(() => {
+    if (!currentUser) return;
+    if (!liveUpdates) {
+      const timer = setInterval(async () => setOrders(await db.getOrders()), ORDERS_POLL_INTERVAL_MS);
+      return () => clearInterval(timer);
+    }
+    return db.subscribeOrders({
+      onCreated: (order) => setOrders(prev => prev.some(o => o.id === order.id) ? prev : [order, ...prev]),
+      onStatus: (orderId, status) => setOrders(prev => prev.map(o => o.id === orderId ? { ...o, status } : o)),
+      onReset: async () => setOrders(await db.getOrders()),
+    });
+  }, [currentUser?.id, currentUser?.role, liveUpdates]);
+
   // Handle restaurant status toggle (admin only)
   const handleToggleStatus = async () => {
     const newStatus = {
@@ -100,16 +131,15 @@ const App: React.FC = () => {
     };
 
     await db.saveOrder(newOrder);
-    const fetchedOrders = await db.getOrders();
-    setOrders(fetchedOrders);
+    // The event stream may be served by another worker, so don't wait for its 'created' event
+    setOrders(await db.getOrders());
     setCart([]);
     setView('orders');
   };
 
   const updateOrderStatus = async (orderId: string, status: OrderStatus) => {
     await db.updateOrderStatus(orderId, status);
-    const fetchedOrders = await db.getOrders();
-    setOrders(fetchedOrders);
+    setOrders(prev => prev.map(o => o.id === orderId ? { ...o, status } : o));
   };
 
   const handleUpdateMenuItems = async (items: MenuItem[]) => {
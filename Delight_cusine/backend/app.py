@@ -8,14 +8,23 @@ from dotenv import load_dotenv
 load_dotenv()
 import os
 
-from extensions.db import db
+from extensions.cache import cache
+from extensions.compression import compression
+from extensions.db import db, init_engine_events
+from extensions.events import events
+from extensions.instrumentation import instrumentation
 from extensions.jwt import jwt
+from extensions.rate_limit import limiter
+from routes.analytics_routes import analytics_bp
 from routes.auth_routes import auth_bp
 from routes.menu_routes import menu_bp
 from routes.order_routes import order_bp
 from routes.restaurant_routes import restaurant_bp
 from config.config import Config
-from seed_data import seed_menu_items  # Import seed function
+from migrations import check_schema
+from migrations.cli import db_cli
+from seed_data import seed_command
+from services.sales_analytics import analytics_cli
 
 # Load environment variables
 
@@ -38,31 +47,43 @@ def create_app(config_class=Config):
         r"/api/*": {
             "origins": "*",
             "methods": ["GET", "POST", "PUT", "DELETE", "OPTIONS", "PATCH"],
-            "allow_headers": ["Content-Type", "Authorization"]
+            "allow_headers": ["Content-Type", "Authorization", "If-None-Match", "Last-Event-ID", "Idempotency-Key"],
+            "expose_headers": ["ETag", "Server-Timing", "Idempotent-Replayed"]
         }
     })
 
     # Initialize extensions
     db.init_app(app)
     jwt.init_app(app)
+    cache.init_app(app)
+    events.init_app(app)
+    instrumentation.init_app(app)
+    limiter.init_app(app)
+    compression.init_app(app)
 
     # Register blueprints
     app.register_blueprint(auth_bp, url_prefix='/api/auth')
     app.register_blueprint(menu_bp, url_prefix='/api/menu')
     app.register_blueprint(order_bp, url_prefix='/api/orders')
     app.register_blueprint(restaurant_bp, url_prefix='/api/restaurant')
+    app.register_blueprint(analytics_bp, url_prefix='/api/analytics')
+
+    # Register CLI commands (flask db ..., flask seed, flask analytics ...)
+    app.cli.add_command(db_cli)
+    app.cli.add_command(seed_command)
+    app.cli.add_command(analytics_cli)
 
-    # Create database tables and seed menu items
     with app.app_context():
-        db.create_all()
-        seed_menu_items()  # Seed menu items automatically
-        print("✓ Database tables created")
-        print("💡 To create an admin user, run: python create_admin.py")
+        init_engine_events(app)
+
+        # Fast start does no database I/O; otherwise verify the schema version
+        if not app.config['FAST_START']:
+            check_schema(app)
 
     @app.route('/api/health', methods=['GET'])
     def health_check():
-        """Health check endpoint"""
-        return {'status': 'healthy', 'service': 'Delight Cuisine API'}, 200
+        """Health check endpoint; 'sse' tells clients whether to stream or poll"""
+        return {'status': 'healthy', 'service': 'Delight Cuisine API', 'sse': app.config['SSE_ENABLED']}, 200
 
     return app
 
@@ -0,0 +1,58 @@
+"""
+Delight Cuisine - ASGI entry point
+Serves the Flask application under an ASGI server (uvicorn)
+
+    uvicorn --factory asgi:create_asgi_app --host 0.0.0.0 --port 5000
+
+The Server-Sent Event streams are native async handlers (routes.async_routes)
+using the async database engine; every other request runs the blueprints on
+the bridge's thread pool (utils.asgi_bridge).
+"""
+from app import create_app
+from config.config import Config
+from extensions.async_db import async_db
+from routes.async_routes import ROUTES
+from utils.asgi_bridge import WSGIBridge
+
+
+def create_asgi_app(config_class=Config):
+    """
+    ASGI application factory
+
+    Args:
+        config_class: Configuration class to use
+
+    Returns:
+        ASGI application callable
+    """
+    flask_app = create_app(config_class)
+    # Streams are served on the event loop and hold no thread, so clients may use them
+    flask_app.config['SSE_ENABLED'] = True
+    async_db.init_app(flask_app)
+    bridge = WSGIBridge(flask_app, flask_app.config['ASGI_WSGI_THREADS'], flask_app.config['ASGI_MAX_BODY_SIZE'])
+
+    async def lifespan(receive, send):
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                bridge.shutdown()
+                await async_db.dispose()
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+
+    async def application(scope, receive, send):
+        if scope['type'] == 'lifespan':
+            await lifespan(receive, send)
+            return
+        if scope['type'] != 'http':
+            return  # no websocket endpoints
+
+        handler = ROUTES.get((scope['method'], scope['path']))
+        if handler is not None:
+            await handler(bridge, scope, receive, send)
+        else:
+            await bridge(scope, receive, send)
+
+    return application
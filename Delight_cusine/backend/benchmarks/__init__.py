@@ -0,0 +1,7 @@
+"""
+Benchmarks package
+Reproducible performance checks for the Delight Cuisine API
+
+Run from the backend directory, e.g.:
+    python -m benchmarks.order_queries
+"""
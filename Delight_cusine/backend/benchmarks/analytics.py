@@ -0,0 +1,114 @@
+"""
+Sales analytics benchmark
+Date-range reports from the daily rollups vs. the same aggregates computed
+ad hoc over orders/order_items, plus the rollup backfill time. Also checks
+that both give the same numbers.
+
+Usage:
+    python -m benchmarks.analytics [--orders 100000]
+"""
+import argparse
+import random
+import time
+from datetime import datetime, timedelta
+from sqlalchemy import func, insert, select
+from benchmarks.common import create_benchmark_app, create_menu_items, create_user
+from extensions.db import db
+from models.order import Order, OrderItem
+from services import sales_analytics
+
+DAYS = 365
+ITEMS_PER_ORDER = 3
+STATUSES = ['DELIVERED'] * 8 + ['CANCELLED', 'PLACED']
+ROUNDS = 5
+
+
+def seed_history(user_id, menu_item_ids, count):
+    """Bulk-insert `count` orders spread over the last DAYS days"""
+    rng = random.Random(1)
+    now = datetime.utcnow()
+    for start in range(0, count, 5000):
+        orders, lines = [], []
+        for order_id in range(start + 1, min(start + 5000, count) + 1):
+            created_at = now - timedelta(minutes=rng.randrange(DAYS * 24 * 60))
+            picked = [(rng.choice(menu_item_ids), rng.randint(1, 3), 5.0 + rng.randrange(20))
+                      for _ in range(ITEMS_PER_ORDER)]
+            orders.append({'id': order_id, 'user_id': user_id, 'status': rng.choice(STATUSES),
+                           'total_amount': sum(q * p for _, q, p in picked),
+                           'created_at': created_at, 'updated_at': created_at})
+            lines += [{'order_id': order_id, 'menu_item_id': m, 'quantity': q, 'price': p} for m, q, p in picked]
+        db.session.execute(insert(Order), orders)
+        db.session.execute(insert(OrderItem), lines)
+    db.session.commit()
+
+
+def adhoc_summary(start, end):
+    """The summary computed straight from the orders table"""
+    low = datetime.combine(start, datetime.min.time())
+    high = datetime.combine(end + timedelta(days=1), datetime.min.time())
+    orders, revenue = db.session.execute(
+        select(func.count(Order.id), func.sum(Order.total_amount))
+        .where(Order.created_at >= low, Order.created_at < high, Order.status != 'CANCELLED')
+    ).one()
+    return orders, round(revenue or 0.0, 2)
+
+
+def adhoc_top_items(start, end, limit=10):
+    """The top sellers computed straight from order_items joined to orders"""
+    low = datetime.combine(start, datetime.min.time())
+    high = datetime.combine(end + timedelta(days=1), datetime.min.time())
+    quantity = func.sum(OrderItem.quantity)
+    return [row[0] for row in db.session.execute(
+        select(OrderItem.menu_item_id, quantity)
+        .join(Order, Order.id == OrderItem.order_id)
+        .where(Order.created_at >= low, Order.created_at < high, Order.status != 'CANCELLED')
+        .group_by(OrderItem.menu_item_id)
+        .order_by(quantity.desc(), OrderItem.menu_item_id)
+        .limit(limit)
+    )]
+
+
+def best_of(fn):
+    best = float('inf')
+    for _ in range(ROUNDS):
+        started = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - started)
+    return best * 1000, result
+
+
+def run(order_count):
+    app = create_benchmark_app()
+    with app.app_context():
+        customer, _ = create_user()
+        menu_item_ids = create_menu_items(100)
+        seed_history(customer.id, menu_item_ids, order_count)
+
+        started = time.perf_counter()
+        sales_analytics.rebuild(batch_size=500, echo=lambda message: None)
+        rebuild_seconds = time.perf_counter() - started
+
+        end = datetime.utcnow().date()
+        print(f"\n{order_count} orders over {DAYS} days; backfill: {rebuild_seconds:.2f}s")
+        print(f"\n{'report':<24} {'range':>6} {'ad hoc ms':>10} {'rollup ms':>10} {'same':>6}")
+        for days in (7, 30, 365):
+            start = end - timedelta(days=days - 1)
+
+            adhoc_ms, adhoc = best_of(lambda: adhoc_summary(start, end))
+            rollup_ms, summary = best_of(lambda: sales_analytics.summary(start, end))
+            same = adhoc == (summary['orders'], summary['revenue'])
+            print(f"{'summary':<24} {days:>5}d {adhoc_ms:>10.2f} {rollup_ms:>10.2f} {str(same):>6}")
+
+            adhoc_ms, adhoc = best_of(lambda: adhoc_top_items(start, end))
+            rollup_ms, top = best_of(lambda: sales_analytics.top_items(start, end))
+            same = adhoc == [item['menu_item_id'] for item in top]
+            print(f"{'top items':<24} {days:>5}d {adhoc_ms:>10.2f} {rollup_ms:>10.2f} {str(same):>6}")
+
+            rollup_ms, _ = best_of(lambda: sales_analytics.revenue_by_day(start, end))
+            print(f"{'revenue by day':<24} {days:>5}d {'':>10} {rollup_ms:>10.2f}")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--orders', type=int, default=100000)
+    run(parser.parse_args().orders)
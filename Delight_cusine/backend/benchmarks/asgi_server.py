@@ -0,0 +1,256 @@
+"""
+ASGI vs. WSGI deployment benchmark
+Starts the real servers (gunicorn sync workers, uvicorn with asgi.py) on a
+seeded SQLite file and drives each with the load_test scenario mix over
+HTTP, first alone and then while thousands of idle SSE clients hold open
+streams on /api/restaurant/status/stream.
+
+Usage:
+    python -m benchmarks.asgi_server [--idle 2000] [--workers 4] [--threads 16] [--duration 10]
+
+Requires gunicorn, uvicorn and aiosqlite. The benchmark raises its own open
+file limit to the hard limit; --idle is capped by it. Server output (e.g.
+gunicorn killing workers stuck on streams) goes to a log in the temporary
+directory.
+"""
+import argparse
+import asyncio
+import http.client
+import json
+import os
+import random
+import resource
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from benchmarks.common import create_benchmark_app, database_config
+from benchmarks.load_test import MIX, Scenarios, percentile, seed
+from extensions.db import db
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+STREAM_PATH = '/api/restaurant/status/stream'
+
+
+class HTTPResponse:
+    """The parts of a test-client response the load_test scenarios read"""
+
+    def __init__(self, status_code, body):
+        self.status_code = status_code
+        self.body = body
+
+    def get_json(self):
+        return json.loads(self.body) if self.body else {}
+
+
+class HTTPClient:
+    """
+    Test-client lookalike over one keep-alive HTTP connection
+
+    Gunicorn sync workers close the connection after every response;
+    http.client reconnects transparently. Timeouts count as errors.
+    """
+
+    def __init__(self, port, timeout):
+        self.connection = http.client.HTTPConnection('127.0.0.1', port, timeout=timeout)
+
+    def _request(self, method, path, json_body=None, headers=None):
+        headers = dict(headers or {})
+        body = None
+        if json_body is not None:
+            body = json.dumps(json_body)
+            headers['Content-Type'] = 'application/json'
+        try:
+            self.connection.request(method, path, body, headers)
+            response = self.connection.getresponse()
+            return HTTPResponse(response.status, response.read())
+        except (OSError, http.client.HTTPException):
+            self.connection.close()
+            return HTTPResponse(599, b'')
+
+    def get(self, path, headers=None):
+        return self._request('GET', path, headers=headers)
+
+    def post(self, path, json=None, headers=None):
+        return self._request('POST', path, json, headers)
+
+    def patch(self, path, json=None, headers=None):
+        return self._request('PATCH', path, json, headers)
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def start_server(kind, port, database_uri, workers, log_path):
+    env = dict(os.environ, DATABASE_URL=database_uri, FLASK_ENV='production', FAST_START='true',
+               RATE_LIMIT_ENABLED='false')
+    if kind == 'gunicorn':
+        command = ['gunicorn', '--workers', str(workers), '--bind', f'127.0.0.1:{port}',
+                   '--log-level', 'warning', 'app:create_app()']
+    else:
+        command = ['uvicorn', '--factory', 'asgi:create_asgi_app', '--host', '127.0.0.1', '--port', str(port),
+                   '--no-access-log', '--log-level', 'warning', '--backlog', '4096']
+    with open(log_path, 'ab') as log:
+        process = subprocess.Popen(command, cwd=BACKEND_DIR, env=env, stdout=log, stderr=subprocess.STDOUT)
+
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        try:
+            connection = http.client.HTTPConnection('127.0.0.1', port, timeout=2)
+            connection.request('GET', '/api/health')
+            if connection.getresponse().status == 200:
+                return process
+        except OSError:
+            time.sleep(0.2)
+    process.kill()
+    with open(log_path) as log:
+        raise RuntimeError(f'{kind} did not start:\n{log.read()}')
+
+
+class IdleStreams:
+    """Open SSE connections, held from a background event loop"""
+
+    def __init__(self, port, count, timeout):
+        self.port = port
+        self.count = count
+        self.timeout = timeout
+        self.loop = asyncio.new_event_loop()
+        self.writers = []
+        self.thread = threading.Thread(target=self.loop.run_forever, daemon=True)
+        self.thread.start()
+
+    async def _open(self):
+        try:
+            reader, writer = await asyncio.open_connection('127.0.0.1', self.port)
+        except OSError:
+            return False
+        self.writers.append(writer)
+        writer.write(f'GET {STREAM_PATH} HTTP/1.1\r\nHost: localhost\r\nAccept: text/event-stream\r\n\r\n'.encode())
+        try:
+            await asyncio.wait_for(reader.readuntil(b'event: status'), self.timeout)
+            return True
+        except (asyncio.TimeoutError, asyncio.IncompleteReadError, asyncio.LimitOverrunError, OSError):
+            return False
+
+    async def _open_all(self):
+        results = await asyncio.gather(*(self._open() for _ in range(self.count)))
+        return sum(results)
+
+    def open(self):
+        """Open every stream; returns how many received the initial status event"""
+        return asyncio.run_coroutine_threadsafe(self._open_all(), self.loop).result()
+
+    def close(self):
+        for writer in self.writers:
+            writer.transport.abort()
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.thread.join()
+
+
+def drive(port, fixtures, threads, duration, timeout, seed_value):
+    """Run the scenario mix from `threads` clients for `duration` seconds"""
+    customers, admins, menu_item_ids, order_ids, refresh_tokens = fixtures
+    names = list(MIX)
+    weights = [MIX[name] for name in names]
+    samples = []
+    samples_lock = threading.Lock()
+    deadline = time.monotonic() + duration
+
+    def worker(index):
+        rng = random.Random(seed_value + index)
+        scenarios = Scenarios(HTTPClient(port, timeout), rng, customers, admins, menu_item_ids, order_ids,
+                              refresh_tokens)
+        results = []
+        while time.monotonic() < deadline:
+            name = rng.choices(names, weights)[0]
+            started = time.perf_counter()
+            response = getattr(scenarios, name)()
+            results.append((time.perf_counter() - started, response.status_code < 400))
+        with samples_lock:
+            samples.extend(results)
+
+    started = time.perf_counter()
+    workers = [threading.Thread(target=worker, args=(i,)) for i in range(threads)]
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    latencies = [latency for latency, ok in samples if ok]
+    return {
+        'ok': len(latencies),
+        'errors': sum(1 for _, ok in samples if not ok),
+        'rps': len(latencies) / elapsed,
+        'p50_ms': percentile(latencies, 50) * 1000,
+        'p99_ms': percentile(latencies, 99) * 1000,
+    }
+
+
+def raise_file_limit():
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    if hard != resource.RLIM_INFINITY and soft < hard:
+        resource.setrlimit(resource.RLIMIT_NOFILE, (hard, hard))
+    return resource.getrlimit(resource.RLIMIT_NOFILE)[0]
+
+
+def run(args):
+    limit = raise_file_limit()
+    idle = min(args.idle, max(limit // 2 - 200, 0))
+
+    tmpdir = tempfile.mkdtemp()
+    database_uri = f"sqlite:///{os.path.join(tmpdir, 'asgi.db')}"
+    app = create_benchmark_app(database_config(database_uri))
+    with app.app_context():
+        customers, admins, menu_item_ids, order_ids = seed(args.users, args.menu_items)
+        db.engine.dispose()
+    fixtures = (customers, admins, menu_item_ids, order_ids, [refresh for _, refresh in customers])
+
+    print(f"\n{'server':<22} {'phase':<18} {'streams':>11} {'ok':>7} {'errors':>7} {'req/s':>8} "
+          f"{'p50 ms':>8} {'p99 ms':>8}")
+    try:
+        for kind, label in (('gunicorn', f'gunicorn sync -w {args.workers}'), ('uvicorn', 'uvicorn asgi.py')):
+            port = args.port or free_port()
+            process = start_server(kind, port, database_uri, args.workers, os.path.join(tmpdir, f'{kind}.log'))
+            try:
+                result = drive(port, fixtures, args.threads, args.duration, args.timeout, args.seed)
+                print(f"{label:<22} {'load':<18} {'-':>11} {result['ok']:>7} {result['errors']:>7} "
+                      f"{result['rps']:>8.1f} {result['p50_ms']:>8.1f} {result['p99_ms']:>8.1f}")
+
+                streams = IdleStreams(port, idle, args.open_timeout)
+                try:
+                    opened = streams.open()
+                    result = drive(port, fixtures, args.threads, args.duration, args.timeout, args.seed)
+                    print(f"{label:<22} {f'load + {idle} idle':<18} {f'{opened}/{idle}':>11} {result['ok']:>7} "
+                          f"{result['errors']:>7} {result['rps']:>8.1f} {result['p50_ms']:>8.1f} "
+                          f"{result['p99_ms']:>8.1f}")
+                finally:
+                    streams.close()
+            finally:
+                process.kill()
+                process.wait()
+    finally:
+        shutil.rmtree(tmpdir, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--idle', type=int, default=2000, help='idle SSE connections held during the second phase')
+    parser.add_argument('--workers', type=int, default=4, help='gunicorn sync worker processes')
+    parser.add_argument('--threads', type=int, default=16, help='concurrent load clients')
+    parser.add_argument('--duration', type=float, default=10, help='seconds per load phase')
+    parser.add_argument('--timeout', type=float, default=5, help='client timeout per request (seconds)')
+    parser.add_argument('--open-timeout', type=float, default=30,
+                        help='seconds for an idle client to receive its first event')
+    parser.add_argument('--users', type=int, default=50)
+    parser.add_argument('--menu-items', type=int, default=200)
+    parser.add_argument('--port', type=int, default=0, help='server port (default: any free port)')
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+    sys.exit(run(args))
@@ -0,0 +1,103 @@
+"""
+Shared benchmark helpers
+Isolated app configuration, fixtures and SQL query counting
+"""
+from contextlib import contextmanager
+from sqlalchemy import event
+from flask_jwt_extended import create_access_token
+from werkzeug.security import generate_password_hash
+from config.config import Config, SQLITE_PRAGMAS, engine_options
+from extensions.db import db
+from models.menu import MenuItem
+from models.order import Order, OrderItem
+from models.user import User
+
+
+class BenchmarkConfig(Config):
+    """In-memory database, no SQL echo, no rate limits (every client is 127.0.0.1)"""
+
+    SQLALCHEMY_DATABASE_URI = 'sqlite://'
+    SQLALCHEMY_ENGINE_OPTIONS = engine_options('sqlite://', 'testing')
+    SQLALCHEMY_ECHO = False
+    FAST_START = False
+    MIGRATE_ON_START = True
+    RATE_LIMIT_ENABLED = False
+
+
+def database_config(database_uri, tuned=True):
+    """
+    Benchmark config for a real database file or server
+
+    Args:
+        database_uri: SQLAlchemy URI (sqlite file, postgresql://...)
+        tuned: False reproduces the untuned defaults (no engine options,
+            no SQLite pragmas) for before/after comparisons
+    """
+    class DatabaseConfig(BenchmarkConfig):
+        SQLALCHEMY_DATABASE_URI = database_uri
+        SQLALCHEMY_ENGINE_OPTIONS = engine_options(database_uri, 'production') if tuned else {}
+        SQLITE_PRAGMAS = SQLITE_PRAGMAS if tuned else None
+
+    return DatabaseConfig
+
+
+def create_benchmark_app(config_class=BenchmarkConfig):
+    """Create an app bound to an isolated benchmark database"""
+    from app import create_app
+    return create_app(config_class)
+
+
+def create_user(email='bench@example.com', role='customer'):
+    """Create a user and return (user, access token)"""
+    user = User(
+        email=email,
+        password=generate_password_hash('benchmark', method='pbkdf2:sha256'),
+        name='Benchmark User',
+        role=role
+    )
+    db.session.add(user)
+    db.session.commit()
+    return user, create_access_token(identity=user.id)
+
+
+def create_menu_items(count, category='main'):
+    """Insert `count` available menu items and return their IDs"""
+    items = [
+        MenuItem(name=f'Bench Item {i}', description='Benchmark item',
+                 price=5.0 + i % 20, category=category, available=True)
+        for i in range(count)
+    ]
+    db.session.add_all(items)
+    db.session.commit()
+    return [item.id for item in items]
+
+
+def create_orders(user_id, menu_item_ids, count, items_per_order=3):
+    """Insert `count` orders for a user, each with `items_per_order` lines"""
+    for i in range(count):
+        lines = [
+            OrderItem(menu_item_id=menu_item_ids[(i + n) % len(menu_item_ids)], quantity=1, price=9.5)
+            for n in range(items_per_order)
+        ]
+        db.session.add(Order(user_id=user_id, total_amount=9.5 * items_per_order, items=lines))
+    db.session.commit()
+
+
+class QueryCounter:
+    """Counts SQL statements executed on an engine"""
+
+    def __init__(self):
+        self.count = 0
+
+    def _on_execute(self, conn, cursor, statement, parameters, context, executemany):
+        self.count += 1
+
+    @contextmanager
+    def watch(self, engine):
+        """Count statements executed on `engine` inside the with-block"""
+        self.count = 0
+        event.listen(engine, 'before_cursor_execute', self._on_execute)
+        try:
+            yield self
+        finally:
+            event.remove(engine, 'before_cursor_execute', self._on_execute)
@@ -0,0 +1,80 @@
+"""
+Response compression benchmark
+Bytes on the wire and server time for menu and order listings: identity vs.
+gzip vs. brotli, each with the full payload and with a sparse fieldset
+
+Usage:
+    python -m benchmarks.compression [--menu-items 200] [--orders 200]
+"""
+import argparse
+import statistics
+import time
+from benchmarks.common import create_benchmark_app, create_menu_items, create_orders, create_user
+from extensions.compression import ENCODINGS, compression
+from extensions.db import db
+
+ROUNDS = 50
+
+# (label, path, admin token); the fields are what a list view renders
+ENDPOINTS = (
+    ('menu', '/api/menu', False),
+    ('menu ?fields', '/api/menu?fields=id,name,price,category,image_url,available', False),
+    ('my orders', '/api/orders?limit=50', False),
+    ('my orders ?fields', '/api/orders?limit=50&fields=id,status,total,timestamp,orderMode', False),
+    ('all orders', '/api/orders/all', True),
+    ('all orders ?fields', '/api/orders/all?fields=id,user_id,status,total,timestamp', True),
+    ('all orders ndjson', '/api/orders/all?stream=ndjson', True),
+)
+
+
+def measure(client, path, headers):
+    """(bytes on the wire, median ms) for GET path"""
+    timings = []
+    size = 0
+    for _ in range(ROUNDS):
+        started = time.perf_counter()
+        response = client.get(path, headers=headers)
+        size = len(response.get_data())
+        timings.append((time.perf_counter() - started) * 1000)
+        assert response.status_code == 200, (path, response.status_code)
+    return size, statistics.median(timings)
+
+
+def run(menu_item_count, order_count):
+    app = create_benchmark_app()
+    with app.app_context():
+        menu_item_ids = create_menu_items(menu_item_count)
+        customer, customer_token = create_user()
+        _, admin_token = create_user('admin@example.com', 'admin')
+        create_orders(customer.id, menu_item_ids, order_count, 3)
+        db.session.remove()
+
+    client = app.test_client()
+    compression.reset()
+    encodings = (None,) + ENCODINGS
+    print(f"\n{'endpoint':<20}" + ''.join(f"{encoding or 'identity':>18}" for encoding in encodings))
+    print(f"{'':<20}" + ''.join(f"{'bytes    ms':>18}" for _ in encodings))
+
+    for label, path, admin in ENDPOINTS:
+        token = admin_token if admin else customer_token
+        row = f'{label:<20}'
+        for encoding in encodings:
+            headers = {'Authorization': f'Bearer {token}'}
+            if encoding:
+                headers['Accept-Encoding'] = encoding
+            size, ms = measure(client, path, headers)
+            row += f'{size:>11,} {ms:>6.2f}'
+        print(row)
+
+    print('\nbytes saved (compression.snapshot()):')
+    for encoding, stats in compression.snapshot().items():
+        print(f"  {encoding:<9} {stats['responses']:>5} responses  {stats['original_bytes']:>12,} -> "
+              f"{stats['sent_bytes']:>12,} bytes  ({stats['saved_ratio']:.1%} saved)")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--menu-items', type=int, default=200)
+    parser.add_argument('--orders', type=int, default=200)
+    args = parser.parse_args()
+    run(args.menu_items, args.orders)
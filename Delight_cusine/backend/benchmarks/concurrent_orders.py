@@ -0,0 +1,91 @@
+"""
+Concurrent order placement benchmark
+Orders per second and failed requests ("database is locked") with the
+untuned engine vs. the tuned engine profile
+
+Usage:
+    python -m benchmarks.concurrent_orders
+    BENCH_DATABASE_URL=postgresql://localhost/delight_bench python -m benchmarks.concurrent_orders
+
+Without BENCH_DATABASE_URL a temporary SQLite file is used (once in the
+default rollback-journal mode, once with WAL). With it, both profiles run
+against that database; its tables are dropped afterwards.
+"""
+import os
+import tempfile
+import threading
+import time
+from benchmarks.common import create_benchmark_app, create_menu_items, create_user, database_config
+from extensions.db import db
+
+THREADS = 16
+ORDERS_PER_THREAD = 25
+CART_SIZE = 5
+
+
+def run_profile(name, database_uri, tuned):
+    app = create_benchmark_app(database_config(database_uri, tuned))
+
+    with app.app_context():
+        tokens = [create_user(f'bench{i}@example.com')[1] for i in range(THREADS)]
+        menu_item_ids = create_menu_items(CART_SIZE)
+
+    payload = {'items': [{'menu_item_id': item_id, 'quantity': 1} for item_id in menu_item_ids]}
+    statuses = []
+    lock = threading.Lock()
+
+    def worker(token):
+        client = app.test_client()
+        headers = {'Authorization': f'Bearer {token}'}
+        results = [client.post('/api/orders', json=payload, headers=headers).status_code
+                   for _ in range(ORDERS_PER_THREAD)]
+        with lock:
+            statuses.extend(results)
+
+    # Readers compete with the writers, as menu browsing does in production
+    def reader():
+        client = app.test_client()
+        while not done.is_set():
+            client.get('/api/orders/all?limit=1')
+            client.get('/api/menu/categories')
+
+    done = threading.Event()
+    readers = [threading.Thread(target=reader) for _ in range(4)]
+    writers = [threading.Thread(target=worker, args=(token,)) for token in tokens]
+
+    started = time.perf_counter()
+    for thread in readers + writers:
+        thread.start()
+    for thread in writers:
+        thread.join()
+    elapsed = time.perf_counter() - started
+    done.set()
+    for thread in readers:
+        thread.join()
+
+    created = statuses.count(201)
+    print(f"{name:>22} {created / elapsed:>10.1f} {created:>8} {len(statuses) - created:>8}")
+
+    with app.app_context():
+        db.drop_all()
+        with db.engine.begin() as conn:
+            conn.exec_driver_sql('DROP TABLE IF EXISTS schema_migrations')
+        db.engine.dispose()
+
+
+def run():
+    print(f"\n{'profile':>22} {'orders/s':>10} {'created':>8} {'failed':>8}")
+
+    database_uri = os.getenv('BENCH_DATABASE_URL')
+    if database_uri:
+        run_profile('untuned', database_uri, tuned=False)
+        run_profile('tuned', database_uri, tuned=True)
+        return
+
+    directory = tempfile.mkdtemp()
+    run_profile('sqlite rollback journal', f"sqlite:///{os.path.join(directory, 'untuned.db')}", tuned=False)
+    run_profile('sqlite WAL', f"sqlite:///{os.path.join(directory, 'tuned.db')}", tuned=True)
+
+
+if __name__ == '__main__':
+    run()
@@ -0,0 +1,54 @@
+"""
+Instrumentation overhead benchmark
+Per-request cost of the SQL/serialization instrumentation, disabled vs.
+enabled, on a cached endpoint (no SQL) and a query-heavy listing
+
+Usage:
+    python -m benchmarks.instrumentation
+"""
+import time
+from benchmarks.common import BenchmarkConfig, create_benchmark_app, create_menu_items, create_orders, create_user
+
+REQUESTS = 2000
+ENDPOINTS = [
+    ('cached menu', '/api/menu'),
+    ('orders page (20)', '/api/orders/all?limit=20'),
+]
+
+
+def measure(enabled):
+    class InstrumentedConfig(BenchmarkConfig):
+        INSTRUMENTATION_ENABLED = enabled
+
+    app = create_benchmark_app(InstrumentedConfig)
+    client = app.test_client()
+    with app.app_context():
+        _, token = create_user('admin@example.com', role='admin')
+        customer, _ = create_user()
+        menu_item_ids = create_menu_items(50)
+        create_orders(customer.id, menu_item_ids, 200, 3)
+
+    headers = {'Authorization': f'Bearer {token}'}
+    results = {}
+    for name, url in ENDPOINTS:
+        for _ in range(100):
+            client.get(url, headers=headers)
+        started = time.perf_counter()
+        for _ in range(REQUESTS):
+            client.get(url, headers=headers)
+        results[name] = (time.perf_counter() - started) / REQUESTS * 1e6
+    return results
+
+
+def run():
+    disabled = measure(False)
+    enabled = measure(True)
+
+    print(f"\n{'endpoint':<18} {'disabled us':>12} {'enabled us':>12} {'overhead':>10}")
+    for name, _ in ENDPOINTS:
+        overhead = enabled[name] - disabled[name]
+        print(f"{name:<18} {disabled[name]:>12.1f} {enabled[name]:>12.1f} {overhead / disabled[name]:>9.1%}")
+
+
+if __name__ == '__main__':
+    run()
@@ -0,0 +1,338 @@
+"""
+API load test
+Seeds N users and M menu items, then drives a weighted mix of browsing,
+order placement, admin status changes and token refreshes through
+create_app() from concurrent clients. Reports latency percentiles,
+requests per second and SQL queries per request for each scenario, and
+compares them with a stored baseline so CI can flag regressions.
+
+Usage:
+    python -m benchmarks.load_test [--users 50] [--menu-items 200] [--threads 8] [--requests 4000]
+    python -m benchmarks.load_test --check            # exit 1 on regression vs. the baseline
+    python -m benchmarks.load_test --save-baseline    # record this run as the new baseline
+    BENCH_DATABASE_URL=postgresql://localhost/delight_bench python -m benchmarks.load_test
+
+Without BENCH_DATABASE_URL a temporary SQLite file (tuned WAL profile) is used.
+"""
+import argparse
+import json
+import os
+import random
+import shutil
+import sys
+import tempfile
+import threading
+import time
+from sqlalchemy import event, insert
+from flask_jwt_extended import create_access_token
+from werkzeug.security import generate_password_hash
+from benchmarks.common import create_benchmark_app, create_orders, database_config
+from extensions.db import db
+from models.menu import MenuItem
+from models.user import User
+from services import token_revocation
+
+BASELINE_PATH = os.path.join(os.path.dirname(__file__), 'baselines', 'load_test.json')
+
+CATEGORIES = ('main', 'appetizer', 'dessert', 'beverage', 'side', 'salad', 'soup', 'kids')
+ORDER_STATUSES = ('PREPARING', 'OUT_FOR_DELIVERY', 'DELIVERED')
+ADMIN_COUNT = 2
+ORDERS_PER_USER = 10
+
+# Scenario weights: a storefront is mostly browsing
+MIX = {
+    'browse_menu': 40,
+    'menu_item': 10,
+    'categories': 5,
+    'my_orders': 10,
+    'place_order': 15,
+    'admin_orders': 5,
+    'admin_status': 5,
+    'refresh_token': 10,
+}
+
+# Statuses that are a correct outcome under concurrency, not errors: of two
+# admins moving the same order at once, one gets 409 status_conflict
+EXPECTED_STATUSES = {'admin_status': {409}}
+
+# Regression thresholds for --check
+QUERY_TOLERANCE = 0.5       # extra queries per request (deterministic)
+LATENCY_TOLERANCE = 1.0     # relative p95 increase (machine-dependent)
+LATENCY_SLACK_MS = 50       # absolute p95 headroom: GIL scheduling makes fast endpoints bimodal
+THROUGHPUT_TOLERANCE = 0.3  # relative requests/s decrease (machine-dependent)
+
+
+class ThreadQueryCounter:
+    """Counts SQL statements per thread; each test client request runs on its caller's thread"""
+
+    def __init__(self, engine):
+        self._local = threading.local()
+        event.listen(engine, 'before_cursor_execute', self._on_execute)
+
+    def _on_execute(self, conn, cursor, statement, parameters, context, executemany):
+        self._local.count = getattr(self._local, 'count', 0) + 1
+
+    def take(self):
+        count = getattr(self._local, 'count', 0)
+        self._local.count = 0
+        return count
+
+
+class Scenarios:
+    """Request builders for each scenario in MIX"""
+
+    def __init__(self, client, rng, customers, admins, menu_item_ids, order_ids, refresh_tokens):
+        self.client = client
+        self.rng = rng
+        self.customers = customers
+        self.admins = admins
+        self.menu_item_ids = menu_item_ids
+        self.order_ids = order_ids
+        self.refresh_tokens = refresh_tokens
+
+    @staticmethod
+    def _auth(token):
+        return {'Authorization': f'Bearer {token}'}
+
+    def browse_menu(self):
+        return self.client.get(f'/api/menu?category={self.rng.choice(CATEGORIES)}&available=true')
+
+    def menu_item(self):
+        return self.client.get(f'/api/menu/{self.rng.choice(self.menu_item_ids)}')
+
+    def categories(self):
+        return self.client.get('/api/menu/categories')
+
+    def my_orders(self):
+        access, _ = self.rng.choice(self.customers)
+        return self.client.get('/api/orders?limit=20', headers=self._auth(access))
+
+    def place_order(self):
+        access, _ = self.rng.choice(self.customers)
+        items = [{'menu_item_id': item_id, 'quantity': self.rng.randint(1, 3)}
+                 for item_id in self.rng.sample(self.menu_item_ids, self.rng.randint(1, 5))]
+        response = self.client.post('/api/orders', json={'items': items}, headers=self._auth(access))
+        if response.status_code == 201:
+            self.order_ids.append(int(response.get_json()['order']['id']))
+        return response
+
+    def admin_orders(self):
+        access, _ = self.rng.choice(self.admins)
+        return self.client.get('/api/orders/all?limit=50', headers=self._auth(access))
+
+    def admin_status(self):
+        access, _ = self.rng.choice(self.admins)
+        order_id = self.rng.choice(self.order_ids[-500:])
+        return self.client.patch(f'/api/orders/{order_id}/status',
+                                 json={'status': self.rng.choice(ORDER_STATUSES)},
+                                 headers=self._auth(access))
+
+    def refresh_token(self):
+        # Refresh tokens are single-use (rotation): take the oldest out of the
+        # pool and put its replacement back, so no two threads present the same token
+        refresh = self.refresh_tokens.pop(0)
+        response = self.client.post('/api/auth/refresh', headers=self._auth(refresh))
+        self.refresh_tokens.append(response.get_json().get('refresh_token', refresh))
+        return response
+
+
+def seed(user_count, menu_item_count):
+    """
+    Bulk-insert users, menu items and an order history
+
+    Returns:
+        (customers, admins, menu item IDs, order IDs) where customers and
+        admins are lists of (access token, refresh token)
+    """
+    # One hash for everyone: seeding measures nothing, so skip N key derivations
+    password = generate_password_hash('loadtest', method='pbkdf2:sha256')
+    db.session.execute(insert(User), [
+        {'email': f'load{i}@example.com', 'password': password, 'name': f'Load User {i}',
+         'role': 'admin' if i < ADMIN_COUNT else 'customer'}
+        for i in range(user_count + ADMIN_COUNT)
+    ])
+    db.session.execute(insert(MenuItem), [
+        {'name': f'Load Item {i}', 'description': 'Load test item', 'price': 5.0 + i % 20,
+         'category': CATEGORIES[i % len(CATEGORIES)], 'available': True}
+        for i in range(menu_item_count)
+    ])
+    db.session.commit()
+
+    users = db.session.query(User.id, User.role).order_by(User.id).all()
+    menu_item_ids = [row.id for row in db.session.query(MenuItem.id)]
+    tokens = {'admin': [], 'customer': []}
+    for user_id, role in users:
+        tokens[role].append((create_access_token(identity=user_id), token_revocation.issue_refresh_token(user_id)))
+        if role == 'customer':
+            create_orders(user_id, menu_item_ids, ORDERS_PER_USER, 3)
+    db.session.commit()
+
+    order_ids = [row[0] for row in db.session.execute(db.text('SELECT id FROM orders'))]
+    return tokens['customer'], tokens['admin'], menu_item_ids, order_ids
+
+
+def percentile(values, pct):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * pct / 100))] if values else 0.0
+
+
+def run(args, database_uri):
+    app = create_benchmark_app(database_config(database_uri))
+
+    with app.app_context():
+        customers, admins, menu_item_ids, order_ids = seed(args.users, args.menu_items)
+        counter = ThreadQueryCounter(db.engine)
+
+    refresh_tokens = [refresh for _, refresh in customers]
+    names = list(MIX)
+    weights = [MIX[name] for name in names]
+    samples = {name: [] for name in names}
+    samples_lock = threading.Lock()
+    requests_per_thread = args.requests // args.threads
+    warmup_per_thread = args.warmup // args.threads
+    start_barrier = threading.Barrier(args.threads + 1)
+
+    def worker(index):
+        rng = random.Random(args.seed + index)
+        scenarios = Scenarios(app.test_client(), rng, customers, admins, menu_item_ids, order_ids, refresh_tokens)
+        plan = rng.choices(names, weights, k=warmup_per_thread + requests_per_thread)
+
+        for name in plan[:warmup_per_thread]:
+            getattr(scenarios, name)()
+        start_barrier.wait()
+
+        results = []
+        for name in plan[warmup_per_thread:]:
+            counter.take()
+            started = time.perf_counter()
+            response = getattr(scenarios, name)()
+            elapsed = time.perf_counter() - started
+            ok = response.status_code < 400 or response.status_code in EXPECTED_STATUSES.get(name, ())
+            results.append((name, elapsed, counter.take(), ok))
+
+        with samples_lock:
+            for name, elapsed, queries, ok in results:
+                samples[name].append((elapsed, queries, ok))
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(args.threads)]
+    for thread in threads:
+        thread.start()
+    start_barrier.wait()
+    started = time.perf_counter()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    report = {'config': {'users': args.users, 'menu_items': args.menu_items, 'threads': args.threads,
+                         'requests': requests_per_thread * args.threads, 'database': app.config[
+                             'SQLALCHEMY_DATABASE_URI'].split(':', 1)[0]},
+              'rps': round(sum(len(s) for s in samples.values()) / elapsed, 1),
+              'scenarios': {}}
+    for name, rows in samples.items():
+        latencies = [row[0] for row in rows]
+        report['scenarios'][name] = {
+            'requests': len(rows),
+            'errors': sum(1 for row in rows if not row[2]),
+            'p50_ms': round(percentile(latencies, 50) * 1000, 2),
+            'p95_ms': round(percentile(latencies, 95) * 1000, 2),
+            'p99_ms': round(percentile(latencies, 99) * 1000, 2),
+            'queries': round(sum(row[1] for row in rows) / len(rows), 2) if rows else 0.0,
+        }
+
+    with app.app_context():
+        db.drop_all()
+        with db.engine.begin() as conn:
+            conn.exec_driver_sql('DROP TABLE IF EXISTS schema_migrations')
+        db.engine.dispose()
+
+    return report
+
+
+def print_report(report):
+    config = report['config']
+    print(f"\n{config['requests']} requests, {config['threads']} threads, {config['users']} users, "
+          f"{config['menu_items']} menu items ({config['database']})")
+    print(f"\n{'scenario':<14} {'requests':>8} {'errors':>6} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'queries':>8}")
+    for name, stats in report['scenarios'].items():
+        print(f"{name:<14} {stats['requests']:>8} {stats['errors']:>6} {stats['p50_ms']:>8.2f} "
+              f"{stats['p95_ms']:>8.2f} {stats['p99_ms']:>8.2f} {stats['queries']:>8.2f}")
+    print(f"\nthroughput: {report['rps']:.1f} requests/s")
+
+
+def regressions(report, baseline):
+    """
+    Compare a run with the baseline
+
+    Returns:
+        List of human-readable regression descriptions
+    """
+    found = []
+    if report['config'] != baseline['config']:
+        found.append(f"config differs from baseline: {report['config']} vs {baseline['config']}")
+        return found
+
+    if report['rps'] < baseline['rps'] * (1 - THROUGHPUT_TOLERANCE):
+        found.append(f"throughput {report['rps']:.1f} < baseline {baseline['rps']:.1f} requests/s")
+
+    for name, stats in report['scenarios'].items():
+        base = baseline['scenarios'].get(name)
+        if base is None:
+            continue
+        if stats['errors'] > base['errors']:
+            found.append(f"{name}: {stats['errors']} errors (baseline {base['errors']})")
+        if stats['queries'] > base['queries'] + QUERY_TOLERANCE:
+            found.append(f"{name}: {stats['queries']:.2f} queries/request (baseline {base['queries']:.2f})")
+        if stats['p95_ms'] > base['p95_ms'] * (1 + LATENCY_TOLERANCE) + LATENCY_SLACK_MS:
+            found.append(f"{name}: p95 {stats['p95_ms']:.2f} ms (baseline {base['p95_ms']:.2f} ms)")
+    return found
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--users', type=int, default=50)
+    parser.add_argument('--menu-items', type=int, default=200)
+    parser.add_argument('--threads', type=int, default=8)
+    parser.add_argument('--requests', type=int, default=4000)
+    parser.add_argument('--warmup', type=int, default=400)
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--baseline', default=BASELINE_PATH)
+    parser.add_argument('--check', action='store_true', help='exit 1 if the run regresses vs. the baseline')
+    parser.add_argument('--save-baseline', action='store_true')
+    args = parser.parse_args()
+
+    database_uri = os.getenv('BENCH_DATABASE_URL')
+    tmpdir = None
+    if not database_uri:
+        tmpdir = tempfile.mkdtemp()
+        database_uri = f"sqlite:///{os.path.join(tmpdir, 'load.db')}"
+
+    try:
+        report = run(args, database_uri)
+    finally:
+        if tmpdir:
+            shutil.rmtree(tmpdir, ignore_errors=True)
+
+    print_report(report)
+
+    if args.save_baseline:
+        os.makedirs(os.path.dirname(args.baseline), exist_ok=True)
+        with open(args.baseline, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"baseline saved to {args.baseline}")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print('no baseline recorded; run with --save-baseline')
+        return 0
+
+    with open(args.baseline) as f:
+        found = regressions(report, json.load(f))
+    for line in found:
+        print(f"REGRESSION {line}")
+    if not found:
+        print('no regressions vs. baseline')
+    return 1 if found and args.check else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,53 @@
+"""
+Menu cache benchmark
+Requests per second and queries per request for GET /api/menu with each
+cache backend
+
+Usage:
+    python -m benchmarks.menu_cache
+"""
+import os
+import tempfile
+import time
+from benchmarks.common import BenchmarkConfig, QueryCounter, create_benchmark_app, create_menu_items
+from extensions.db import db
+
+REQUESTS = 500
+MENU_SIZE = 150
+URLS = ['/api/menu', '/api/menu?category=main', '/api/menu/categories']
+
+
+def run_backend(backend, path):
+    class Config(BenchmarkConfig):
+        CACHE_BACKEND = backend
+        CACHE_SQLITE_PATH = path
+
+    app = create_benchmark_app(Config)
+    client = app.test_client()
+    counter = QueryCounter()
+
+    with app.app_context():
+        create_menu_items(MENU_SIZE)
+        engine = db.engine
+
+    queries = 0
+    started = time.perf_counter()
+    for i in range(REQUESTS):
+        with counter.watch(engine):
+            response = client.get(URLS[i % len(URLS)])
+        assert response.status_code == 200
+        queries += counter.count
+    elapsed = time.perf_counter() - started
+
+    print(f"{backend:>8} {REQUESTS / elapsed:>10.0f} {queries / REQUESTS:>12.2f}")
+
+
+def run():
+    path = os.path.join(tempfile.mkdtemp(), 'menu_cache.db')
+    print(f"\n{'backend':>8} {'req/s':>10} {'queries/req':>12}")
+    for backend in ['null', 'lru', 'sqlite']:
+        run_backend(backend, path)
+
+
+if __name__ == '__main__':
+    run()
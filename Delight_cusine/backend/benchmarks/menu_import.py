@@ -0,0 +1,89 @@
+"""
+Menu import benchmark
+One POST /api/menu per item vs. a single CSV/NDJSON upload to
+/api/menu/import, re-import of an export (all updates), and export time.
+Also checks that an exported menu re-imports without changes in count.
+
+Usage:
+    python -m benchmarks.menu_import [--items 2000]
+"""
+import argparse
+import json
+import time
+from benchmarks.common import create_benchmark_app, create_user
+from models.menu import MenuItem
+
+CATEGORIES = ('appetizer', 'main', 'dessert', 'beverage')
+
+
+def rows(count, prefix):
+    return [
+        {'name': f'{prefix} {i}', 'description': 'Imported item', 'price': 4.5 + i % 30,
+         'category': CATEGORIES[i % len(CATEGORIES)], 'available': i % 7 != 0}
+        for i in range(count)
+    ]
+
+
+def to_csv(items):
+    lines = ['name,description,price,category,available']
+    lines += [f"{r['name']},{r['description']},{r['price']},{r['category']},{str(r['available']).lower()}"
+              for r in items]
+    return '\n'.join(lines) + '\n'
+
+
+def timed(fn):
+    started = time.perf_counter()
+    result = fn()
+    return (time.perf_counter() - started) * 1000, result
+
+
+def run(count):
+    app = create_benchmark_app()
+    with app.app_context():
+        _, token = create_user(email='admin@example.com', role='admin')
+    headers = {'Authorization': f'Bearer {token}'}
+    client = app.test_client()
+
+    def one_by_one():
+        for item in rows(count, 'Single'):
+            response = client.post('/api/menu', json=item, headers=headers)
+            assert response.status_code == 201, response.get_json()
+
+    def upload(body, content_type):
+        response = client.post('/api/menu/import', data=body, headers=dict(headers, **{'Content-Type': content_type}))
+        assert response.status_code == 200, response.get_json()
+        return response.get_json()
+
+    def export(fmt):
+        response = client.get(f'/api/menu/export?format={fmt}', headers=headers)
+        assert response.status_code == 200
+        return response.get_data()
+
+    print(f"\n{'operation':<36} {'ms':>9} {'created':>8} {'updated':>8}")
+
+    single_ms, _ = timed(one_by_one)
+    print(f"{f'{count} x POST /api/menu':<36} {single_ms:>9.1f} {count:>8} {0:>8}")
+
+    csv_ms, result = timed(lambda: upload(to_csv(rows(count, 'Csv')), 'text/csv'))
+    print(f"{'import CSV':<36} {csv_ms:>9.1f} {result['created']:>8} {result['updated']:>8}")
+
+    ndjson = ''.join(json.dumps(r) + '\n' for r in rows(count, 'Ndjson'))
+    ndjson_ms, result = timed(lambda: upload(ndjson, 'application/x-ndjson'))
+    print(f"{'import NDJSON':<36} {ndjson_ms:>9.1f} {result['created']:>8} {result['updated']:>8}")
+
+    export_ms, exported = timed(lambda: export('csv'))
+    print(f"{f'export CSV ({len(exported) // 1024} KiB)':<36} {export_ms:>9.1f}")
+
+    reimport_ms, result = timed(lambda: upload(exported, 'text/csv'))
+    print(f"{'re-import export (updates)':<36} {reimport_ms:>9.1f} {result['created']:>8} {result['updated']:>8}")
+    assert result['created'] == 0 and result['updated'] == 3 * count and result['failed'] == 0
+
+    with app.app_context():
+        assert MenuItem.query.count() == 3 * count
+    print(f"\nbulk CSV import: {single_ms / csv_ms:.1f}x faster than one request per item")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--items', type=int, default=2000)
+    run(parser.parse_args().items)
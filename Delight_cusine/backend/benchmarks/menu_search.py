@@ -0,0 +1,114 @@
+"""
+Menu search benchmark
+In-memory index lookups (exact, prefix, typo, multi-word) vs. a LIKE scan
+over name and description, index build time, incremental refresh time, and
+GET /api/menu/search end to end.
+
+Usage:
+    python -m benchmarks.menu_search [--items 2000]
+"""
+import argparse
+import random
+import statistics
+import time
+from datetime import datetime, timedelta
+from sqlalchemy import and_, or_
+from benchmarks.common import create_benchmark_app, create_user
+from extensions.db import db
+from models.menu import MenuItem
+from services import menu_search
+
+ADJECTIVES = ['spicy', 'smoked', 'crispy', 'grilled', 'roasted', 'creamy', 'tangy', 'sweet', 'garlic', 'herbed']
+PROTEINS = ['chicken', 'beef', 'lamb', 'prawn', 'tofu', 'salmon', 'paneer', 'mushroom', 'pork', 'duck']
+DISHES = ['curry', 'burger', 'salad', 'wrap', 'noodles', 'risotto', 'tacos', 'soup', 'skewers', 'bowl']
+CATEGORIES = ['appetizer', 'main', 'dessert', 'beverage']
+
+QUERIES = [
+    ('exact', 'chicken'),
+    ('prefix', 'chick'),
+    ('typo', 'chiken'),
+    ('two words', 'spicy chicken'),
+    ('two words + typo', 'spicey chicken cury'),
+]
+ROUNDS = 2000
+
+
+def seed(count):
+    rng = random.Random(1)
+    created_at = datetime.utcnow() - timedelta(days=1)
+    items = []
+    for i in range(count):
+        words = [rng.choice(ADJECTIVES), rng.choice(PROTEINS), rng.choice(DISHES)]
+        items.append({
+            'name': f"{' '.join(words).title()} {i}",
+            'description': f'{rng.choice(ADJECTIVES)} {rng.choice(PROTEINS)} with {rng.choice(ADJECTIVES)} sauce',
+            'price': 5.0 + i % 20,
+            'category': rng.choice(CATEGORIES),
+            'available': True,
+            'is_deleted': False,
+            'created_at': created_at,
+            'updated_at': created_at,
+        })
+    db.session.execute(MenuItem.__table__.insert(), items)
+    db.session.commit()
+
+
+def like_scan(text):
+    """What a naive search does: every word LIKE'd against name and description"""
+    conditions = [or_(MenuItem.name.ilike(f'%{word}%'), MenuItem.description.ilike(f'%{word}%'))
+                  for word in text.split()]
+    return MenuItem.query.filter(MenuItem.is_deleted.is_(False), and_(*conditions)).all()
+
+
+def percentiles_us(fn, rounds):
+    samples = []
+    for _ in range(rounds):
+        started = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - started) * 1e6)
+    samples.sort()
+    return statistics.median(samples), samples[int(len(samples) * 0.99)]
+
+
+def run(count):
+    app = create_benchmark_app()
+    with app.app_context():
+        seed(count)
+        index = menu_search.get_index()
+
+        started = time.perf_counter()
+        index.sync()
+        print(f"\nindex build ({count} items, {len(index._terms)} terms): "
+              f"{(time.perf_counter() - started) * 1000:.1f} ms")
+
+        print(f"\n{'query':<34} {'hits':>5} {'index p50 µs':>13} {'p99 µs':>8} {'LIKE p50 µs':>12} {'LIKE hits':>10}")
+        for label, text in QUERIES:
+            hits = len(index.search(text, limit=count))
+            index._results.clear()
+            p50, p99 = percentiles_us(lambda: (index._results.clear(), index.search(text)), ROUNDS)
+            like_p50, _ = percentiles_us(lambda: like_scan(text), 50)
+            print(f"{f'{label}: {text!r}':<34} {hits:>5} {p50:>13.1f} {p99:>8.1f} {like_p50:>12.1f} "
+                  f"{len(like_scan(text)):>10}")
+
+        item = db.session.get(MenuItem, 1)
+        item.name = 'Smoky Jackfruit Bao'
+        db.session.commit()
+        started = time.perf_counter()
+        menu_search.refresh(index.version)
+        refresh_ms = (time.perf_counter() - started) * 1000
+        top = index.search('jakfruit')
+        assert top and top[0][0]['id'] == 1, 'refresh did not pick up the rename'
+        print(f"\nincremental refresh after one write: {refresh_ms:.2f} ms")
+
+        _, token = create_user()
+
+    client = app.test_client()
+    client.get('/api/menu/search?q=chicken')
+    p50, p99 = percentiles_us(lambda: client.get('/api/menu/search?q=spicy+chicken'), 500)
+    print(f"GET /api/menu/search?q=spicy+chicken (repeat query): p50 {p50 / 1000:.2f} ms, p99 {p99 / 1000:.2f} ms")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--items', type=int, default=2000)
+    run(parser.parse_args().items)
@@ -0,0 +1,124 @@
+"""
+Order event fan-out load test
+Opens thousands of concurrent SSE subscriber streams (customers on their
+own topic, a few admin dashboards on all orders), publishes order events
+and measures publish cost and publish-to-delivery latency.
+
+Usage:
+    python -m benchmarks.order_events [--subscribers 5000] [--events 200] [--backend local|sqlite]
+"""
+import argparse
+import os
+import random
+import resource
+import statistics
+import tempfile
+import threading
+import time
+from benchmarks.common import BenchmarkConfig, create_benchmark_app
+from extensions.events import events
+from services.order_events import ALL_ORDERS_TOPIC, topics_for, user_topic
+
+ADMIN_SHARE = 0.01  # one dashboard per hundred subscribers
+TABS_PER_CUSTOMER = 2
+
+
+def percentile(values, pct):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * pct / 100))]
+
+
+def run(subscriber_count, event_count, backend, rate):
+    class LoadConfig(BenchmarkConfig):
+        EVENTS_BACKEND = backend
+        EVENTS_SQLITE_PATH = os.path.join(tempfile.mkdtemp(), 'events.db')
+        EVENTS_POLL_INTERVAL = 0.05
+        SSE_HEARTBEAT_INTERVAL = 3600
+
+    app = create_benchmark_app(LoadConfig)
+
+    admin_count = max(1, int(subscriber_count * ADMIN_SHARE))
+    customer_ids = list(range(1, (subscriber_count - admin_count) // TABS_PER_CUSTOMER + 1))
+    subscribers = [topics_for(0, 'admin')] * admin_count
+    subscribers += [topics_for(customer_ids[i % len(customer_ids)], 'customer')
+                    for i in range(subscriber_count - admin_count)]
+
+    tabs = {user_id: 0 for user_id in customer_ids}
+    for i in range(subscriber_count - admin_count):
+        tabs[customer_ids[i % len(customer_ids)]] += 1
+
+    published_at = {}
+    latencies = []
+    latencies_lock = threading.Lock()
+    ready = threading.Barrier(subscriber_count + 1)
+
+    def subscriber(topics):
+        stream = events.stream(topics)
+        next(stream)  # 'retry:' preamble; the subscription is registered
+        ready.wait()
+        received = []
+        for chunk in stream:
+            now = time.perf_counter()
+            for message in chunk.split('\n\n'):
+                if message.startswith('id: '):
+                    received.append((int(message[4:message.index('\n')]), now))
+            if 'event: stop' in chunk:
+                break
+        stream.close()
+        with latencies_lock:
+            latencies.extend(now - published_at[event_id] for event_id, now in received[:-1])
+
+    threading.stack_size(256 * 1024)
+    started = time.perf_counter()
+    threads = [threading.Thread(target=subscriber, args=(topics,), daemon=True) for topics in subscribers]
+    for thread in threads:
+        thread.start()
+    ready.wait()
+    connect_seconds = time.perf_counter() - started
+    time.sleep(2)  # let every subscriber get back to waiting on its queue
+
+    with app.app_context():
+        order = {'id': '0', 'user_id': 0, 'status': 'PLACED', 'total': 24.5, 'items': [
+            {'id': str(n), 'quantity': 1, 'menuItem': {'id': n, 'name': f'Item {n}', 'price': 8.5}}
+            for n in range(3)
+        ]}
+        expected = 0
+        publish_times = []
+        for i in range(event_count):
+            user_id = random.choice(customer_ids)
+            order['id'] = str(i + 1)
+            order['user_id'] = user_id
+            t0 = time.perf_counter()
+            event_id = events.publish('created', (ALL_ORDERS_TOPIC, user_topic(user_id)), {'order': order})
+            published_at[event_id] = t0
+            publish_times.append(time.perf_counter() - t0)
+            expected += admin_count + tabs[user_id]
+            time.sleep(1 / rate)
+
+        # Final event on every topic tells each subscriber to finish
+        events.publish('stop', (ALL_ORDERS_TOPIC, *(user_topic(u) for u in customer_ids)), {})
+
+    for thread in threads:
+        thread.join(timeout=60)
+
+    print(f"Backend: {backend}, subscribers: {subscriber_count} "
+          f"({admin_count} admin dashboards, {len(customer_ids)} customers x {TABS_PER_CUSTOMER} tabs)")
+    print(f"  connect {subscriber_count} streams: {connect_seconds:.2f}s")
+    print(f"  events published:   {event_count} at ~{rate}/s")
+    print(f"  publish call:       p50 {statistics.median(publish_times) * 1000:.3f} ms, "
+          f"p99 {percentile(publish_times, 99) * 1000:.3f} ms")
+    print(f"  deliveries:         {len(latencies)} of {expected} expected")
+    if latencies:
+        print(f"  delivery latency:   p50 {percentile(latencies, 50) * 1000:.2f} ms, "
+              f"p95 {percentile(latencies, 95) * 1000:.2f} ms, p99 {percentile(latencies, 99) * 1000:.2f} ms")
+    print(f"  peak RSS:           {resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024:.0f} MB")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--subscribers', type=int, default=5000)
+    parser.add_argument('--events', type=int, default=200)
+    parser.add_argument('--rate', type=float, default=100, help='events published per second')
+    parser.add_argument('--backend', choices=('local', 'sqlite'), default='local')
+    args = parser.parse_args()
+    run(args.subscribers, args.events, args.backend, args.rate)
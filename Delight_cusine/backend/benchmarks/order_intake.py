@@ -0,0 +1,116 @@
+"""
+Order intake benchmark
+Synchronous order placement vs. the queued intake (ORDER_INTAKE_MODE=queued)
+under a burst of concurrent submissions: request latency, time until every
+order is committed, committed orders per second and transactions used.
+
+Usage:
+    python -m benchmarks.order_intake [--threads 32] [--orders 2000]
+    BENCH_DATABASE_URL=postgresql://localhost/delight_bench python -m benchmarks.order_intake
+
+Without BENCH_DATABASE_URL a temporary SQLite file (WAL) is used per mode.
+"""
+import argparse
+import os
+import tempfile
+import threading
+import time
+from benchmarks.common import create_benchmark_app, create_menu_items, create_user, database_config
+from extensions.db import db
+from models.order import Order
+from services import order_intake
+
+CART_SIZE = 3
+
+
+def percentile(samples, fraction):
+    return samples[min(int(len(samples) * fraction), len(samples) - 1)]
+
+
+def run_mode(mode, database_uri, threads, orders):
+    class IntakeConfig(database_config(database_uri)):
+        ORDER_INTAKE_MODE = mode
+
+    app = create_benchmark_app(IntakeConfig)
+    with app.app_context():
+        tokens = [create_user(f'bench{i}@example.com')[1] for i in range(threads)]
+        menu_item_ids = create_menu_items(CART_SIZE)
+
+    payload = {'items': [{'menu_item_id': item_id, 'quantity': 1} for item_id in menu_item_ids]}
+    per_thread = orders // threads
+    latencies, statuses, handles = [], [], []
+    lock = threading.Lock()
+    barrier = threading.Barrier(threads)
+
+    def worker(token):
+        client = app.test_client()
+        headers = {'Authorization': f'Bearer {token}'}
+        local_latencies, local_statuses, local_handles = [], [], []
+        barrier.wait()
+        for _ in range(per_thread):
+            started = time.perf_counter()
+            response = client.post('/api/orders', json=payload, headers=headers)
+            local_latencies.append(time.perf_counter() - started)
+            local_statuses.append(response.status_code)
+            if response.status_code == 202:
+                local_handles.append((token, response.get_json()['order']['id']))
+        with lock:
+            latencies.extend(local_latencies)
+            statuses.extend(local_statuses)
+            handles.extend(local_handles)
+
+    workers = [threading.Thread(target=worker, args=(token,)) for token in tokens]
+    started = time.perf_counter()
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+    accepted_at = time.perf_counter() - started
+
+    transactions = len(statuses)
+    if mode == 'queued':
+        with app.app_context():
+            intake = order_intake.get_queue()
+            intake.wait_idle(timeout=120)
+            transactions = intake.batches + intake.failed
+    committed_at = time.perf_counter() - started
+
+    with app.app_context():
+        committed = Order.query.count()
+
+    # Every handle resolves to its order through GET /api/orders/<handle>
+    client = app.test_client()
+    for token, handle in handles[:50]:
+        response = client.get(f'/api/orders/{handle}', headers={'Authorization': f'Bearer {token}'})
+        assert response.status_code == 200, response.get_json()
+
+    latencies.sort()
+    accepted = sum(1 for status in statuses if status in (201, 202))
+    print(f"{mode:<8} {accepted:>8} {len(statuses) - accepted:>7} {percentile(latencies, 0.5) * 1000:>8.1f} "
+          f"{percentile(latencies, 0.99) * 1000:>8.1f} {accepted_at:>10.2f} {committed_at:>11.2f} "
+          f"{committed / committed_at:>10.1f} {transactions:>7}")
+
+    with app.app_context():
+        db.drop_all()
+        with db.engine.begin() as conn:
+            conn.exec_driver_sql('DROP TABLE IF EXISTS schema_migrations')
+        db.engine.dispose()
+
+
+def run(threads, orders):
+    print(f"\n{threads} threads, {orders} orders of {CART_SIZE} items")
+    print(f"\n{'mode':<8} {'accepted':>8} {'failed':>7} {'p50 ms':>8} {'p99 ms':>8} {'accepted s':>10} "
+          f"{'committed s':>11} {'orders/s':>10} {'commits':>7}")
+
+    database_uri = os.getenv('BENCH_DATABASE_URL')
+    directory = tempfile.mkdtemp()
+    for mode in ('sync', 'queued'):
+        run_mode(mode, database_uri or f"sqlite:///{os.path.join(directory, f'{mode}.db')}", threads, orders)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--threads', type=int, default=32)
+    parser.add_argument('--orders', type=int, default=2000)
+    args = parser.parse_args()
+    run(args.threads, args.orders)
@@ -0,0 +1,48 @@
+"""
+Order listing query benchmark
+Shows that SQL statements per GET /api/orders/all stay flat as the number
+of orders (and items per order) grows
+
+Usage:
+    python -m benchmarks.order_listing
+"""
+import time
+from benchmarks.common import QueryCounter, create_benchmark_app, create_menu_items, create_orders, create_user
+from extensions.db import db
+
+ORDER_COUNTS = [10, 100, 500, 2000]
+ITEMS_PER_ORDER = 4
+
+
+def run():
+    app = create_benchmark_app()
+    client = app.test_client()
+    counter = QueryCounter()
+
+    with app.app_context():
+        _, token = create_user('admin@example.com', role='admin')
+        customer, _ = create_user()
+        customer_id = customer.id
+        menu_item_ids = create_menu_items(20)
+        engine = db.engine
+
+    headers = {'Authorization': f'Bearer {token}'}
+
+    print(f"\n{'orders':>8} {'queries':>8} {'ms':>10}")
+    created = 0
+    for order_count in ORDER_COUNTS:
+        with app.app_context():
+            create_orders(customer_id, menu_item_ids, order_count - created, ITEMS_PER_ORDER)
+        created = order_count
+
+        started = time.perf_counter()
+        with counter.watch(engine):
+            response = client.get('/api/orders/all', headers=headers)
+        elapsed = time.perf_counter() - started
+        assert response.status_code == 200 and response.get_json()['count'] == order_count
+
+        print(f"{order_count:>8} {counter.count:>8} {elapsed * 1000:>10.1f}")
+
+
+if __name__ == '__main__':
+    run()
@@ -0,0 +1,48 @@
+"""
+Order placement query benchmark
+Shows that SQL statements per POST /api/orders stay flat as cart size grows
+
+Usage:
+    python -m benchmarks.order_queries
+"""
+import time
+from benchmarks.common import QueryCounter, create_benchmark_app, create_menu_items, create_user
+from extensions.db import db
+
+CART_SIZES = [1, 5, 15, 30, 60]
+ORDERS_PER_SIZE = 20
+
+
+def run():
+    app = create_benchmark_app()
+    client = app.test_client()
+    counter = QueryCounter()
+
+    with app.app_context():
+        _, token = create_user()
+        menu_item_ids = create_menu_items(max(CART_SIZES))
+        engine = db.engine
+
+    headers = {'Authorization': f'Bearer {token}'}
+
+    print(f"\n{'cart lines':>10} {'queries/order':>14} {'ms/order':>10}")
+    for size in CART_SIZES:
+        payload = {
+            'items': [{'menu_item_id': item_id, 'quantity': 2} for item_id in menu_item_ids[:size]],
+            'delivery_address': '1 Benchmark Way'
+        }
+
+        queries = 0
+        started = time.perf_counter()
+        for _ in range(ORDERS_PER_SIZE):
+            with counter.watch(engine):
+                response = client.post('/api/orders', json=payload, headers=headers)
+            assert response.status_code == 201, response.get_json()
+            queries += counter.count
+        elapsed = time.perf_counter() - started
+
+        print(f"{size:>10} {queries / ORDERS_PER_SIZE:>14.1f} {elapsed * 1000 / ORDERS_PER_SIZE:>10.2f}")
+
+
+if __name__ == '__main__':
+    run()
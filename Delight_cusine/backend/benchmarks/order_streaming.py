@@ -0,0 +1,62 @@
+"""
+Order listing memory / time-to-first-byte benchmark
+Compares the full JSON listing with keyset pages and NDJSON streaming
+
+Usage:
+    python -m benchmarks.order_streaming
+"""
+import time
+import tracemalloc
+from benchmarks.common import create_benchmark_app, create_menu_items, create_orders, create_user
+
+ORDER_COUNTS = [1000, 5000, 10000]
+MODES = {
+    'full': '/api/orders/all',
+    'page': '/api/orders/all?limit=50',
+    'ndjson': '/api/orders/all?stream=ndjson',
+}
+
+
+def measure(client, url, headers):
+    """Return (time to first byte ms, total ms, peak traced MB) for one request"""
+    tracemalloc.start()
+    started = time.perf_counter()
+    response = client.get(url, headers=headers, buffered=False)
+    chunks = iter(response.response)
+    next(chunks)
+    first_byte = time.perf_counter() - started
+    for _ in chunks:
+        pass
+    total = time.perf_counter() - started
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    response.close()
+    return first_byte * 1000, total * 1000, peak / 1024 / 1024
+
+
+def run():
+    app = create_benchmark_app()
+    client = app.test_client()
+
+    with app.app_context():
+        _, token = create_user('admin@example.com', role='admin')
+        customer, _ = create_user()
+        customer_id = customer.id
+        menu_item_ids = create_menu_items(20)
+
+    headers = {'Authorization': f'Bearer {token}'}
+
+    print(f"\n{'orders':>8} {'mode':>8} {'ttfb ms':>10} {'total ms':>10} {'peak MB':>9}")
+    created = 0
+    for order_count in ORDER_COUNTS:
+        with app.app_context():
+            create_orders(customer_id, menu_item_ids, order_count - created, 3)
+        created = order_count
+
+        for mode, url in MODES.items():
+            ttfb, total, peak = measure(client, url, headers)
+            print(f"{order_count:>8} {mode:>8} {ttfb:>10.1f} {total:>10.1f} {peak:>9.1f}")
+
+
+if __name__ == '__main__':
+    run()
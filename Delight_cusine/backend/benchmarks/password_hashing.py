@@ -0,0 +1,131 @@
+"""
+Password hashing benchmark
+Logins hashing inline in request threads vs. on the bounded KDF process pool:
+login latency and throughput, 429s, and GET /api/menu latency for clients
+browsing the menu during the login burst.
+
+Usage:
+    python -m benchmarks.password_hashing [--login-threads 16] [--menu-threads 4] [--seconds 10]
+"""
+import argparse
+import os
+import tempfile
+import threading
+import time
+from benchmarks.common import BenchmarkConfig, create_benchmark_app, create_menu_items, create_user, database_config
+from extensions.db import db
+from models.user import User
+from services import passwords
+
+
+def percentile(samples, fraction):
+    if not samples:
+        return float('nan')
+    samples = sorted(samples)
+    return samples[min(int(len(samples) * fraction), len(samples) - 1)]
+
+
+def run_mode(label, workers, max_pending, login_threads, menu_threads, seconds):
+    class HashingConfig(database_config(f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'bench.db')}")):
+        PASSWORD_HASH_WORKERS = workers
+        PASSWORD_HASH_MAX_PENDING = max_pending
+
+    app = create_benchmark_app(HashingConfig)
+    with app.app_context():
+        for i in range(login_threads):
+            create_user(f'login{i}@example.com')
+        create_menu_items(50)
+
+    logins, rejected, menus = [], [], []
+    lock = threading.Lock()
+    stop = threading.Event()
+
+    def login_worker(i):
+        client = app.test_client()
+        payload = {'email': f'login{i}@example.com', 'password': 'benchmark'}
+        local, local_rejected = [], 0
+        while not stop.is_set():
+            started = time.perf_counter()
+            response = client.post('/api/auth/login', json=payload)
+            if response.status_code == 429:
+                local_rejected += 1
+                time.sleep(float(response.headers['Retry-After']) / 10)
+                continue
+            assert response.status_code == 200, response.get_json()
+            local.append(time.perf_counter() - started)
+        with lock:
+            logins.extend(local)
+            rejected.append(local_rejected)
+
+    def menu_worker():
+        client = app.test_client()
+        local = []
+        while not stop.is_set():
+            started = time.perf_counter()
+            assert client.get('/api/menu').status_code == 200
+            local.append(time.perf_counter() - started)
+        with lock:
+            menus.extend(local)
+
+    # Warm the menu cache and the pool (children start on first use)
+    client = app.test_client()
+    client.get('/api/menu')
+    client.post('/api/auth/login', json={'email': 'login0@example.com', 'password': 'benchmark'})
+
+    threads = [threading.Thread(target=login_worker, args=(i,)) for i in range(login_threads)]
+    threads += [threading.Thread(target=menu_worker) for _ in range(menu_threads)]
+    for thread in threads:
+        thread.start()
+    time.sleep(seconds)
+    stop.set()
+    for thread in threads:
+        thread.join()
+
+    print(f"{label:<16} {len(logins) / seconds:>9.1f} {sum(rejected):>6} "
+          f"{percentile(logins, 0.5) * 1000:>8.0f} {percentile(logins, 0.99) * 1000:>8.0f} "
+          f"{len(menus) / seconds:>8.0f} {percentile(menus, 0.5) * 1000:>8.1f} {percentile(menus, 0.99) * 1000:>8.1f}")
+
+    with app.app_context():
+        passwords.get_hasher().shutdown()
+        db.engine.dispose()
+
+
+def check_rehash():
+    """A login after PASSWORD_HASH_METHOD changes stores a hash with the new method"""
+    class OldConfig(BenchmarkConfig):
+        PASSWORD_HASH_WORKERS = 0
+        PASSWORD_HASH_METHOD = 'scrypt:16384:8:1'
+
+    app = create_benchmark_app(OldConfig)
+    with app.app_context():
+        user, _ = create_user('rehash@example.com')
+        before = user.password.split('$', 1)[0]
+
+    client = app.test_client()
+    response = client.post('/api/auth/login', json={'email': 'rehash@example.com', 'password': 'benchmark'})
+    assert response.status_code == 200, response.get_json()
+    with app.app_context():
+        after = db.session.get(User, user.id).password.split('$', 1)[0]
+    assert after == 'scrypt:16384:8:1', after
+    response = client.post('/api/auth/login', json={'email': 'rehash@example.com', 'password': 'benchmark'})
+    assert response.status_code == 200
+    print(f"\nrehash on login: {before} -> {after}")
+
+
+def run(login_threads, menu_threads, seconds):
+    print(f"\n{login_threads} login threads, {menu_threads} menu threads, {seconds} s per mode")
+    print(f"\n{'mode':<16} {'logins/s':>9} {'429s':>6} {'p50 ms':>8} {'p99 ms':>8} "
+          f"{'menu/s':>8} {'menu p50':>8} {'menu p99':>8}")
+    run_mode('menu only', 0, 1, 0, menu_threads, seconds)
+    run_mode('inline', 0, 1000, login_threads, menu_threads, seconds)
+    run_mode('pool', 1, 4, login_threads, menu_threads, seconds)
+    check_rehash()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--login-threads', type=int, default=16)
+    parser.add_argument('--menu-threads', type=int, default=4)
+    parser.add_argument('--seconds', type=float, default=10)
+    args = parser.parse_args()
+    run(args.login_threads, args.menu_threads, args.seconds)
@@ -0,0 +1,97 @@
+"""
+Query plan regression check
+Calls the order and menu listing endpoints, captures every SELECT they
+issue and runs EXPLAIN QUERY PLAN on it. Exits non-zero if any statement
+falls back to a full table scan on orders, order_items or menu_items.
+
+Usage:
+    python -m benchmarks.query_plans
+"""
+import sys
+from sqlalchemy import event
+from benchmarks.common import create_benchmark_app, create_menu_items, create_orders, create_user
+from extensions.db import db
+
+CHECKED_TABLES = ('orders', 'order_items', 'menu_items')
+
+# Statements that aggregate a whole table by design
+ALLOWED_SCANS = (
+    'max(menu_items.updated_at)',  # menu ETag state, computed once per menu version
+)
+
+# (description, url, as admin)
+ENDPOINTS = [
+    ('customer orders', '/api/orders', False),
+    ('customer orders by status', '/api/orders?status=PLACED', False),
+    ('customer orders page', '/api/orders?limit=20', False),
+    ('admin orders', '/api/orders/all?limit=20', True),
+    ('admin orders by status', '/api/orders/all?status=PLACED&limit=20', True),
+    ('admin orders by user', '/api/orders/all?user_id=3&limit=20', True),
+    ('admin orders by user + status', '/api/orders/all?user_id=3&status=PLACED&limit=20', True),
+    ('menu by category', '/api/menu?category=main&available=true', False),
+]
+
+
+def full_scans(plan_rows):
+    """Return plan details that scan a checked table without an index"""
+    scans = []
+    for row in plan_rows:
+        detail = row[-1]
+        for table in CHECKED_TABLES:
+            if detail == f'SCAN {table}' or detail.startswith(f'SCAN {table} ') and 'INDEX' not in detail:
+                scans.append(detail)
+    return scans
+
+
+def run():
+    app = create_benchmark_app()
+    client = app.test_client()
+    statements = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith('SELECT') and not any(
+                allowed in statement for allowed in ALLOWED_SCANS):
+            statements.append((statement, parameters))
+
+    with app.app_context():
+        _, admin_token = create_user('admin@example.com', role='admin')
+        # Realistic selectivity: one customer among many, one category among many
+        menu_item_ids = []
+        for category in ('main', 'appetizer', 'dessert', 'beverage', 'side', 'salad', 'soup', 'kids'):
+            menu_item_ids += create_menu_items(50, category)
+        for i in range(10):
+            customer, customer_token = create_user(f'customer{i}@example.com')
+            create_orders(customer.id, menu_item_ids, 200, 3)
+        db.session.execute(db.text('ANALYZE'))
+        engine = db.engine
+
+    failures = 0
+    for description, url, as_admin in ENDPOINTS:
+        token = admin_token if as_admin else customer_token
+        statements.clear()
+
+        event.listen(engine, 'before_cursor_execute', capture)
+        try:
+            # Bypass the menu cache so the SELECTs actually run
+            with app.app_context():
+                app.extensions['cache'].bump_version('menu')
+            response = client.get(url, headers={'Authorization': f'Bearer {token}'})
+        finally:
+            event.remove(engine, 'before_cursor_execute', capture)
+        assert response.status_code == 200, (url, response.status_code)
+
+        with engine.connect() as conn:
+            scans = []
+            for statement, parameters in statements:
+                plan = conn.exec_driver_sql(f'EXPLAIN QUERY PLAN {statement}', parameters).fetchall()
+                scans.extend(full_scans(plan))
+
+        status = 'FULL SCAN: ' + '; '.join(scans) if scans else 'ok'
+        failures += bool(scans)
+        print(f"{description:<32} {status}")
+
+    return failures
+
+
+if __name__ == '__main__':
+    sys.exit(1 if run() else 0)
@@ -0,0 +1,128 @@
+"""
+Rate limit benchmark
+Credential stuffing against POST /api/auth/login, without and with the login
+rate limits, from one address and spread over many: password hashes computed,
+attempts rejected, latency of a rejection, and a legitimate user's login from
+another address during the attack. Also the cost of one limit check per store
+backend.
+
+Usage:
+    python -m benchmarks.rate_limit [--threads 8] [--seconds 5]
+"""
+import argparse
+import os
+import statistics
+import tempfile
+import threading
+import time
+from benchmarks.common import BenchmarkConfig, create_benchmark_app, create_user
+from extensions.rate_limit import limiter
+
+ATTACKER = '203.0.113.{}'
+USER = '198.51.100.20'
+CHECK_ROUNDS = 20000
+
+
+def percentile(samples, fraction):
+    if not samples:
+        return float('nan')
+    samples = sorted(samples)
+    return samples[min(int(len(samples) * fraction), len(samples) - 1)]
+
+
+def run_attack(label, enabled, spread, threads, seconds):
+    class AttackConfig(BenchmarkConfig):
+        RATE_LIMIT_ENABLED = enabled
+        PASSWORD_HASH_WORKERS = 0
+        PASSWORD_HASH_MAX_PENDING = 1000
+
+    app = create_benchmark_app(AttackConfig)
+    with app.app_context():
+        create_user('victim@example.com')
+        create_user('customer@example.com')
+
+    outcomes, rejections, legit = [], [], []
+    lock = threading.Lock()
+    stop = threading.Event()
+
+    def attacker(i):
+        client = app.test_client()
+        local, local_rejections = [], []
+        attempt = 0
+        while not stop.is_set():
+            attempt += 1
+            started = time.perf_counter()
+            address = ATTACKER.format(attempt % 250 if spread else 7)
+            response = client.post('/api/auth/login', environ_base={'REMOTE_ADDR': address},
+                                   json={'email': 'victim@example.com', 'password': f'guess-{i}-{attempt}'})
+            if response.status_code == 429:
+                local_rejections.append(time.perf_counter() - started)
+            local.append(response.status_code)
+        with lock:
+            outcomes.extend(local)
+            rejections.extend(local_rejections)
+
+    def customer():
+        client = app.test_client()
+        while not stop.is_set():
+            started = time.perf_counter()
+            response = client.post('/api/auth/login', environ_base={'REMOTE_ADDR': USER},
+                                   json={'email': 'customer@example.com', 'password': 'benchmark'})
+            assert response.status_code == 200, response.get_json()
+            legit.append(time.perf_counter() - started)
+            time.sleep(1.5)  # within the account limit
+
+    workers = [threading.Thread(target=attacker, args=(i,)) for i in range(threads)]
+    workers.append(threading.Thread(target=customer))
+    for thread in workers:
+        thread.start()
+    time.sleep(seconds)
+    stop.set()
+    for thread in workers:
+        thread.join()
+
+    hashed = sum(1 for status in outcomes if status == 401)
+    rejected = sum(1 for status in outcomes if status == 429)
+    print(f"{label:<10} {len(outcomes):>9} {hashed:>7} {rejected:>9} "
+          f"{percentile(rejections, 0.5) * 1e6:>12.0f} {percentile(legit, 0.5) * 1000:>14.1f}")
+
+
+def time_checks(backend):
+    class CheckConfig(BenchmarkConfig):
+        RATE_LIMIT_ENABLED = True
+        RATE_LIMIT_BACKEND = backend
+        RATE_LIMIT_SQLITE_PATH = os.path.join(tempfile.mkdtemp(), 'rate_limits.db')
+        RATE_LIMITS = {'bench': {'ip': '1000000/second'}}
+
+    app = create_benchmark_app(CheckConfig)
+    samples = []
+    with app.test_request_context('/', environ_base={'REMOTE_ADDR': USER}):
+        for _ in range(CHECK_ROUNDS):
+            started = time.perf_counter()
+            limiter.check('bench')
+            samples.append((time.perf_counter() - started) * 1e6)
+    samples.sort()
+    print(f"{backend:<8} {statistics.median(samples):>8.1f} {percentile(samples, 0.99):>8.1f}")
+
+
+def run(threads, seconds):
+    limits = BenchmarkConfig.RATE_LIMITS['login']
+    print(f"\n{threads} attacker threads for {seconds} s, login limits "
+          f"{limits['ip']} per address, {limits['account']} per account")
+    print(f"\n{'limit':<10} {'attempts':>9} {'hashed':>7} {'rejected':>9} {'reject p50 µs':>12} "
+          f"{'user login ms':>14}")
+    run_attack('off', False, False, threads, seconds)
+    run_attack('on', True, False, threads, seconds)
+    run_attack('on/spread', True, True, threads, seconds)
+
+    print(f"\n{'store':<8} {'check p50 µs':>8} {'p99 µs':>8}")
+    for backend in ('memory', 'sqlite'):
+        time_checks(backend)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--threads', type=int, default=8)
+    parser.add_argument('--seconds', type=float, default=5)
+    args = parser.parse_args()
+    run(args.threads, args.seconds)
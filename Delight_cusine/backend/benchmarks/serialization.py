@@ -0,0 +1,78 @@
+"""
+Serialization benchmark
+ORM objects + to_dict() + jsonify vs. column tuples + utils.serializers
+for order and menu listings. Also checks both paths produce identical JSON.
+
+Usage:
+    python -m benchmarks.serialization
+"""
+import json
+import time
+from flask import jsonify
+from benchmarks.common import create_benchmark_app, create_menu_items, create_orders, create_user
+from models.menu import MenuItem
+from models.order import Order
+from utils import serializers
+from utils.pagination import keyset_order
+
+ORDER_COUNT = 2000
+ITEMS_PER_ORDER = 4
+MENU_ITEM_COUNT = 500
+ROUNDS = 5
+
+
+def to_dict_orders():
+    orders = keyset_order(Order.query.options(*Order.loader_options('list')), Order).all()
+    return jsonify({'orders': [order.to_dict() for order in orders], 'count': len(orders)}).get_data()
+
+
+def tuple_orders():
+    rows = keyset_order(Order.query.with_entities(*serializers.ORDER_COLUMNS), Order).all()
+    orders = serializers.orders(rows)
+    return serializers.dumps({'orders': orders, 'count': len(orders)})
+
+
+def to_dict_menu():
+    items = MenuItem.query.filter_by(is_deleted=False).all()
+    return jsonify({'menu_items': [item.to_dict() for item in items], 'count': len(items)}).get_data()
+
+
+def tuple_menu():
+    items = serializers.menu_items(MenuItem.query.filter_by(is_deleted=False))
+    return serializers.dumps({'menu_items': items, 'count': len(items)})
+
+
+def best_of(fn, session):
+    best = float('inf')
+    for _ in range(ROUNDS):
+        session.expunge_all()
+        started = time.perf_counter()
+        body = fn()
+        best = min(best, time.perf_counter() - started)
+    return best, body
+
+
+def run():
+    app = create_benchmark_app()
+    with app.app_context(), app.test_request_context():
+        from extensions.db import db
+        customer, _ = create_user()
+        menu_item_ids = create_menu_items(MENU_ITEM_COUNT)
+        create_orders(customer.id, menu_item_ids, ORDER_COUNT, ITEMS_PER_ORDER)
+
+        print(f"\n{'listing':<28} {'to_dict ms':>11} {'tuples ms':>10} {'speedup':>8} {'identical':>10}")
+        cases = [
+            (f'orders ({ORDER_COUNT} x {ITEMS_PER_ORDER} items)', to_dict_orders, tuple_orders),
+            (f'menu ({MENU_ITEM_COUNT} items)', to_dict_menu, tuple_menu),
+        ]
+        for name, reference, fast in cases:
+            reference_time, reference_body = best_of(reference, db.session)
+            fast_time, fast_body = best_of(fast, db.session)
+            identical = json.loads(reference_body) == json.loads(fast_body)
+            print(f"{name:<28} {reference_time * 1000:>11.1f} {fast_time * 1000:>10.1f} "
+                  f"{reference_time / fast_time:>7.1f}x {str(identical):>10}")
+            assert identical, f'{name}: serializers diverge from to_dict()'
+
+
+if __name__ == '__main__':
+    run()
@@ -0,0 +1,57 @@
+"""
+Application startup benchmark
+Time and SQL statements for create_app() in fast-start mode, with the
+schema version check, and with the former create_all() + seed on boot
+
+Usage:
+    python -m benchmarks.startup
+"""
+import os
+import tempfile
+import time
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from benchmarks.common import create_benchmark_app, database_config
+from extensions.db import db
+from seed_data import seed_menu_items
+
+RUNS = 50
+
+
+def run():
+    path = os.path.join(tempfile.mkdtemp(), 'startup.db')
+    database_uri = f'sqlite:///{path}'
+
+    # Create and migrate the database once, as a deploy would
+    create_benchmark_app(database_config(database_uri))
+
+    statements = []
+
+    def count(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(Engine, 'before_cursor_execute', count)
+
+    print(f"\n{'mode':>18} {'ms/boot':>10} {'queries/boot':>13}")
+    for mode in ('create_all + seed', 'checked', 'fast start'):
+        class Config(database_config(database_uri)):
+            FAST_START = mode == 'fast start'
+            MIGRATE_ON_START = False
+
+        statements.clear()
+        started = time.perf_counter()
+        for _ in range(RUNS):
+            app = create_benchmark_app(Config)
+            if mode == 'create_all + seed':
+                with app.app_context():
+                    db.create_all()
+                    seed_menu_items()
+        elapsed = time.perf_counter() - started
+
+        print(f"{mode:>18} {elapsed * 1000 / RUNS:>10.2f} {len(statements) / RUNS:>13.1f}")
+
+    event.remove(Engine, 'before_cursor_execute', count)
+
+
+if __name__ == '__main__':
+    run()
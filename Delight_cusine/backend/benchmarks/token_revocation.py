@@ -0,0 +1,86 @@
+"""
+Token revocation benchmark
+Cost of the revocation check on every authenticated request: bloom filter
+check vs. a primary-key query on revoked_tokens, the filter's measured
+false-positive rate and size, rebuild time, and GET /api/auth/me end to end.
+
+Usage:
+    python -m benchmarks.token_revocation [--revoked 100000]
+"""
+import argparse
+import statistics
+import time
+import uuid
+from datetime import datetime, timedelta
+from benchmarks.common import create_benchmark_app, create_user
+from extensions.db import db
+from models.token import RevokedToken
+from services import token_revocation
+
+ROUNDS = 20000
+
+
+def seed(count):
+    now = datetime.utcnow()
+    rows = [{
+        'jti': str(uuid.uuid4()),
+        'user_id': 1,
+        'token_type': 'refresh',
+        'revoked_at': now - timedelta(hours=2),
+        'expires_at': now + timedelta(days=30),
+    } for _ in range(count)]
+    db.session.execute(RevokedToken.__table__.insert(), rows)
+    db.session.commit()
+    return [row['jti'] for row in rows]
+
+
+def timed_us(fn, rounds):
+    samples = []
+    for _ in range(rounds):
+        started = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - started) * 1e6)
+    samples.sort()
+    return statistics.median(samples), samples[int(len(samples) * 0.99)]
+
+
+def run(count):
+    app = create_benchmark_app()
+    with app.app_context():
+        revoked = seed(count)
+        _, token = create_user()
+        store = token_revocation.get_store()
+
+        started = time.perf_counter()
+        store.rebuild()
+        print(f"\nfilter build ({count} revoked tokens): {(time.perf_counter() - started) * 1000:.1f} ms, "
+              f"{len(store._filter._bits) / 1024:.0f} KiB, {store._filter.hashes} hashes")
+
+        live = [str(uuid.uuid4()) for _ in range(ROUNDS)]
+        false_positives = sum(1 for jti in live if jti in store._filter)
+        assert all(jti in store._filter for jti in revoked)
+        print(f"false positives: {false_positives}/{ROUNDS} live tokens ({false_positives / ROUNDS:.2%})")
+
+        jtis = iter(live * 2)
+        p50, p99 = timed_us(lambda: store.is_revoked(next(jtis)), ROUNDS)
+        print(f"\n{'check':<36} {'p50 µs':>8} {'p99 µs':>8}")
+        print(f"{'is_revoked (live token)':<36} {p50:>8.1f} {p99:>8.1f}")
+
+        revoked_iter = iter(revoked * 2)
+        p50, p99 = timed_us(lambda: store.is_revoked(next(revoked_iter)), min(ROUNDS, count))
+        print(f"{'is_revoked (revoked, first check)':<36} {p50:>8.1f} {p99:>8.1f}")
+
+        p50, p99 = timed_us(lambda: db.session.get(RevokedToken, next(jtis)), ROUNDS)
+        print(f"{'primary-key query per request':<36} {p50:>8.1f} {p99:>8.1f}")
+
+    client = app.test_client()
+    headers = {'Authorization': f'Bearer {token}'}
+    client.get('/api/auth/me', headers=headers)
+    p50, p99 = timed_us(lambda: client.get('/api/auth/me', headers=headers), 2000)
+    print(f"\nGET /api/auth/me: p50 {p50 / 1000:.2f} ms, p99 {p99 / 1000:.2f} ms")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--revoked', type=int, default=100000)
+    run(parser.parse_args().revoked)
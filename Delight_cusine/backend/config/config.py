@@ -3,8 +3,75 @@ Application configuration module
 Loads environment variables and configures Flask app
 """
 import os
+import tempfile
 from datetime import timedelta
 
+# Connection pool profiles for server databases (PostgreSQL/MySQL), per FLASK_ENV
+ENGINE_PROFILES = {
+    'development': {
+        'pool_size': 5,
+        'max_overflow': 5,
+        'pool_timeout': 10,
+        'pool_recycle': 1800,
+        'pool_pre_ping': True,
+    },
+    'testing': {
+        'pool_size': 2,
+        'max_overflow': 0,
+        'pool_timeout': 5,
+        'pool_pre_ping': False,
+    },
+    'production': {
+        'pool_size': 10,
+        'max_overflow': 20,
+        'pool_timeout': 30,
+        'pool_recycle': 1800,
+        'pool_pre_ping': True,
+    },
+}
+
+# SQLite file databases: WAL lets readers run alongside the single writer,
+# and busy_timeout makes concurrent writers queue instead of failing with
+# "database is locked". Applied to every new connection (see extensions/db.py).
+SQLITE_PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'busy_timeout': 30000,
+    'cache_size': -16000,
+    'temp_store': 'MEMORY',
+}
+
+
+def engine_options(database_uri, env):
+    """
+    Build SQLALCHEMY_ENGINE_OPTIONS for a database and environment
+
+    Args:
+        database_uri: SQLAlchemy database URI
+        env: FLASK_ENV value selecting the pool profile
+
+    Returns:
+        Dictionary of create_engine keyword arguments
+    """
+    if database_uri.startswith('sqlite'):
+        # In-memory databases use a single static connection
+        if database_uri in ('sqlite://', 'sqlite:///:memory:'):
+            return {}
+
+        # One writer at a time; the pool only needs to serve readers
+        return {
+            'pool_size': int(os.getenv('DB_POOL_SIZE', 8)),
+            'max_overflow': int(os.getenv('DB_MAX_OVERFLOW', 8)),
+            'pool_timeout': 30,
+            'connect_args': {'timeout': SQLITE_PRAGMAS['busy_timeout'] / 1000},
+        }
+
+    options = dict(ENGINE_PROFILES.get(env, ENGINE_PROFILES['production']))
+    options['pool_size'] = int(os.getenv('DB_POOL_SIZE', options['pool_size']))
+    options['max_overflow'] = int(os.getenv('DB_MAX_OVERFLOW', options['max_overflow']))
+    return options
+
+
 class Config:
     """Base configuration class"""
 
@@ -15,7 +82,24 @@ class Config:
     # Database
     SQLALCHEMY_DATABASE_URI = os.getenv('DATABASE_URL', 'sqlite:///delight_cuisine.db')
     SQLALCHEMY_TRACK_MODIFICATIONS = False
-    SQLALCHEMY_ECHO = FLASK_ENV == 'development'
+    SQLALCHEMY_ENGINE_OPTIONS = engine_options(SQLALCHEMY_DATABASE_URI, FLASK_ENV)
+    SQLITE_PRAGMAS = SQLITE_PRAGMAS
+
+    # Skip every startup database query (schema check included); for production workers
+    FAST_START = os.getenv('FAST_START', str(FLASK_ENV != 'development')).lower() == 'true'
+
+    # Apply pending migrations at startup (development); otherwise run `flask db upgrade`
+    MIGRATE_ON_START = os.getenv('MIGRATE_ON_START', str(FLASK_ENV == 'development')).lower() == 'true'
+
+    # Statement logging serializes every request on stdout; opt in when debugging
+    SQLALCHEMY_ECHO = os.getenv('SQLALCHEMY_ECHO', 'false').lower() == 'true'
+
+    # Per-request SQL/serialization timing: Server-Timing headers and a Prometheus endpoint.
+    # Disabled, it registers nothing and costs nothing.
+    INSTRUMENTATION_ENABLED = os.getenv('INSTRUMENTATION_ENABLED', 'false').lower() == 'true'
+    METRICS_PATH = os.getenv('METRICS_PATH', '/api/metrics')
+    # Bearer token scrapers must send to METRICS_PATH; the metrics are not served without one
+    METRICS_TOKEN = os.getenv('METRICS_TOKEN', '')
 
     # JWT Configuration
     JWT_SECRET_KEY = os.getenv('JWT_SECRET_KEY', 'dev-jwt-secret-please-change')
@@ -30,6 +114,120 @@ class Config:
     JWT_HEADER_NAME = 'Authorization'
     JWT_HEADER_TYPE = 'Bearer'
 
-    # API Configuration
+    # Revoked tokens (logout revokes; refresh tokens rotate through refresh_families): bloom
+    # filter sizing per worker, and how often each worker's background thread syncs other workers' revocations
+    TOKEN_REVOCATION_BLOOM_CAPACITY = int(os.getenv('TOKEN_REVOCATION_BLOOM_CAPACITY', 100000))
+    TOKEN_REVOCATION_BLOOM_ERROR_RATE = float(os.getenv('TOKEN_REVOCATION_BLOOM_ERROR_RATE', 0.01))
+    TOKEN_REVOCATION_SYNC_INTERVAL = float(os.getenv('TOKEN_REVOCATION_SYNC_INTERVAL', 1.0))
+
+    # Rate limits per rule and scope ('ip': client address, 'user': JWT identity, 'account': email a login
+    # or registration targets), as N/second|minute|hour|day; an empty value disables that limit. 'ip' is
+    # checked before the request body is parsed, 'account' right after; both before a password is hashed.
+    RATE_LIMIT_ENABLED = os.getenv('RATE_LIMIT_ENABLED', 'true').lower() == 'true'
+    RATE_LIMITS = {
+        'login': {
+            'ip': os.getenv('RATE_LIMIT_LOGIN_IP', '10/minute'),
+            'account': os.getenv('RATE_LIMIT_LOGIN_ACCOUNT', '5/minute'),
+        },
+        'register': {
+            'ip': os.getenv('RATE_LIMIT_REGISTER_IP', '10/hour'),
+            'account': os.getenv('RATE_LIMIT_REGISTER_ACCOUNT', '5/hour'),
+        },
+        'create_order': {
+            'ip': os.getenv('RATE_LIMIT_ORDERS_IP', '120/minute'),
+            'user': os.getenv('RATE_LIMIT_ORDERS_USER', '20/minute'),
+        },
+    }
+    # Buckets: 'memory' (per worker) or 'sqlite' (shared by all workers on the host)
+    RATE_LIMIT_BACKEND = os.getenv('RATE_LIMIT_BACKEND', 'memory')
+    RATE_LIMIT_SQLITE_PATH = os.getenv('RATE_LIMIT_SQLITE_PATH', os.path.join(tempfile.gettempdir(), 'delight_cuisine_rate_limits.db'))
+    # Reverse proxies in front of the app; the client address is then read from X-Forwarded-For
+    RATE_LIMIT_PROXY_COUNT = int(os.getenv('RATE_LIMIT_PROXY_COUNT', 0))
+
+    # Password hashing: werkzeug method with its cost ('pbkdf2:sha256:600000', 'scrypt:32768:8:1').
+    # Changing it rehashes each user's password at their next login.
+    PASSWORD_HASH_METHOD = os.getenv('PASSWORD_HASH_METHOD', 'pbkdf2:sha256:600000')
+    # KDF processes per worker process (0 hashes in the request thread), hashing calls allowed
+    # to run or wait before logins get 429, and the longest wait for a result (seconds)
+    PASSWORD_HASH_WORKERS = int(os.getenv('PASSWORD_HASH_WORKERS', 1))
+    PASSWORD_HASH_MAX_PENDING = int(os.getenv('PASSWORD_HASH_MAX_PENDING', 16))
+    PASSWORD_HASH_TIMEOUT = float(os.getenv('PASSWORD_HASH_TIMEOUT', 10))
+
+    # How long an authenticated user's snapshot is cached (seconds)
+    USER_CACHE_TTL = int(os.getenv('USER_CACHE_TTL', 60))
+
+    # Cache: 'lru' (per process), 'sqlite' (shared by all workers on the host) or 'null'
+    CACHE_BACKEND = os.getenv('CACHE_BACKEND', 'lru')
+    CACHE_LRU_SIZE = int(os.getenv('CACHE_LRU_SIZE', 1024))
+    CACHE_SQLITE_PATH = os.getenv('CACHE_SQLITE_PATH', os.path.join(tempfile.gettempdir(), 'delight_cuisine_cache.db'))
+
+    # Expiry of cached menu responses and ETag state. Writes invalidate immediately on every
+    # worker with the shared 'sqlite' cache, so its TTL is only a safety net; with the
+    # per-process 'lru' cache it bounds how long other workers serve the old menu.
+    MENU_CACHE_TTL = int(os.getenv('MENU_CACHE_TTL', 3600 if CACHE_BACKEND == 'sqlite' else 5))
+
+    # Menu bulk import: rows validated and written per batch, and the upload size limit.
+    # MENU_CATEGORIES (comma-separated) restricts imported categories; empty allows any.
+    MENU_IMPORT_BATCH_SIZE = int(os.getenv('MENU_IMPORT_BATCH_SIZE', 500))
+    MENU_IMPORT_MAX_ROWS = int(os.getenv('MENU_IMPORT_MAX_ROWS', 10000))
+    MENU_CATEGORIES = [c.strip() for c in os.getenv('MENU_CATEGORIES', '').split(',') if c.strip()]
+
+    # Menu search index: longest time before a worker picks up menu writes made by other workers
+    MENU_SEARCH_SYNC_INTERVAL = float(os.getenv('MENU_SEARCH_SYNC_INTERVAL', 5))
+    MENU_SEARCH_LIMIT_MAX = int(os.getenv('MENU_SEARCH_LIMIT_MAX', 50))
+
+    # Restaurant status: cache lifetime bounds how long another worker's change
+    # can go unseen with the per-process 'lru' cache (the 'sqlite' cache is shared)
+    RESTAURANT_STATUS_CACHE_TTL = int(os.getenv('RESTAURANT_STATUS_CACHE_TTL', 5))
+
+    # Whether clients should hold Server-Sent Event streams open (advertised by /api/health).
+    # Each stream holds a sync worker, so leave it off under gunicorn sync workers; asgi.py
+    # always turns it on, and threaded workers (gunicorn -k gthread) can set it.
+    SSE_ENABLED = os.getenv('SSE_ENABLED', 'false').lower() == 'true'
+    # Server-Sent Events: how often streams re-check for changes, and keep-alive interval
+    SSE_POLL_INTERVAL = float(os.getenv('SSE_POLL_INTERVAL', 1.0))
+    SSE_HEARTBEAT_INTERVAL = float(os.getenv('SSE_HEARTBEAT_INTERVAL', 15))
+
+    # Lifetime of the tickets that open order event streams from a URL (seconds)
+    ORDER_EVENTS_TICKET_TTL = int(os.getenv('ORDER_EVENTS_TICKET_TTL', 60))
+    # Order event bus: 'local' (per process) or 'sqlite' (shared by all workers on the host)
+    EVENTS_BACKEND = os.getenv('EVENTS_BACKEND', 'local')
+    EVENTS_SQLITE_PATH = os.getenv('EVENTS_SQLITE_PATH', os.path.join(tempfile.gettempdir(), 'delight_cuisine_events.db'))
+    EVENTS_POLL_INTERVAL = float(os.getenv('EVENTS_POLL_INTERVAL', 0.2))
+    # Per-subscriber backlog before a slow client is reset, and events kept for Last-Event-ID replay
+    EVENTS_QUEUE_SIZE = int(os.getenv('EVENTS_QUEUE_SIZE', 256))
+    EVENTS_HISTORY_SIZE = int(os.getenv('EVENTS_HISTORY_SIZE', 1000))
+
+    # Idempotency-Key: how long stored order responses are replayed (seconds), and
+    # how long a duplicate waits for the in-flight request with the same key
+    IDEMPOTENCY_TTL = int(os.getenv('IDEMPOTENCY_TTL', 24 * 3600))
+    IDEMPOTENCY_WAIT_TIMEOUT = float(os.getenv('IDEMPOTENCY_WAIT_TIMEOUT', 10))
+
+    # Order intake: 'sync' (write in the request) or 'queued' (202 + handle, batched background writes)
+    ORDER_INTAKE_MODE = os.getenv('ORDER_INTAKE_MODE', 'sync')
+    ORDER_INTAKE_BATCH_SIZE = int(os.getenv('ORDER_INTAKE_BATCH_SIZE', 100))
+    ORDER_INTAKE_QUEUE_SIZE = int(os.getenv('ORDER_INTAKE_QUEUE_SIZE', 10000))
+    # How long the writer waits for more orders before committing a partial batch (seconds)
+    ORDER_INTAKE_LINGER = float(os.getenv('ORDER_INTAKE_LINGER', 0.005))
+    ORDER_INTAKE_STATUS_TTL = int(os.getenv('ORDER_INTAKE_STATUS_TTL', 3600))
+
+    # ASGI deployment (asgi.py): threads running blueprint views, largest request body
+    # buffered by the bridge (bytes), and the async engine URL (empty: derived from DATABASE_URL)
+    ASGI_WSGI_THREADS = int(os.getenv('ASGI_WSGI_THREADS', 32))
+    ASGI_MAX_BODY_SIZE = int(os.getenv('ASGI_MAX_BODY_SIZE', 16 * 1024 * 1024))
+    ASYNC_DATABASE_URL = os.getenv('ASYNC_DATABASE_URL', '')
+
+    # API Configuration (JSON is compact; Flask only indents it in debug mode)
     JSON_SORT_KEYS = False
-    JSONIFY_PRETTYPRINT_REGULAR = FLASK_ENV == 'development'
\ No newline at end of file
+
+    # Response compression negotiated on Accept-Encoding (br needs the optional brotli
+    # package); bodies under COMPRESSION_MIN_SIZE bytes are sent as is
+    COMPRESSION_ENABLED = os.getenv('COMPRESSION_ENABLED', 'true').lower() == 'true'
+    COMPRESSION_MIN_SIZE = int(os.getenv('COMPRESSION_MIN_SIZE', 1024))
+    COMPRESSION_GZIP_LEVEL = int(os.getenv('COMPRESSION_GZIP_LEVEL', 6))
+    COMPRESSION_BROTLI_QUALITY = int(os.getenv('COMPRESSION_BROTLI_QUALITY', 5))
+    COMPRESSION_MIMETYPES = ('application/json', 'application/x-ndjson', 'text/csv', 'text/plain')
+
+    # Order listings: largest keyset page and rows per streamed batch
+    ORDERS_PAGE_SIZE_MAX = int(os.getenv('ORDERS_PAGE_SIZE_MAX', 200))
+    ORDERS_STREAM_BATCH_SIZE = int(os.getenv('ORDERS_STREAM_BATCH_SIZE', 200))
\ No newline at end of file
@@ -99,7 +99,7 @@ def create_initial_admin():
 
         # Create admin user
         try:
-            hashed_password = generate_password_hash(password, method='pbkdf2:sha256')
+            hashed_password = generate_password_hash(password, method=app.config['PASSWORD_HASH_METHOD'])
 
             new_admin = User(
                 email=email,
@@ -218,7 +218,7 @@ def transfer_admin():
             current_admin.role = 'customer'  # Demote old admin
 
             # Create new admin with new email
-            hashed_password = generate_password_hash(new_password, method='pbkdf2:sha256') if new_password else current_admin.password
+            hashed_password = generate_password_hash(new_password, method=app.config['PASSWORD_HASH_METHOD']) if new_password else current_admin.password
 
             new_admin = User(
                 email=new_email,
@@ -0,0 +1,82 @@
+"""
+Async database extension module
+SQLAlchemy AsyncEngine for handlers that run on the ASGI event loop
+
+The ASGI entry point (asgi.py) creates it for the same database as
+SQLALCHEMY_DATABASE_URI, swapping in an asyncio driver (aiosqlite, asyncpg,
+aiomysql), or for ASYNC_DATABASE_URL when set. Blueprint views keep using
+the synchronous db session on the bridge's worker threads.
+"""
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+from extensions.db import db
+
+# Synchronous dialect -> asyncio driver
+ASYNC_DRIVERS = {
+    'sqlite': 'sqlite+aiosqlite',
+    'postgresql': 'postgresql+asyncpg',
+    'postgres': 'postgresql+asyncpg',
+    'mysql': 'mysql+aiomysql',
+}
+
+
+def async_url(database_uri):
+    """
+    Asyncio-driver URI for a synchronous SQLAlchemy database URI
+
+    Raises:
+        ValueError: If the database has no known asyncio driver
+    """
+    scheme, _, rest = database_uri.partition(':')
+    dialect = scheme.split('+')[0]
+    if dialect not in ASYNC_DRIVERS:
+        raise ValueError(f'No asyncio driver known for {scheme}; set ASYNC_DATABASE_URL')
+    return f'{ASYNC_DRIVERS[dialect]}:{rest}'
+
+
+class AsyncDatabase:
+    """Flask extension holding the AsyncEngine"""
+
+    def __init__(self, app=None):
+        self.engine = None
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        """Create the AsyncEngine with the app's engine options and SQLite pragmas"""
+        url = app.config.get('ASYNC_DATABASE_URL')
+        if not url:
+            # The resolved URL: Flask-SQLAlchemy moves relative SQLite paths into the instance folder
+            with app.app_context():
+                url = async_url(db.engine.url.render_as_string(hide_password=False))
+        if url.split('://', 1)[1] in ('', '/:memory:'):
+            raise ValueError('In-memory SQLite cannot be shared with an async engine; use a database file')
+
+        options = dict(app.config.get('SQLALCHEMY_ENGINE_OPTIONS', {}))
+        if 'pool_size' in options:
+            # aiosqlite defaults to NullPool (a connection per checkout)
+            options['poolclass'] = AsyncAdaptedQueuePool
+        self.engine = create_async_engine(url, **options)
+
+        pragmas = app.config.get('SQLITE_PRAGMAS')
+        if pragmas and self.engine.dialect.name == 'sqlite':
+            @event.listens_for(self.engine.sync_engine, 'connect')
+            def set_sqlite_pragmas(dbapi_connection, connection_record):
+                cursor = dbapi_connection.cursor()
+                for name, value in pragmas.items():
+                    cursor.execute(f'PRAGMA {name}={value}')
+                cursor.close()
+
+        app.extensions['async_db'] = self
+
+    def connect(self):
+        """Async context manager for a pooled connection"""
+        return self.engine.connect()
+
+    async def dispose(self):
+        if self.engine is not None:
+            await self.engine.dispose()
+
+
+async_db = AsyncDatabase()
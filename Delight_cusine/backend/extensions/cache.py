@@ -0,0 +1,204 @@
+"""
+Cache extension module
+Pluggable key/value cache with TTLs and version counters
+
+Backends (selected by CACHE_BACKEND):
+    - 'lru': in-process LRU, fastest, private to each worker process
+    - 'sqlite': local SQLite file shared by every worker on the host
+    - 'null': caching disabled
+"""
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+
+class NullCacheBackend:
+    """Backend that never stores anything"""
+
+    def get(self, key):
+        return None
+
+    def set(self, key, value, ttl=None):
+        pass
+
+    def delete(self, key):
+        pass
+
+    def get_version(self, namespace):
+        return 0
+
+    def bump_version(self, namespace):
+        return 0
+
+
+class LRUCacheBackend:
+    """Thread-safe in-process LRU cache"""
+
+    def __init__(self, maxsize=1024):
+        self.maxsize = maxsize
+        self._data = OrderedDict()
+        self._versions = {}
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+
+            value, expires_at = entry
+            if expires_at is not None and expires_at <= time.monotonic():
+                del self._data[key]
+                return None
+
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value, ttl=None):
+        expires_at = time.monotonic() + ttl if ttl else None
+        with self._lock:
+            self._data[key] = (value, expires_at)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def get_version(self, namespace):
+        return self._versions.get(namespace, 0)
+
+    def bump_version(self, namespace):
+        with self._lock:
+            self._versions[namespace] = self._versions.get(namespace, 0) + 1
+            return self._versions[namespace]
+
+
+class SQLiteCacheBackend:
+    """
+    Cache stored in a local SQLite file
+
+    Every worker process on the host opens the same file, so values and
+    version counters are coherent across workers without a cache server.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._local = threading.local()
+        with self._connect() as conn:
+            conn.execute(
+                'CREATE TABLE IF NOT EXISTS cache_entries '
+                '(key TEXT PRIMARY KEY, value BLOB, expires_at REAL)'
+            )
+            conn.execute(
+                'CREATE TABLE IF NOT EXISTS cache_versions '
+                '(namespace TEXT PRIMARY KEY, version INTEGER NOT NULL)'
+            )
+
+    def _connect(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+        return conn
+
+    def get(self, key):
+        row = self._connect().execute(
+            'SELECT value, expires_at FROM cache_entries WHERE key = ?', (key,)
+        ).fetchone()
+        if row is None:
+            return None
+
+        value, expires_at = row
+        if expires_at is not None and expires_at <= time.time():
+            self.delete(key)
+            return None
+        return value
+
+    def set(self, key, value, ttl=None):
+        expires_at = time.time() + ttl if ttl else None
+        self._connect().execute(
+            'INSERT OR REPLACE INTO cache_entries (key, value, expires_at) VALUES (?, ?, ?)',
+            (key, value, expires_at)
+        )
+
+    def delete(self, key):
+        self._connect().execute('DELETE FROM cache_entries WHERE key = ?', (key,))
+
+    def get_version(self, namespace):
+        row = self._connect().execute(
+            'SELECT version FROM cache_versions WHERE namespace = ?', (namespace,)
+        ).fetchone()
+        return row[0] if row else 0
+
+    def bump_version(self, namespace):
+        conn = self._connect()
+        conn.execute(
+            'INSERT INTO cache_versions (namespace, version) VALUES (?, 1) '
+            'ON CONFLICT(namespace) DO UPDATE SET version = version + 1',
+            (namespace,)
+        )
+        # Entries from older versions can never be read again
+        conn.execute('DELETE FROM cache_entries WHERE key LIKE ?', (f'{namespace}:%',))
+        return self.get_version(namespace)
+
+
+class Cache:
+    """Flask extension wrapping the configured cache backend"""
+
+    def __init__(self, app=None):
+        self.backend = NullCacheBackend()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        """Create the backend named by CACHE_BACKEND"""
+        backend = app.config.get('CACHE_BACKEND', 'lru')
+
+        if backend == 'lru':
+            self.backend = LRUCacheBackend(app.config.get('CACHE_LRU_SIZE', 1024))
+        elif backend == 'sqlite':
+            self.backend = SQLiteCacheBackend(app.config['CACHE_SQLITE_PATH'])
+        elif backend == 'null':
+            self.backend = NullCacheBackend()
+        else:
+            raise ValueError(f'Unknown CACHE_BACKEND: {backend}')
+
+        app.extensions['cache'] = self
+
+    def get(self, key):
+        return self.backend.get(key)
+
+    def set(self, key, value, ttl=None):
+        self.backend.set(key, value, ttl)
+
+    def delete(self, key):
+        self.backend.delete(key)
+
+    def get_version(self, namespace):
+        return self.backend.get_version(namespace)
+
+    def bump_version(self, namespace):
+        """Invalidate every key built with versioned_key(namespace, ...)"""
+        return self.backend.bump_version(namespace)
+
+    def versioned_key(self, namespace, *parts):
+        """
+        Build a key bound to the namespace's current version
+
+        Args:
+            namespace: Version namespace, e.g. 'menu'
+            parts: Values identifying the cached entry
+
+        Returns:
+            Cache key string
+        """
+        version = self.get_version(namespace)
+        return ':'.join([namespace, f'v{version}', *(str(part) for part in parts)])
+
+
+cache = Cache()
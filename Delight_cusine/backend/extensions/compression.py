@@ -0,0 +1,236 @@
+"""
+Compression extension module
+Response compression negotiated on Accept-Encoding, with bytes-on-wire counters
+
+Responses of the configured mimetypes are compressed with brotli (when the
+optional brotli package is installed) or gzip, whichever the client prefers,
+once the body reaches COMPRESSION_MIN_SIZE: below that the encoding overhead
+and CPU cost outweigh the saving. Streamed responses (NDJSON listings, CSV
+exports) are compressed as they stream, flushing after every chunk so none
+is held back in the compressor. Server-Sent Events are never
+compressed, since buffering would delay events.
+
+Counters of original and sent bytes per encoding are exposed with the
+instrumentation metrics and by snapshot().
+"""
+import gzip
+import threading
+import zlib
+from flask import request
+
+try:
+    import brotli
+except ImportError:  # optional dependency; gzip only
+    brotli = None
+
+ENCODINGS = ('br', 'gzip') if brotli is not None else ('gzip',)
+
+
+class EncodingStats:
+    """Responses and bytes before / after compression for one encoding"""
+
+    __slots__ = ('responses', 'original_bytes', 'sent_bytes')
+
+    def __init__(self):
+        self.responses = 0
+        self.original_bytes = 0
+        self.sent_bytes = 0
+
+
+# Stream compressors flush after every chunk, so each chunk the view yields
+# reaches the client (and decompresses) as soon as it is produced instead of
+# waiting in the compressor's buffer; the window is kept across flushes
+
+class _GzipStream:
+    def __init__(self, level):
+        self._compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+    def process(self, data):
+        return self._compressor.compress(data) + self._compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self):
+        return self._compressor.flush()
+
+
+class _BrotliStream:
+    def __init__(self, quality):
+        self._compressor = brotli.Compressor(quality=quality)
+
+    def process(self, data):
+        return self._compressor.process(data) + self._compressor.flush()
+
+    def finish(self):
+        return self._compressor.finish()
+
+
+class Compression:
+    """Flask extension compressing responses after the view has built them"""
+
+    def __init__(self, app=None):
+        self.enabled = False
+        self.min_size = 1024
+        self.gzip_level = 6
+        self.brotli_quality = 5
+        self.mimetypes = frozenset()
+        self._stats = {}
+        self._lock = threading.Lock()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        """Read the COMPRESSION_* settings and register the response hook"""
+        self.enabled = app.config.get('COMPRESSION_ENABLED', True)
+        self.min_size = app.config.get('COMPRESSION_MIN_SIZE', 1024)
+        self.gzip_level = app.config.get('COMPRESSION_GZIP_LEVEL', 6)
+        self.brotli_quality = app.config.get('COMPRESSION_BROTLI_QUALITY', 5)
+        self.mimetypes = frozenset(app.config.get('COMPRESSION_MIMETYPES', ('application/json',)))
+        self._stats = {}
+
+        app.extensions['compression'] = self
+        if self.enabled:
+            app.after_request(self._after_request)
+
+    def negotiate(self, mimetype, size=None):
+        """
+        Encoding to use for the current request's response
+
+        Args:
+            mimetype: Response mimetype
+            size: Body size in bytes, or None for a stream
+
+        Returns:
+            'br', 'gzip', or None to send the body as is
+        """
+        if not self.enabled or mimetype not in self.mimetypes:
+            return None
+        if size is not None and size < self.min_size:
+            return None
+        return request.accept_encodings.best_match(ENCODINGS)
+
+    def compress(self, body, encoding):
+        """Compress a complete body"""
+        if encoding == 'br':
+            return brotli.compress(body, quality=self.brotli_quality)
+        return gzip.compress(body, self.gzip_level, mtime=0)
+
+    def record(self, encoding, original_bytes, sent_bytes):
+        """Count one response; encoding None for a compressible response sent as is"""
+        with self._lock:
+            stats = self._stats.setdefault(encoding or 'identity', EncodingStats())
+            stats.responses += 1
+            stats.original_bytes += original_bytes
+            stats.sent_bytes += sent_bytes
+
+    def mark(self, response, encoding):
+        """Set the headers of a response whose body is already `encoding`-compressed"""
+        response.headers['Content-Encoding'] = encoding
+        if response.is_streamed:
+            response.headers.pop('Content-Length', None)
+
+    def _stream(self, chunks, encoding):
+        compressor = _BrotliStream(self.brotli_quality) if encoding == 'br' else _GzipStream(self.gzip_level)
+        original_bytes = sent_bytes = 0
+        try:
+            for chunk in chunks:
+                if isinstance(chunk, str):
+                    chunk = chunk.encode()
+                original_bytes += len(chunk)
+                data = compressor.process(chunk)
+                if data:
+                    sent_bytes += len(data)
+                    yield data
+            data = compressor.finish()
+            sent_bytes += len(data)
+            yield data
+        finally:
+            if hasattr(chunks, 'close'):
+                chunks.close()
+            self.record(encoding, original_bytes, sent_bytes)
+
+    def _encode(self, response):
+        """Compress a response built by a view, if the client accepts an encoding"""
+        if response.is_streamed:
+            encoding = self.negotiate(response.mimetype)
+            if encoding is not None:
+                response.response = self._stream(response.response, encoding)
+                self.mark(response, encoding)
+            return
+
+        body = response.get_data()
+        encoding = self.negotiate(response.mimetype, len(body))
+        if encoding is None:
+            self.record(None, len(body), len(body))
+            return
+
+        compressed = self.compress(body, encoding)
+        self.record(encoding, len(body), len(compressed))
+        response.set_data(compressed)
+        self.mark(response, encoding)
+
+    def _after_request(self, response):
+        if response.status_code == 304:
+            # Same Vary as the 200 it stands for
+            response.vary.add('Accept-Encoding')
+            return response
+        if response.mimetype not in self.mimetypes:
+            return response
+        response.vary.add('Accept-Encoding')
+
+        if ('Content-Encoding' not in response.headers and not response.direct_passthrough
+                and 200 <= response.status_code < 300 and response.status_code not in (204, 206)):
+            self._encode(response)
+
+        # A compressed body is another representation of the resource: its ETag is weak
+        etag, weak = response.get_etag()
+        if etag and not weak and 'Content-Encoding' in response.headers:
+            response.set_etag(etag, weak=True)
+        return response
+
+    def snapshot(self):
+        """
+        Bytes before and after compression per encoding (this worker)
+
+        Returns:
+            Dictionary of encoding to {'responses', 'original_bytes', 'sent_bytes', 'saved_ratio'}
+        """
+        with self._lock:
+            items = [(encoding, stats.responses, stats.original_bytes, stats.sent_bytes)
+                     for encoding, stats in self._stats.items()]
+        return {
+            encoding: {
+                'responses': responses,
+                'original_bytes': original_bytes,
+                'sent_bytes': sent_bytes,
+                'saved_ratio': round(1 - sent_bytes / original_bytes, 4) if original_bytes else 0.0,
+            }
+            for encoding, responses, original_bytes, sent_bytes in items
+        }
+
+    def render_prometheus(self):
+        """Byte counters in Prometheus text exposition format"""
+        lines = [
+            '# HELP delight_response_bytes_total Compressible response bytes before (original) and after (sent) '
+            'encoding',
+            '# TYPE delight_response_bytes_total counter',
+        ]
+        with self._lock:
+            items = [(encoding, stats.responses, stats.original_bytes, stats.sent_bytes)
+                     for encoding, stats in self._stats.items()]
+        for encoding, _, original_bytes, sent_bytes in items:
+            lines.append(f'delight_response_bytes_total{{encoding="{encoding}",stage="original"}} {original_bytes}')
+            lines.append(f'delight_response_bytes_total{{encoding="{encoding}",stage="sent"}} {sent_bytes}')
+        lines += [
+            '# HELP delight_compressible_responses_total Compressible responses by encoding sent',
+            '# TYPE delight_compressible_responses_total counter',
+        ]
+        for encoding, responses, _, _ in items:
+            lines.append(f'delight_compressible_responses_total{{encoding="{encoding}"}} {responses}')
+        return '\n'.join(lines) + '\n'
+
+    def reset(self):
+        """Zero every counter"""
+        with self._lock:
+            self._stats.clear()
+
+
+compression = Compression()
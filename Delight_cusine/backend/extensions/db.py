@@ -3,5 +3,29 @@ Database extension module
 SQLAlchemy instance initialization
 """
 from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy import event
 
-db = SQLAlchemy()
\ No newline at end of file
+db = SQLAlchemy()
+
+
+def init_engine_events(app):
+    """
+    Apply SQLITE_PRAGMAS to every new SQLite connection
+
+    Must be called inside an app context after db.init_app(app).
+    Does nothing for other databases.
+
+    Args:
+        app: Flask application
+    """
+    pragmas = app.config.get('SQLITE_PRAGMAS')
+    engine = db.engine
+    if not pragmas or engine.dialect.name != 'sqlite':
+        return
+
+    @event.listens_for(engine, 'connect')
+    def set_sqlite_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for name, value in pragmas.items():
+            cursor.execute(f'PRAGMA {name}={value}')
+        cursor.close()
\ No newline at end of file
@@ -0,0 +1,413 @@
+"""
+Event bus extension module
+Topic-based publish/subscribe with Server-Sent Events fan-out
+
+Backends (selected by EVENTS_BACKEND):
+    - 'local': in-process broker, events reach subscribers of this worker only
+    - 'sqlite': events go through a local SQLite file that every worker on the
+      host tails, so a change made by one worker reaches all subscribers
+"""
+import asyncio
+import json
+import sqlite3
+import threading
+import time
+from collections import deque, namedtuple
+
+# data is JSON text, encoded once per event however many subscribers receive it
+Event = namedtuple('Event', 'id name topics data')
+
+
+class Subscription:
+    """
+    One subscriber's bounded event queue
+
+    A subscriber that falls more than queue_size events behind loses the
+    backlog and is flagged as lagged, so a slow client can never make the
+    publisher block or memory grow without bound.
+    """
+
+    def __init__(self, topics, queue_size):
+        self.topics = frozenset(topics)
+        self._queue = deque(maxlen=queue_size)
+        self._ready = threading.Event()
+        self.lagged = False
+
+    def put(self, event):
+        if len(self._queue) == self._queue.maxlen:
+            self.lagged = True
+        self._queue.append(event)
+        self._ready.set()
+
+    def get(self, timeout=None):
+        """
+        Wait for pending events
+
+        Args:
+            timeout: Seconds to wait when the queue is empty
+
+        Returns:
+            List of events, empty on timeout
+        """
+        if not self._queue and not self._ready.wait(timeout):
+            return []
+        self._ready.clear()
+
+        events = []
+        while self._queue:
+            events.append(self._queue.popleft())
+        return events
+
+
+class AsyncSubscription(Subscription):
+    """
+    Subscription awaited from an event loop (ASGI streams)
+
+    Publishers run on other threads; they wake the loop with
+    call_soon_threadsafe instead of blocking anyone.
+    """
+
+    def __init__(self, topics, queue_size):
+        super().__init__(topics, queue_size)
+        self._loop = asyncio.get_running_loop()
+        self._async_ready = asyncio.Event()
+
+    def put(self, event):
+        super().put(event)
+        try:
+            self._loop.call_soon_threadsafe(self._async_ready.set)
+        except RuntimeError:
+            pass  # loop closed; the stream is gone
+
+    async def get_async(self, timeout=None):
+        """Coroutine version of get()"""
+        if not self._queue:
+            try:
+                await asyncio.wait_for(self._async_ready.wait(), timeout)
+            except asyncio.TimeoutError:
+                return []
+        self._async_ready.clear()
+
+        events = []
+        while self._queue:
+            events.append(self._queue.popleft())
+        return events
+
+
+def _sse(event):
+    return f'id: {event.id}\nevent: {event.name}\ndata: {event.data}\n\n'
+
+
+class LocalBroker:
+    """In-process broker: topic index, subscriber queues and replay history"""
+
+    def __init__(self, queue_size=256, history_size=1000):
+        self.queue_size = queue_size
+        self._topics = {}
+        self._history = deque(maxlen=history_size)
+        self._lock = threading.Lock()
+        self._last_id = 0
+
+    def subscribe(self, topics, subscription_class=Subscription):
+        subscription = subscription_class(topics, self.queue_size)
+        with self._lock:
+            for topic in subscription.topics:
+                self._topics.setdefault(topic, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            for topic in subscription.topics:
+                subscribers = self._topics.get(topic)
+                if subscribers is not None:
+                    subscribers.discard(subscription)
+                    if not subscribers:
+                        del self._topics[topic]
+
+    def subscriber_count(self):
+        with self._lock:
+            return len(set().union(*self._topics.values())) if self._topics else 0
+
+    def next_id(self):
+        with self._lock:
+            self._last_id += 1
+            return self._last_id
+
+    def dispatch(self, event):
+        """Deliver an event to every subscriber of any of its topics (once each)"""
+        with self._lock:
+            self._history.append(event)
+            self._last_id = max(self._last_id, event.id)
+            targets = set()
+            for topic in event.topics:
+                targets.update(self._topics.get(topic, ()))
+
+        for subscription in targets:
+            subscription.put(event)
+        return len(targets)
+
+    def replay(self, topics, after_id):
+        """
+        Events after after_id on any of the topics
+
+        Returns:
+            List of events, or None if after_id is older than the history
+        """
+        with self._lock:
+            history = list(self._history)
+        if history and history[0].id > after_id + 1:
+            return None
+        topics = set(topics)
+        return [event for event in history if event.id > after_id and topics.intersection(event.topics)]
+
+
+class LocalEventBackend:
+    """Publishes straight into this process's broker"""
+
+    def __init__(self, broker):
+        self.broker = broker
+
+    def publish(self, name, topics, data):
+        event = Event(self.broker.next_id(), name, tuple(topics), data)
+        self.broker.dispatch(event)
+        return event.id
+
+    def replay(self, topics, after_id):
+        return self.broker.replay(topics, after_id)
+
+    def start(self):
+        pass
+
+
+class SQLiteEventBackend:
+    """
+    Event log in a local SQLite file shared by every worker on the host
+
+    Publishing appends a row; one background thread per process tails the
+    log and dispatches new rows to the local broker. Row IDs are global, so
+    Last-Event-ID stays valid whichever worker a client reconnects to.
+    """
+
+    def __init__(self, broker, path, poll_interval=0.2, retention=10000):
+        self.broker = broker
+        self.path = path
+        self.poll_interval = poll_interval
+        self.retention = retention
+        self._local = threading.local()
+        self._wake = threading.Event()
+        self._thread = None
+        self._start_lock = threading.Lock()
+
+        conn = self._connect()
+        conn.execute(
+            'CREATE TABLE IF NOT EXISTS events '
+            '(id INTEGER PRIMARY KEY AUTOINCREMENT, name TEXT NOT NULL, '
+            'topics TEXT NOT NULL, data TEXT NOT NULL, created_at REAL NOT NULL)'
+        )
+        # Only events published from now on are delivered live
+        self._last_id = conn.execute('SELECT COALESCE(MAX(id), 0) FROM events').fetchone()[0]
+
+    def _connect(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+        return conn
+
+    @staticmethod
+    def _event(row):
+        event_id, name, topics, data = row
+        return Event(event_id, name, tuple(topics.split(' ')), data)
+
+    def publish(self, name, topics, data):
+        conn = self._connect()
+        event_id = conn.execute(
+            'INSERT INTO events (name, topics, data, created_at) VALUES (?, ?, ?, ?)',
+            (name, ' '.join(topics), data, time.time())
+        ).lastrowid
+        if event_id % 1000 == 0:
+            conn.execute('DELETE FROM events WHERE id <= ?', (event_id - self.retention,))
+        # Local subscribers should not wait for the next poll
+        self._wake.set()
+        return event_id
+
+    def replay(self, topics, after_id):
+        conn = self._connect()
+        oldest = conn.execute('SELECT MIN(id) FROM events').fetchone()[0]
+        if oldest is not None and oldest > after_id + 1:
+            return None
+        topics = set(topics)
+        rows = conn.execute(
+            'SELECT id, name, topics, data FROM events WHERE id > ? ORDER BY id', (after_id,)
+        ).fetchall()
+        return [event for event in map(self._event, rows) if topics.intersection(event.topics)]
+
+    def start(self):
+        """Start tailing the log (once per process, on the first subscriber)"""
+        if self._thread is not None:
+            return
+        with self._start_lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._tail, name='event-log-tail', daemon=True)
+                self._thread.start()
+
+    def _tail(self):
+        conn = self._connect()
+        while True:
+            self._wake.wait(self.poll_interval)
+            self._wake.clear()
+            try:
+                rows = conn.execute(
+                    'SELECT id, name, topics, data FROM events WHERE id > ? ORDER BY id', (self._last_id,)
+                ).fetchall()
+            except sqlite3.OperationalError:
+                continue
+            for row in rows:
+                event = self._event(row)
+                self.broker.dispatch(event)
+                self._last_id = event.id
+
+
+class EventBus:
+    """Flask extension wrapping the broker and the configured backend"""
+
+    def __init__(self, app=None):
+        self.broker = LocalBroker()
+        self.backend = LocalEventBackend(self.broker)
+        self.heartbeat_interval = 15
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        """Create the broker and the backend named by EVENTS_BACKEND"""
+        backend = app.config.get('EVENTS_BACKEND', 'local')
+        self.broker = LocalBroker(
+            queue_size=app.config.get('EVENTS_QUEUE_SIZE', 256),
+            history_size=app.config.get('EVENTS_HISTORY_SIZE', 1000)
+        )
+        self.heartbeat_interval = app.config.get('SSE_HEARTBEAT_INTERVAL', 15)
+
+        if backend == 'local':
+            self.backend = LocalEventBackend(self.broker)
+        elif backend == 'sqlite':
+            self.backend = SQLiteEventBackend(
+                self.broker,
+                app.config['EVENTS_SQLITE_PATH'],
+                poll_interval=app.config.get('EVENTS_POLL_INTERVAL', 0.2)
+            )
+        else:
+            raise ValueError(f'Unknown EVENTS_BACKEND: {backend}')
+
+        app.extensions['events'] = self
+
+    def publish(self, name, topics, payload):
+        """
+        Publish an event
+
+        Args:
+            name: SSE event name, e.g. 'created'
+            topics: Topics the event is delivered on
+            payload: JSON-serializable event body
+
+        Returns:
+            Event ID
+        """
+        return self.backend.publish(name, topics, json.dumps(payload, separators=(',', ':')))
+
+    def subscribe(self, topics, subscription_class=Subscription):
+        self.backend.start()
+        return self.broker.subscribe(topics, subscription_class)
+
+    def unsubscribe(self, subscription):
+        self.broker.unsubscribe(subscription)
+
+    def stream(self, topics, last_event_id=None):
+        """
+        Server-Sent Events stream for a set of topics
+
+        Events missed since Last-Event-ID are replayed first. If they are no
+        longer available, or the subscriber lags too far behind, a 'reset'
+        event tells the client to re-fetch its state.
+
+        Args:
+            topics: Topics to subscribe to
+            last_event_id: ID of the last event the client received, if any
+
+        Yields:
+            SSE-formatted strings
+        """
+        subscription = self.subscribe(topics)
+        try:
+            yield 'retry: 3000\n\n'
+
+            if last_event_id is not None:
+                missed = self.backend.replay(topics, last_event_id)
+                if missed is None:
+                    yield 'event: reset\ndata: {}\n\n'
+                else:
+                    for event in missed:
+                        yield _sse(event)
+                    last_event_id = missed[-1].id if missed else last_event_id
+
+            while True:
+                events = subscription.get(self.heartbeat_interval)
+                if subscription.lagged:
+                    subscription.lagged = False
+                    yield 'event: reset\ndata: {}\n\n'
+                    continue
+                if not events:
+                    yield ': heartbeat\n\n'
+                    continue
+
+                chunk = []
+                for event in events:
+                    # Skip events already sent during replay
+                    if last_event_id is not None and event.id <= last_event_id:
+                        continue
+                    chunk.append(_sse(event))
+                if chunk:
+                    yield ''.join(chunk)
+        finally:
+            self.unsubscribe(subscription)
+
+    async def stream_async(self, topics, last_event_id=None):
+        """
+        Async generator version of stream(), for ASGI: an idle subscriber
+        is a suspended coroutine instead of a blocked worker thread
+
+        Yields:
+            SSE-formatted strings
+        """
+        subscription = self.subscribe(topics, AsyncSubscription)
+        try:
+            yield 'retry: 3000\n\n'
+
+            if last_event_id is not None:
+                missed = self.backend.replay(topics, last_event_id)
+                if missed is None:
+                    yield 'event: reset\ndata: {}\n\n'
+                else:
+                    for event in missed:
+                        yield _sse(event)
+                    last_event_id = missed[-1].id if missed else last_event_id
+
+            while True:
+                events = await subscription.get_async(self.heartbeat_interval)
+                if subscription.lagged:
+                    subscription.lagged = False
+                    yield 'event: reset\ndata: {}\n\n'
+                    continue
+                if not events:
+                    yield ': heartbeat\n\n'
+                    continue
+
+                chunk = [_sse(event) for event in events if last_event_id is None or event.id > last_event_id]
+                if chunk:
+                    yield ''.join(chunk)
+        finally:
+            self.unsubscribe(subscription)
+
+
+events = EventBus()
@@ -0,0 +1,262 @@
+"""
+Instrumentation extension module
+Per-request SQL query count, database time, JSON serialization time and
+slowest statement, reported per endpoint
+
+Enabled by INSTRUMENTATION_ENABLED. When disabled nothing is registered:
+no engine listeners, no request hooks, no metrics route.
+
+Outputs:
+    - Server-Timing response header on every request
+    - Prometheus text format at METRICS_PATH (per worker process), for
+      scrapers presenting METRICS_TOKEN; not served when no token is set
+"""
+import hmac
+import threading
+import time
+from flask import Response, current_app, g, has_request_context, jsonify, request
+from flask.json.provider import DefaultJSONProvider
+from sqlalchemy import event
+from extensions.db import db
+
+# Request duration histogram buckets (seconds)
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+STATEMENT_LABEL_LENGTH = 200
+
+
+class RequestStats:
+    """Timings collected during one request"""
+
+    __slots__ = ('started', 'queries', 'db_time', 'serialize_time', 'slowest_time', 'slowest_statement')
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.queries = 0
+        self.db_time = 0.0
+        self.serialize_time = 0.0
+        self.slowest_time = 0.0
+        self.slowest_statement = None
+
+
+class EndpointStats:
+    """Running totals for one endpoint"""
+
+    def __init__(self):
+        self.requests = 0
+        self.duration = 0.0
+        self.buckets = [0] * len(DURATION_BUCKETS)
+        self.queries = 0
+        self.db_time = 0.0
+        self.serialize_time = 0.0
+        self.slowest_time = 0.0
+        self.slowest_statement = None
+
+    def add(self, stats, duration):
+        self.requests += 1
+        self.duration += duration
+        for i, bound in enumerate(DURATION_BUCKETS):
+            if duration <= bound:
+                self.buckets[i] += 1
+        self.queries += stats.queries
+        self.db_time += stats.db_time
+        self.serialize_time += stats.serialize_time
+        if stats.slowest_time > self.slowest_time:
+            self.slowest_time = stats.slowest_time
+            self.slowest_statement = stats.slowest_statement
+
+
+def _current_stats():
+    return g.get('_request_stats') if has_request_context() else None
+
+
+class TimedJSONProvider(DefaultJSONProvider):
+    """JSON provider that adds encoding time to the current request's stats"""
+
+    def dumps(self, obj, **kwargs):
+        stats = _current_stats()
+        if stats is None:
+            return super().dumps(obj, **kwargs)
+        started = time.perf_counter()
+        try:
+            return super().dumps(obj, **kwargs)
+        finally:
+            stats.serialize_time += time.perf_counter() - started
+
+
+def record_serialization(seconds):
+    """Add encoding time measured outside the JSON provider (e.g. orjson) to the current request"""
+    stats = _current_stats()
+    if stats is not None:
+        stats.serialize_time += seconds
+
+
+def _escape_label(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', ' ')
+
+
+class Instrumentation:
+    """Flask extension collecting per-endpoint request and SQL metrics"""
+
+    def __init__(self, app=None):
+        self.enabled = False
+        self._endpoints = {}
+        self._lock = threading.Lock()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        """Register engine events, request hooks and the metrics route if enabled"""
+        self.enabled = app.config.get('INSTRUMENTATION_ENABLED', False)
+        app.extensions['instrumentation'] = self
+        if not self.enabled:
+            return
+
+        with app.app_context():
+            engine = db.engine
+        event.listen(engine, 'before_cursor_execute', self._before_cursor_execute)
+        event.listen(engine, 'after_cursor_execute', self._after_cursor_execute)
+        event.listen(engine, 'handle_error', self._handle_error)
+
+        # Keep the app's JSON settings (sort_keys, compact) on the timed provider
+        provider = TimedJSONProvider(app)
+        provider.sort_keys = app.json.sort_keys
+        provider.compact = app.json.compact
+        app.json = provider
+
+        app.before_request(self._before_request)
+        app.after_request(self._after_request)
+        # The metrics include SQL statement text, so they are only served to a scraper with the token
+        if app.config.get('METRICS_TOKEN'):
+            app.add_url_rule(app.config.get('METRICS_PATH', '/api/metrics'),
+                             'metrics', self.metrics_view, methods=['GET'])
+
+    def _before_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault('_query_started', []).append((cursor, time.perf_counter()))
+
+    def _after_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        _, started = conn.info['_query_started'].pop()
+        elapsed = time.perf_counter() - started
+        stats = _current_stats()
+        if stats is None:
+            return
+        stats.queries += 1
+        stats.db_time += elapsed
+        if elapsed > stats.slowest_time:
+            stats.slowest_time = elapsed
+            stats.slowest_statement = statement
+
+    def _handle_error(self, context):
+        # A failed statement never reaches after_cursor_execute; drop its start time
+        if context.connection is None or context.execution_context is None:
+            return
+        pending = context.connection.info.get('_query_started')
+        if pending and pending[-1][0] is context.execution_context.cursor:
+            pending.pop()
+
+    def _before_request(self):
+        g._request_stats = RequestStats()
+
+    def _after_request(self, response):
+        stats = g.pop('_request_stats', None)
+        if stats is None:
+            return response
+
+        duration = time.perf_counter() - stats.started
+        app_time = max(duration - stats.db_time - stats.serialize_time, 0.0)
+        response.headers['Server-Timing'] = (
+            f'db;dur={stats.db_time * 1000:.2f};desc="{stats.queries} queries", '
+            f'serialize;dur={stats.serialize_time * 1000:.2f}, '
+            f'app;dur={app_time * 1000:.2f}, '
+            f'total;dur={duration * 1000:.2f}'
+        )
+
+        endpoint = request.endpoint or 'unmatched'
+        with self._lock:
+            self._endpoints.setdefault(endpoint, EndpointStats()).add(stats, duration)
+        return response
+
+    def snapshot(self):
+        """
+        Copy of the per-endpoint totals
+
+        Returns:
+            Dictionary of endpoint name to summary dictionary
+        """
+        with self._lock:
+            return {
+                endpoint: {
+                    'requests': stats.requests,
+                    'duration': stats.duration,
+                    'queries': stats.queries,
+                    'db_time': stats.db_time,
+                    'serialize_time': stats.serialize_time,
+                    'slowest_time': stats.slowest_time,
+                    'slowest_statement': stats.slowest_statement,
+                    'buckets': list(stats.buckets),
+                }
+                for endpoint, stats in self._endpoints.items()
+            }
+
+    def reset(self):
+        with self._lock:
+            self._endpoints.clear()
+
+    def render_prometheus(self):
+        """Render the per-endpoint totals in Prometheus text exposition format"""
+        snapshot = self.snapshot()
+        lines = []
+
+        def family(name, kind, help_text, samples):
+            lines.append(f'# HELP {name} {help_text}')
+            lines.append(f'# TYPE {name} {kind}')
+            lines.extend(samples)
+
+        def label(endpoint, **extra):
+            pairs = [f'endpoint="{_escape_label(endpoint)}"']
+            pairs += [f'{key}="{_escape_label(value)}"' for key, value in extra.items()]
+            return '{' + ','.join(pairs) + '}'
+
+        histogram = []
+        for endpoint, stats in snapshot.items():
+            for bound, count in zip(DURATION_BUCKETS, stats['buckets']):
+                histogram.append(f'delight_request_duration_seconds_bucket{label(endpoint, le=bound)} {count}')
+            histogram.append(f'delight_request_duration_seconds_bucket{label(endpoint, le="+Inf")} {stats["requests"]}')
+            histogram.append(f'delight_request_duration_seconds_sum{label(endpoint)} {stats["duration"]:.6f}')
+            histogram.append(f'delight_request_duration_seconds_count{label(endpoint)} {stats["requests"]}')
+        family('delight_request_duration_seconds', 'histogram', 'Request duration per endpoint', histogram)
+
+        family('delight_sql_queries_total', 'counter', 'SQL statements executed per endpoint',
+               [f'delight_sql_queries_total{label(e)} {s["queries"]}' for e, s in snapshot.items()])
+        family('delight_sql_duration_seconds_total', 'counter', 'Time spent in SQL per endpoint',
+               [f'delight_sql_duration_seconds_total{label(e)} {s["db_time"]:.6f}' for e, s in snapshot.items()])
+        family('delight_serialization_seconds_total', 'counter', 'Time spent encoding JSON per endpoint',
+               [f'delight_serialization_seconds_total{label(e)} {s["serialize_time"]:.6f}'
+                for e, s in snapshot.items()])
+        family('delight_sql_slowest_statement_seconds', 'gauge', 'Slowest SQL statement seen per endpoint',
+               [f'delight_sql_slowest_statement_seconds'
+                f'{label(e, statement=" ".join(s["slowest_statement"].split())[:STATEMENT_LABEL_LENGTH])} '
+                f'{s["slowest_time"]:.6f}'
+                for e, s in snapshot.items() if s['slowest_statement']])
+
+        return '\n'.join(lines) + '\n'
+
+    def metrics_view(self):
+        """Prometheus scrape endpoint (with the rate limiter's and compression counters when installed)"""
+        expected = f"Bearer {current_app.config['METRICS_TOKEN']}"
+        if not hmac.compare_digest(request.headers.get('Authorization', '').encode(), expected.encode()):
+            return jsonify({
+                'error': 'authorization_required',
+                'message': 'Metrics require the METRICS_TOKEN bearer token'
+            }), 401
+
+        body = self.render_prometheus()
+        limiter = current_app.extensions.get('rate_limit')
+        if limiter is not None and limiter.enabled:
+            body += limiter.render_prometheus()
+        compression = current_app.extensions.get('compression')
+        if compression is not None and compression.enabled:
+            body += compression.render_prometheus()
+        return Response(body, mimetype='text/plain; version=0.0.4')
+
+
+instrumentation = Instrumentation()
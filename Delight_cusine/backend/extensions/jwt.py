@@ -7,9 +7,108 @@ from flask_jwt_extended import( JWTManager,
     create_refresh_token, 
     jwt_required,
     get_jwt_identity)
+import json
+from flask import current_app, request
+from extensions.cache import cache
+from extensions.db import db
+from models.user import User
+from services import token_revocation
 
 jwt = JWTManager()
 
+
+def user_cache_key(user_id):
+    """Cache key for a user's snapshot"""
+    return f'user:{user_id}'
+
+
+@jwt.additional_claims_loader
+def add_role_claim(identity):
+    """
+    Embed the user's role in every token at creation time
+    so authorization checks need no user lookup
+    """
+    user = load_user(identity)
+    return {'role': user['role']} if user else {}
+
+
+@jwt.token_verification_loader
+def check_token_scope(jwt_header, jwt_payload):
+    """Scoped tokens (order stream tickets) only authenticate the endpoint named by their scope"""
+    scope = jwt_payload.get('scope')
+    return scope is None or scope == request.endpoint
+
+
+@jwt.token_verification_failed_loader
+def token_scope_error_callback(jwt_header, jwt_payload):
+    """Handle a scoped token used on another endpoint"""
+    return {
+        'error': 'invalid_token',
+        'message': 'The token is not valid for this endpoint'
+    }, 401
+
+
+@jwt.user_lookup_loader
+def user_lookup_callback(jwt_header, jwt_payload):
+    """Resolve current_user from a short-TTL cache of user snapshots"""
+    return load_user(jwt_payload['sub'])
+
+
+@jwt.user_lookup_error_loader
+def user_lookup_error_callback(jwt_header, jwt_payload):
+    """Handle token for a user that no longer exists"""
+    return {
+        'error': 'user_not_found',
+        'message': 'User not found'
+    }, 404
+
+
+def cache_user(user):
+    """
+    Store a user's to_dict() snapshot for USER_CACHE_TTL seconds
+
+    Args:
+        user: User instance
+
+    Returns:
+        User dictionary
+    """
+    data = user.to_dict()
+    cache.set(user_cache_key(user.id), json.dumps(data).encode(), current_app.config['USER_CACHE_TTL'])
+    return data
+
+
+def load_user(user_id):
+    """
+    Get a user's snapshot from the cache, loading it on a miss
+
+    Args:
+        user_id: User primary key (JWT identity)
+
+    Returns:
+        User dictionary, or None if the user does not exist
+    """
+    cached = cache.get(user_cache_key(user_id))
+    if cached is not None:
+        return json.loads(cached)
+
+    user = db.session.get(User, user_id)
+    return cache_user(user) if user else None
+
+@jwt.token_in_blocklist_loader
+def check_if_token_revoked(jwt_header, jwt_payload):
+    """Reject rotated and logged-out tokens (a bloom filter check, no query, for live tokens)"""
+    return token_revocation.is_revoked(jwt_payload)
+
+
+@jwt.revoked_token_loader
+def revoked_token_callback(jwt_header, jwt_payload):
+    """Handle revoked token"""
+    return {
+        'error': 'token_revoked',
+        'message': 'The token has been revoked'
+    }, 401
+
 @jwt.expired_token_loader
 def expired_token_callback(jwt_header, jwt_payload):
     """Handle expired token"""
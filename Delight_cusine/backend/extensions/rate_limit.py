@@ -0,0 +1,290 @@
+"""
+Rate limit extension module
+Token-bucket request limits per client IP, user and account, with per-rule metrics
+
+Limits are named rules in RATE_LIMITS, e.g. {'login': {'ip': '10/minute'}}:
+each scope ('ip', 'user', 'account') gets a bucket of N requests that refills
+at N per period. 'account' is keyed by the account a request targets (the
+normalised email of a login) and is checked separately, with
+check_account(), once the body has been validated. Buckets use GCRA (the
+token bucket stored as one timestamp per key: the time at which the bucket
+will be full again), so a check is one dict or row update.
+
+Backends (selected by RATE_LIMIT_BACKEND):
+    - 'memory': per-process buckets; with W workers a client gets up to W
+      times the limit
+    - 'sqlite': buckets in a local SQLite file shared by every worker on the
+      host, updated with one atomic upsert per check
+"""
+import math
+import sqlite3
+import threading
+import time
+from flask import jsonify, request
+
+PERIODS = {'second': 1, 'minute': 60, 'hour': 3600, 'day': 86400}
+
+# How often idle (full) buckets are dropped (seconds)
+SWEEP_INTERVAL = 60
+
+
+def parse_limit(text):
+    """
+    Parse 'N/period' (period: second, minute, hour or day)
+
+    Returns:
+        (requests, period seconds), or None for an empty (disabled) limit
+
+    Raises:
+        ValueError: If the limit cannot be parsed
+    """
+    if not text:
+        return None
+    count, _, period = text.partition('/')
+    if period not in PERIODS or int(count) < 1:
+        raise ValueError(f'Invalid rate limit: {text!r} (expected N/second|minute|hour|day)')
+    return int(count), PERIODS[period]
+
+
+class MemoryStore:
+    """Buckets in a dict, for one worker process"""
+
+    def __init__(self):
+        self._buckets = {}  # key -> time the bucket is full again
+        self._lock = threading.Lock()
+        self._swept_at = time.monotonic()
+
+    def hit(self, key, count, period):
+        """
+        Take one request from a bucket
+
+        Returns:
+            (allowed, seconds until a request would be allowed)
+        """
+        now = time.monotonic()
+        interval = period / count
+        with self._lock:
+            if now - self._swept_at >= SWEEP_INTERVAL:
+                self._buckets = {k: full_at for k, full_at in self._buckets.items() if full_at > now}
+                self._swept_at = now
+
+            full_at = max(self._buckets.get(key, now), now) + interval
+            if full_at - now > period:
+                return False, full_at - now - period
+            self._buckets[key] = full_at
+        return True, 0.0
+
+    def reset(self):
+        with self._lock:
+            self._buckets.clear()
+
+
+class SQLiteStore:
+    """
+    Buckets in a local SQLite file
+
+    Every worker process on the host opens the same file, so a client's
+    limit holds across workers without a separate server.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._local = threading.local()
+        self._swept_at = 0.0
+        self._connect().execute(
+            'CREATE TABLE IF NOT EXISTS rate_limits (key TEXT PRIMARY KEY, full_at REAL NOT NULL)'
+        )
+
+    def _connect(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+        return conn
+
+    def hit(self, key, count, period):
+        now = time.time()
+        interval = period / count
+        conn = self._connect()
+        if now - self._swept_at >= SWEEP_INTERVAL:
+            self._swept_at = now
+            conn.execute('DELETE FROM rate_limits WHERE full_at <= ?', (now,))
+
+        # Only updates (and returns a row) when the request fits in the bucket
+        row = conn.execute(
+            'INSERT INTO rate_limits (key, full_at) VALUES (?, ?) '
+            'ON CONFLICT(key) DO UPDATE SET full_at = max(full_at, ?) + ? '
+            'WHERE max(full_at, ?) + ? - ? <= ? '
+            'RETURNING full_at',
+            (key, now + interval, now, interval, now, interval, now, period)
+        ).fetchone()
+        if row is not None:
+            return True, 0.0
+
+        full_at = conn.execute('SELECT full_at FROM rate_limits WHERE key = ?', (key,)).fetchone()[0]
+        return False, max(full_at, now) + interval - now - period
+
+    def reset(self):
+        self._connect().execute('DELETE FROM rate_limits')
+
+
+class RuleStats:
+    """Allowed and limited request counts for one rule and scope"""
+
+    __slots__ = ('allowed', 'limited')
+
+    def __init__(self):
+        self.allowed = 0
+        self.limited = 0
+
+
+class RateLimiter:
+    """Flask extension applying RATE_LIMITS rules through the configured store"""
+
+    def __init__(self, app=None):
+        self.enabled = False
+        self.store = None
+        self.rules = {}
+        self.proxy_count = 0
+        self._stats = {}
+        self._lock = threading.Lock()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        """Parse RATE_LIMITS and create the store named by RATE_LIMIT_BACKEND"""
+        self.enabled = app.config.get('RATE_LIMIT_ENABLED', True)
+        self.proxy_count = app.config.get('RATE_LIMIT_PROXY_COUNT', 0)
+        self.rules = {
+            name: {scope: limit for scope, limit in ((scope, parse_limit(text)) for scope, text in scopes.items())
+                   if limit is not None}
+            for name, scopes in app.config.get('RATE_LIMITS', {}).items()
+        }
+        self._stats = {}
+
+        backend = app.config.get('RATE_LIMIT_BACKEND', 'memory')
+        if backend == 'memory':
+            self.store = MemoryStore()
+        elif backend == 'sqlite':
+            self.store = SQLiteStore(app.config['RATE_LIMIT_SQLITE_PATH'])
+        else:
+            raise ValueError(f'Unknown RATE_LIMIT_BACKEND: {backend}')
+
+        app.extensions['rate_limit'] = self
+
+    def client_ip(self):
+        """Client address; with RATE_LIMIT_PROXY_COUNT proxies, taken from X-Forwarded-For"""
+        if self.proxy_count:
+            forwarded = [part.strip() for part in request.headers.get('X-Forwarded-For', '').split(',') if part.strip()]
+            if len(forwarded) >= self.proxy_count:
+                return forwarded[-self.proxy_count]
+        return request.remote_addr or 'unknown'
+
+    def check(self, name, user_id=None):
+        """
+        Count the current request against a rule's buckets
+
+        Args:
+            name: Rule name in RATE_LIMITS
+            user_id: Authenticated user, for rules with a 'user' scope
+
+        Returns:
+            None if allowed, otherwise a 429 response with Retry-After
+        """
+        rule = self.rules.get(name)
+        if not self.enabled or not rule:
+            return None
+
+        for scope in rule:
+            if scope == 'ip':
+                key = f'{name}:ip:{self.client_ip()}'
+            elif scope == 'user' and user_id is not None:
+                key = f'{name}:user:{user_id}'
+            else:
+                continue
+
+            rejected = self._hit(name, scope, key)
+            if rejected is not None:
+                return rejected
+        return None
+
+    def check_account(self, name, account):
+        """
+        Count the current request against a rule's 'account' bucket
+
+        Args:
+            name: Rule name in RATE_LIMITS
+            account: Account the request targets (e.g. the login email);
+                normalised, so case and surrounding spaces share one bucket
+
+        Returns:
+            None if allowed, otherwise a 429 response with Retry-After
+        """
+        rule = self.rules.get(name)
+        if not self.enabled or not rule or 'account' not in rule:
+            return None
+        return self._hit(name, 'account', f'{name}:account:{str(account).strip().lower()}')
+
+    def _hit(self, name, scope, key):
+        count, period = self.rules[name][scope]
+        allowed, retry_after = self.store.hit(key, count, period)
+        with self._lock:
+            stats = self._stats.setdefault((name, scope), RuleStats())
+            if allowed:
+                stats.allowed += 1
+            else:
+                stats.limited += 1
+        if allowed:
+            return None
+
+        retry_after = max(math.ceil(retry_after), 1)
+        response = jsonify({
+            'error': 'rate_limited',
+            'message': f'Too many requests; retry in {retry_after} s'
+        })
+        response.status_code = 429
+        response.headers['Retry-After'] = str(retry_after)
+        return response
+
+    def snapshot(self):
+        """
+        Allowed and limited counts per rule and scope (this worker)
+
+        Returns:
+            Dictionary of 'rule:scope' to {'limit', 'allowed', 'limited'}
+        """
+        with self._lock:
+            items = list(self._stats.items())
+        return {
+            f'{name}:{scope}': {
+                'limit': '{}/{}s'.format(*self.rules[name][scope]),
+                'allowed': stats.allowed,
+                'limited': stats.limited,
+            }
+            for (name, scope), stats in items
+        }
+
+    def render_prometheus(self):
+        """Per-rule counters in Prometheus text exposition format"""
+        lines = [
+            '# HELP delight_rate_limit_requests_total Requests checked per rate limit rule, by outcome',
+            '# TYPE delight_rate_limit_requests_total counter',
+        ]
+        with self._lock:
+            items = list(self._stats.items())
+        for (name, scope), stats in items:
+            for outcome, value in (('allowed', stats.allowed), ('limited', stats.limited)):
+                lines.append(f'delight_rate_limit_requests_total{{rule="{name}",scope="{scope}",outcome="{outcome}"}} '
+                             f'{value}')
+        return '\n'.join(lines) + '\n'
+
+    def reset(self):
+        """Empty every bucket and counter"""
+        self.store.reset()
+        with self._lock:
+            self._stats.clear()
+
+
+limiter = RateLimiter()
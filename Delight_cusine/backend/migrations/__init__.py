@@ -0,0 +1,134 @@
+"""
+Migrations package
+Versioned schema migrations tracked in the schema_migrations table
+
+Each module in migrations/versions defines:
+    version: Integer, strictly increasing
+    description: One-line summary
+    upgrade(op): Applies the change using migrations.operations.Operations
+"""
+import importlib
+import pkgutil
+from datetime import datetime
+from sqlalchemy import exc
+from extensions.db import db
+from migrations import versions
+from migrations.operations import Operations
+
+
+def load_migrations():
+    """
+    Import every migration module, ordered by version
+
+    Returns:
+        List of migration modules
+    """
+    modules = [
+        importlib.import_module(f'{versions.__name__}.{name}')
+        for _, name, _ in pkgutil.iter_modules(versions.__path__)
+    ]
+    modules.sort(key=lambda module: module.version)
+
+    seen = set()
+    for module in modules:
+        if module.version in seen:
+            raise ValueError(f'Duplicate migration version {module.version}')
+        seen.add(module.version)
+
+    return modules
+
+
+def latest_version():
+    """Highest migration version shipped with the code"""
+    migrations = load_migrations()
+    return migrations[-1].version if migrations else 0
+
+
+def current_version():
+    """
+    Read the database's schema version with a single query
+
+    Returns:
+        Applied version, or 0 if the database has never been migrated
+    """
+    try:
+        with db.engine.connect() as conn:
+            return conn.execute(db.text('SELECT MAX(version) FROM schema_migrations')).scalar() or 0
+    except exc.OperationalError:
+        return 0
+    except exc.ProgrammingError:
+        return 0
+
+
+def _ensure_version_table():
+    with db.engine.begin() as conn:
+        conn.execute(db.text(
+            'CREATE TABLE IF NOT EXISTS schema_migrations ('
+            'version INTEGER PRIMARY KEY, '
+            'description VARCHAR(255) NOT NULL, '
+            'applied_at TIMESTAMP NOT NULL)'
+        ))
+
+
+def upgrade(target=None, echo=print):
+    """
+    Apply pending migrations in order, recording each one
+
+    Args:
+        target: Stop after this version (default: latest)
+        echo: Progress output function
+
+    Returns:
+        List of applied versions
+    """
+    _ensure_version_table()
+    applied = []
+    start = current_version()
+
+    for migration in load_migrations():
+        if migration.version <= start or (target is not None and migration.version > target):
+            continue
+
+        echo(f'→ {migration.version:04d} {migration.description}')
+        migration.upgrade(Operations(db.engine, echo))
+
+        with db.engine.begin() as conn:
+            conn.execute(
+                db.text('INSERT INTO schema_migrations (version, description, applied_at) '
+                        'VALUES (:version, :description, :applied_at)'),
+                {'version': migration.version, 'description': migration.description,
+                 'applied_at': datetime.utcnow()}
+            )
+        applied.append(migration.version)
+
+    return applied
+
+
+def check_schema(app):
+    """
+    Startup check: compare the database version with the code's
+
+    Costs one query instead of introspecting every table. When the
+    database is behind, MIGRATE_ON_START applies the pending
+    migrations (development); otherwise a warning is logged and the
+    schema is left for `flask db upgrade`.
+
+    Args:
+        app: Flask application (inside its app context)
+
+    Returns:
+        True if the schema is current
+    """
+    current, latest = current_version(), latest_version()
+    if current >= latest:
+        return True
+
+    if app.config.get('MIGRATE_ON_START'):
+        upgrade()
+        return True
+
+    app.logger.warning(
+        'Database schema is at version %s, code expects %s. Run: flask db upgrade',
+        current, latest
+    )
+    return False
@@ -0,0 +1,36 @@
+"""
+Migration CLI module
+Registers `flask db ...` commands
+"""
+import click
+from flask.cli import AppGroup
+import migrations
+
+db_cli = AppGroup('db', help='Schema migration commands')
+
+
+@db_cli.command('upgrade')
+@click.option('--to', 'target', type=int, default=None, help='Stop after this version')
+def upgrade_command(target):
+    """Apply pending migrations"""
+    applied = migrations.upgrade(target, echo=click.echo)
+    if applied:
+        click.echo(f'✓ Database at version {applied[-1]}')
+    else:
+        click.echo('✓ Database already up to date')
+
+
+@db_cli.command('current')
+def current_command():
+    """Show the applied and latest schema versions"""
+    click.echo(f'Database version: {migrations.current_version()}')
+    click.echo(f'Latest version:   {migrations.latest_version()}')
+
+
+@db_cli.command('history')
+def history_command():
+    """List every migration and whether it is applied"""
+    current = migrations.current_version()
+    for migration in migrations.load_migrations():
+        mark = '✓' if migration.version <= current else ' '
+        click.echo(f'{mark} {migration.version:04d} {migration.description}')
@@ -0,0 +1,129 @@
+"""
+Migration operations module
+Online-safe schema operations used by migration scripts
+"""
+import time
+from sqlalchemy import inspect
+
+
+class Operations:
+    """
+    Schema operations bound to an engine
+
+    Every operation is idempotent (safe on databases created before
+    versioned migrations existed) and avoids long table locks:
+        - add_column only adds nullable/defaulted columns, which SQLite and
+          PostgreSQL 11+ apply without rewriting the table
+        - create_index builds CONCURRENTLY on PostgreSQL
+        - backfill updates rows in small committed batches
+    """
+
+    def __init__(self, engine, echo=print):
+        self.engine = engine
+        self.echo = echo
+
+    def has_table(self, table_name):
+        return inspect(self.engine).has_table(table_name)
+
+    def has_column(self, table_name, column_name):
+        return any(col['name'] == column_name for col in inspect(self.engine).get_columns(table_name))
+
+    def has_index(self, table_name, index_name):
+        return any(index['name'] == index_name for index in inspect(self.engine).get_indexes(table_name))
+
+    def create_tables(self, metadata):
+        """Create every table in `metadata` that does not exist yet"""
+        metadata.create_all(bind=self.engine, checkfirst=True)
+
+    def add_column(self, table_name, column):
+        """
+        Add a column if it is missing
+
+        Args:
+            table_name: Existing table
+            column: sqlalchemy Column; must be nullable or have a server_default
+
+        Raises:
+            ValueError: If the column would force a table rewrite
+        """
+        if not column.nullable and column.server_default is None:
+            raise ValueError(f'{column.name}: NOT NULL columns need a server_default')
+
+        if self.has_column(table_name, column.name):
+            self.echo(f'  ✓ {table_name}.{column.name} already exists')
+            return
+
+        column_type = column.type.compile(dialect=self.engine.dialect)
+        ddl = f'ALTER TABLE {table_name} ADD COLUMN {column.name} {column_type}'
+        if column.server_default is not None:
+            default = column.server_default.arg
+            ddl += f" DEFAULT '{default}'" if isinstance(default, str) else f' DEFAULT {default}'
+        if not column.nullable:
+            ddl += ' NOT NULL'
+
+        with self.engine.begin() as conn:
+            conn.exec_driver_sql(ddl)
+        self.echo(f'  ✓ added {table_name}.{column.name}')
+
+    def create_index(self, index_name, table_name, columns, unique=False):
+        """
+        Create an index if it is missing, without blocking writes on PostgreSQL
+
+        Args:
+            index_name: Index name
+            table_name: Indexed table
+            columns: List of column names, in index order
+            unique: Whether to create a UNIQUE index
+        """
+        if self.has_index(table_name, index_name):
+            self.echo(f'  ✓ {index_name} already exists')
+            return
+
+        concurrently = ' CONCURRENTLY' if self.engine.dialect.name == 'postgresql' else ''
+        ddl = (f'CREATE {"UNIQUE " if unique else ""}INDEX{concurrently} {index_name} '
+               f'ON {table_name} ({", ".join(columns)})')
+
+        if concurrently:
+            # CONCURRENTLY cannot run inside a transaction block
+            with self.engine.connect().execution_options(isolation_level='AUTOCOMMIT') as conn:
+                conn.exec_driver_sql(ddl)
+        else:
+            with self.engine.begin() as conn:
+                conn.exec_driver_sql(ddl)
+        self.echo(f'  ✓ created {index_name}')
+
+    def backfill(self, table_name, set_clause, where, batch_size=1000, pause=0.0):
+        """
+        UPDATE matching rows in batches, committing after each batch
+
+        Each batch is its own short transaction, so writers are never
+        locked out for longer than one batch. `where` must stop matching
+        a row once it has been updated, or the loop will not end.
+
+        Args:
+            table_name: Table to update
+            set_clause: SQL SET expression, e.g. "is_deleted = 0"
+            where: SQL condition selecting rows still to update
+            batch_size: Rows per transaction
+            pause: Seconds to sleep between batches to yield to traffic
+
+        Returns:
+            Total number of rows updated
+        """
+        statement = (
+            f'UPDATE {table_name} SET {set_clause} WHERE id IN '
+            f'(SELECT id FROM {table_name} WHERE {where} LIMIT {int(batch_size)})'
+        )
+
+        total = 0
+        while True:
+            with self.engine.begin() as conn:
+                updated = conn.exec_driver_sql(statement).rowcount
+            total += updated
+            if updated < batch_size:
+                break
+            if pause:
+                time.sleep(pause)
+
+        self.echo(f'  ✓ backfilled {total} rows in {table_name}')
+        return total
@@ -0,0 +1,60 @@
+"""
+Initial schema: users, menu_items, orders, order_items
+Tables as they existed before versioned migrations; existing ones are left untouched
+"""
+import sqlalchemy as sa
+
+version = 1
+description = 'initial schema'
+
+metadata = sa.MetaData()
+
+sa.Table(
+    'users', metadata,
+    sa.Column('id', sa.Integer, primary_key=True),
+    sa.Column('email', sa.String(120), nullable=False, unique=True, index=True),
+    sa.Column('password', sa.String(255), nullable=False),
+    sa.Column('name', sa.String(100), nullable=False),
+    sa.Column('role', sa.String(20), nullable=False),
+    sa.Column('created_at', sa.DateTime),
+)
+
+sa.Table(
+    'menu_items', metadata,
+    sa.Column('id', sa.Integer, primary_key=True),
+    sa.Column('name', sa.String(100), nullable=False),
+    sa.Column('description', sa.Text),
+    sa.Column('price', sa.Float, nullable=False),
+    sa.Column('category', sa.String(50), nullable=False),
+    sa.Column('image_url', sa.String(255)),
+    sa.Column('available', sa.Boolean),
+    sa.Column('created_at', sa.DateTime),
+    sa.Column('updated_at', sa.DateTime),
+)
+
+sa.Table(
+    'orders', metadata,
+    sa.Column('id', sa.Integer, primary_key=True),
+    sa.Column('user_id', sa.Integer, sa.ForeignKey('users.id'), nullable=False),
+    sa.Column('status', sa.String(20), nullable=False),
+    sa.Column('total_amount', sa.Float, nullable=False),
+    sa.Column('delivery_address', sa.Text),
+    sa.Column('notes', sa.Text),
+    sa.Column('order_mode', sa.String(50)),
+    sa.Column('payment_method', sa.String(50)),
+    sa.Column('created_at', sa.DateTime),
+    sa.Column('updated_at', sa.DateTime),
+)
+
+sa.Table(
+    'order_items', metadata,
+    sa.Column('id', sa.Integer, primary_key=True),
+    sa.Column('order_id', sa.Integer, sa.ForeignKey('orders.id'), nullable=False),
+    sa.Column('menu_item_id', sa.Integer, sa.ForeignKey('menu_items.id'), nullable=False),
+    sa.Column('quantity', sa.Integer, nullable=False),
+    sa.Column('price', sa.Float, nullable=False),
+)
+
+
+def upgrade(op):
+    op.create_tables(metadata)
@@ -0,0 +1,13 @@
+"""
+Soft delete flag on menu items (replaces del_col.py / deleted_col.py)
+"""
+import sqlalchemy as sa
+
+version = 2
+description = 'add menu_items.is_deleted'
+
+
+def upgrade(op):
+    op.add_column('menu_items', sa.Column('is_deleted', sa.Boolean, server_default='0'))
+    # Rows written outside the ORM before the default existed
+    op.backfill('menu_items', 'is_deleted = false', 'is_deleted IS NULL')
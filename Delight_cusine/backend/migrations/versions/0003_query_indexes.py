@@ -0,0 +1,15 @@
+"""
+Composite indexes for the order and menu listing queries (replaces add_indexes.py)
+"""
+version = 3
+description = 'order and menu query indexes'
+
+
+def upgrade(op):
+    op.create_index('ix_orders_user_created', 'orders', ['user_id', 'created_at', 'id'])
+    op.create_index('ix_orders_user_status_created', 'orders', ['user_id', 'status', 'created_at', 'id'])
+    op.create_index('ix_orders_status_created', 'orders', ['status', 'created_at', 'id'])
+    op.create_index('ix_orders_created', 'orders', ['created_at', 'id'])
+    op.create_index('ix_order_items_order_id', 'order_items', ['order_id'])
+    op.create_index('ix_menu_items_category_deleted_available', 'menu_items',
+                    ['category', 'is_deleted', 'available'])
@@ -0,0 +1,27 @@
+"""
+Database-backed restaurant status (replaces the per-process dict)
+"""
+import sqlalchemy as sa
+
+version = 4
+description = 'restaurant_settings table'
+
+metadata = sa.MetaData()
+
+restaurant_settings = sa.Table(
+    'restaurant_settings', metadata,
+    sa.Column('id', sa.Integer, primary_key=True),
+    sa.Column('is_open', sa.Boolean, nullable=False),
+    sa.Column('message', sa.String(255), nullable=False),
+    sa.Column('version', sa.Integer, nullable=False),
+    sa.Column('updated_at', sa.DateTime),
+)
+
+
+def upgrade(op):
+    op.create_tables(metadata)
+    with op.engine.begin() as conn:
+        if conn.execute(sa.select(restaurant_settings.c.id)).first() is None:
+            conn.execute(restaurant_settings.insert().values(
+                id=1, is_open=True, message='We are currently accepting orders!', version=1
+            ))
@@ -0,0 +1,31 @@
+"""
+Sales rollup tables for the analytics endpoints
+Existing order history is loaded with `flask analytics backfill`
+"""
+import sqlalchemy as sa
+
+version = 5
+description = 'sales rollup tables'
+
+metadata = sa.MetaData()
+
+sa.Table(
+    'sales_daily_items', metadata,
+    sa.Column('day', sa.Date, primary_key=True),
+    sa.Column('menu_item_id', sa.Integer, primary_key=True),
+    sa.Column('status', sa.String(20), primary_key=True),
+    sa.Column('quantity', sa.Integer, nullable=False),
+    sa.Column('revenue', sa.Float, nullable=False),
+)
+
+sa.Table(
+    'sales_daily_orders', metadata,
+    sa.Column('day', sa.Date, primary_key=True),
+    sa.Column('status', sa.String(20), primary_key=True),
+    sa.Column('orders', sa.Integer, nullable=False),
+    sa.Column('revenue', sa.Float, nullable=False),
+)
+
+
+def upgrade(op):
+    op.create_tables(metadata)
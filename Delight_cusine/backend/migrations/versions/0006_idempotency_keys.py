@@ -0,0 +1,25 @@
+"""
+Stored responses for Idempotency-Key order submissions
+"""
+import sqlalchemy as sa
+
+version = 6
+description = 'idempotency_keys table'
+
+metadata = sa.MetaData()
+
+sa.Table(
+    'idempotency_keys', metadata,
+    sa.Column('user_id', sa.Integer, primary_key=True),
+    sa.Column('key', sa.String(255), primary_key=True),
+    sa.Column('request_hash', sa.String(64), nullable=False),
+    sa.Column('status_code', sa.Integer, nullable=False),
+    sa.Column('response_body', sa.Text, nullable=False),
+    sa.Column('created_at', sa.DateTime, nullable=False),
+    sa.Column('expires_at', sa.DateTime, nullable=False),
+    sa.Index('ix_idempotency_keys_expires_at', 'expires_at'),
+)
+
+
+def upgrade(op):
+    op.create_tables(metadata)
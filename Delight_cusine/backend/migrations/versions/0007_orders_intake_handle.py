@@ -0,0 +1,12 @@
+"""
+Handle of orders placed through the queued intake (ORDER_INTAKE_MODE=queued)
+"""
+import sqlalchemy as sa
+
+version = 7
+description = 'add orders.intake_handle'
+
+
+def upgrade(op):
+    op.add_column('orders', sa.Column('intake_handle', sa.String(40), nullable=True))
+    op.create_index('ix_orders_intake_handle', 'orders', ['intake_handle'], unique=True)
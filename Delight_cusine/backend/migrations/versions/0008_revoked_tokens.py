@@ -0,0 +1,25 @@
+"""
+Revoked JWTs: tokens ended by logout, and refresh tokens from before refresh
+token families (0009), which are made single-use here
+"""
+import sqlalchemy as sa
+
+version = 8
+description = 'revoked_tokens table'
+
+metadata = sa.MetaData()
+
+sa.Table(
+    'revoked_tokens', metadata,
+    sa.Column('jti', sa.String(36), primary_key=True),
+    sa.Column('user_id', sa.Integer, nullable=False),
+    sa.Column('token_type', sa.String(10), nullable=False),
+    sa.Column('revoked_at', sa.DateTime, nullable=False),
+    sa.Column('expires_at', sa.DateTime, nullable=False),
+    sa.Index('ix_revoked_tokens_revoked_at', 'revoked_at'),
+    sa.Index('ix_revoked_tokens_expires_at', 'expires_at'),
+)
+
+
+def upgrade(op):
+    op.create_tables(metadata)
@@ -0,0 +1,24 @@
+"""
+Refresh token families: one row per login, rotated in place on every refresh
+"""
+import sqlalchemy as sa
+
+version = 9
+description = 'refresh_families table'
+
+metadata = sa.MetaData()
+
+sa.Table(
+    'refresh_families', metadata,
+    sa.Column('id', sa.String(36), primary_key=True),
+    sa.Column('user_id', sa.Integer, nullable=False),
+    sa.Column('generation', sa.Integer, nullable=False),
+    sa.Column('revoked', sa.Boolean, nullable=False),
+    sa.Column('rotated_at', sa.DateTime, nullable=False),
+    sa.Column('expires_at', sa.DateTime, nullable=False),
+    sa.Index('ix_refresh_families_expires_at', 'expires_at'),
+)
+
+
+def upgrade(op):
+    op.create_tables(metadata)
@@ -0,0 +1,4 @@
+"""
+Migration versions package
+One module per schema version, named NNNN_description.py
+"""
@@ -5,4 +5,4 @@ Exports all database models
 # Import models to make them available when package is imported
 # This ensures all models are registered with SQLAlchemy
 
-__all__ = ['User', 'MenuItem', 'Order', 'OrderItem']
\ No newline at end of file
+__all__ = ['User', 'MenuItem', 'Order', 'OrderItem', 'RestaurantSettings', 'DailyItemSales', 'DailyOrderSales', 'IdempotencyKey', 'RevokedToken', 'RefreshFamily']
\ No newline at end of file
@@ -0,0 +1,34 @@
+"""
+Analytics model module
+Sales rollup tables, maintained incrementally as orders change
+"""
+from extensions.db import db
+
+
+class DailyItemSales(db.Model):
+    """Units and revenue per order day x menu item x order status"""
+
+    __tablename__ = 'sales_daily_items'
+
+    day = db.Column(db.Date, primary_key=True)
+    menu_item_id = db.Column(db.Integer, primary_key=True)
+    status = db.Column(db.String(20), primary_key=True)
+    quantity = db.Column(db.Integer, nullable=False, default=0)
+    revenue = db.Column(db.Float, nullable=False, default=0.0)
+
+    def __repr__(self):
+        return f'<DailyItemSales {self.day} item={self.menu_item_id} {self.status}>'
+
+
+class DailyOrderSales(db.Model):
+    """Order count and revenue per order day x order status (for basket size)"""
+
+    __tablename__ = 'sales_daily_orders'
+
+    day = db.Column(db.Date, primary_key=True)
+    status = db.Column(db.String(20), primary_key=True)
+    orders = db.Column(db.Integer, nullable=False, default=0)
+    revenue = db.Column(db.Float, nullable=False, default=0.0)
+
+    def __repr__(self):
+        return f'<DailyOrderSales {self.day} {self.status}>'
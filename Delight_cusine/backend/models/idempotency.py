@@ -0,0 +1,23 @@
+"""
+Idempotency model module
+Stored responses of requests sent with an Idempotency-Key header
+"""
+from extensions.db import db
+from datetime import datetime
+
+
+class IdempotencyKey(db.Model):
+    """A client's idempotency key and the response it produced, until it expires"""
+
+    __tablename__ = 'idempotency_keys'
+
+    user_id = db.Column(db.Integer, primary_key=True)
+    key = db.Column(db.String(255), primary_key=True)
+    request_hash = db.Column(db.String(64), nullable=False)  # SHA-256 of the request body
+    status_code = db.Column(db.Integer, nullable=False)
+    response_body = db.Column(db.Text, nullable=False)
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    expires_at = db.Column(db.DateTime, nullable=False, index=True)
+
+    def __repr__(self):
+        return f'<IdempotencyKey user={self.user_id} {self.key}>'
@@ -9,6 +9,10 @@ class MenuItem(db.Model):
     """Menu item model"""
 
     __tablename__ = 'menu_items'
+    __table_args__ = (
+        # Public menu filters: category, then soft-delete and availability flags
+        db.Index('ix_menu_items_category_deleted_available', 'category', 'is_deleted', 'available'),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(100), nullable=False)
@@ -4,11 +4,20 @@ Defines order and order item entities
 """
 from extensions.db import db
 from datetime import datetime
+from sqlalchemy.orm import joinedload, load_only, noload, selectinload
 
 class Order(db.Model):
     """Order model"""
 
     __tablename__ = 'orders'
+    __table_args__ = (
+        # Customer history: user_id [+ status], newest first (keyset on created_at, id)
+        db.Index('ix_orders_user_created', 'user_id', 'created_at', 'id'),
+        db.Index('ix_orders_user_status_created', 'user_id', 'status', 'created_at', 'id'),
+        # Admin listing: all orders or by status, newest first
+        db.Index('ix_orders_status_created', 'status', 'created_at', 'id'),
+        db.Index('ix_orders_created', 'created_at', 'id'),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
@@ -20,10 +29,29 @@ class Order(db.Model):
     payment_method = db.Column(db.String(50), default='Cash on Delivery')
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    intake_handle = db.Column(db.String(40), unique=True)  # Set for orders placed through the queued intake
 
     # Relationships
     items = db.relationship('OrderItem', backref='order', lazy=True, cascade='all, delete-orphan')
 
+    @classmethod
+    def loader_options(cls, profile='list'):
+        """
+        Get eager-loading options for an endpoint's access pattern
+
+        Args:
+            profile: One of ORDER_LOADER_PROFILES
+                - 'list': many orders; items via one SELECT ... IN per page,
+                  menu item names joined into that same SELECT
+                - 'detail': a single order; items and menu items joined
+                  into the order's own SELECT
+                - 'summary': orders without items (to_dict(include_items=False))
+
+        Returns:
+            List of loader options for Query.options()
+        """
+        return ORDER_LOADER_PROFILES[profile]()
+
     def to_dict(self, include_items=True):
         """
         Convert order to dictionary
@@ -63,7 +91,7 @@ class OrderItem(db.Model):
     __tablename__ = 'order_items'
 
     id = db.Column(db.Integer, primary_key=True)
-    order_id = db.Column(db.Integer, db.ForeignKey('orders.id'), nullable=False)
+    order_id = db.Column(db.Integer, db.ForeignKey('orders.id'), nullable=False, index=True)
     menu_item_id = db.Column(db.Integer, db.ForeignKey('menu_items.id'), nullable=False)
     quantity = db.Column(db.Integer, nullable=False, default=1)
     price = db.Column(db.Float, nullable=False)  # Price at time of order
@@ -90,4 +118,18 @@ class OrderItem(db.Model):
         }
 
     def __repr__(self):
-        return f'<OrderItem {self.id}>'
\ No newline at end of file
+        return f'<OrderItem {self.id}>'
+
+
+def _menu_item_name_only():
+    """Only the columns OrderItem.to_dict reads from the menu item"""
+    from models.menu import MenuItem
+    return joinedload(OrderItem.menu_item).options(load_only(MenuItem.id, MenuItem.name))
+
+
+# Loader profiles keyed by name - see Order.loader_options
+ORDER_LOADER_PROFILES = {
+    'list': lambda: [selectinload(Order.items).options(_menu_item_name_only())],
+    'detail': lambda: [joinedload(Order.items).options(_menu_item_name_only())],
+    'summary': lambda: [noload(Order.items)],
+}
\ No newline at end of file
@@ -0,0 +1,34 @@
+"""
+Restaurant model module
+Defines the restaurant settings entity (open/closed status)
+"""
+from extensions.db import db
+from datetime import datetime
+
+
+class RestaurantSettings(db.Model):
+    """Restaurant settings - a single row (id=1) shared by every worker"""
+
+    __tablename__ = 'restaurant_settings'
+
+    id = db.Column(db.Integer, primary_key=True)
+    is_open = db.Column(db.Boolean, nullable=False, default=True)
+    message = db.Column(db.String(255), nullable=False, default='We are currently accepting orders!')
+    version = db.Column(db.Integer, nullable=False, default=1)  # Bumped on every change
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    def to_dict(self):
+        """
+        Convert settings to dictionary
+
+        Returns:
+            Dictionary representation of the restaurant status
+        """
+        return {
+            'is_open': self.is_open,
+            'message': self.message,
+            'version': self.version
+        }
+
+    def __repr__(self):
+        return f'<RestaurantSettings open={self.is_open} v{self.version}>'
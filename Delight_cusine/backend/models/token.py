@@ -0,0 +1,42 @@
+"""
+Token model module
+Revoked JWTs (logged-out tokens) until they expire, and refresh token families
+"""
+from extensions.db import db
+from datetime import datetime
+
+
+class RevokedToken(db.Model):
+    """A revoked token's jti, kept until the token would have expired anyway"""
+
+    __tablename__ = 'revoked_tokens'
+
+    jti = db.Column(db.String(36), primary_key=True)
+    user_id = db.Column(db.Integer, nullable=False)
+    token_type = db.Column(db.String(10), nullable=False)  # 'access' or 'refresh'
+    revoked_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow, index=True)
+    expires_at = db.Column(db.DateTime, nullable=False, index=True)
+
+    def __repr__(self):
+        return f'<RevokedToken {self.token_type} {self.jti}>'
+
+
+class RefreshFamily(db.Model):
+    """
+    One login's chain of rotated refresh tokens
+
+    Refresh tokens carry their family id and generation; only the current
+    generation can be exchanged, and each exchange advances it in place.
+    """
+
+    __tablename__ = 'refresh_families'
+
+    id = db.Column(db.String(36), primary_key=True)
+    user_id = db.Column(db.Integer, nullable=False)
+    generation = db.Column(db.Integer, nullable=False, default=0)
+    revoked = db.Column(db.Boolean, nullable=False, default=False)
+    rotated_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    expires_at = db.Column(db.DateTime, nullable=False, index=True)
+
+    def __repr__(self):
+        return f'<RefreshFamily {self.id} gen={self.generation}>'
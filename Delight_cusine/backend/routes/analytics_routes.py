@@ -0,0 +1,158 @@
+"""
+Analytics routes module
+Admin sales reports served from the daily rollup tables
+"""
+from datetime import date
+from flask import Blueprint, request, jsonify
+from flask_jwt_extended import jwt_required
+from services import sales_analytics
+from utils.decorators import admin_required
+
+analytics_bp = Blueprint('analytics', __name__)
+
+TOP_ITEMS_LIMIT_MAX = 100
+
+
+def _date_range():
+    """
+    Parse ?from=YYYY-MM-DD&to=YYYY-MM-DD (both inclusive)
+
+    Returns:
+        Tuple of (start, end) dates; defaults to the last 30 days
+
+    Raises:
+        ValueError: If a date is malformed or the range is reversed
+    """
+    default_start, default_end = sales_analytics.default_range()
+    start = request.args.get('from')
+    end = request.args.get('to')
+    start = date.fromisoformat(start) if start else default_start
+    end = date.fromisoformat(end) if end else default_end
+    if start > end:
+        raise ValueError('from must not be after to')
+    return start, end
+
+
+def _invalid_range(e):
+    return jsonify({
+        'error': 'invalid_date_range',
+        'message': f'Dates must be YYYY-MM-DD and from <= to ({e})'
+    }), 400
+
+
+@analytics_bp.route('/summary', methods=['GET'])
+@jwt_required()
+@admin_required
+def get_summary():
+    """
+    Revenue, order count, average basket and orders per status (admin only)
+
+    Query parameters:
+        - from: First day, YYYY-MM-DD (optional, default 29 days ago)
+        - to: Last day, YYYY-MM-DD (optional, default today)
+
+    Returns:
+        200: Summary
+        400: Invalid date range
+        403: Admin privileges required
+    """
+    try:
+        start, end = _date_range()
+    except ValueError as e:
+        return _invalid_range(e)
+
+    try:
+        return jsonify(sales_analytics.summary(start, end)), 200
+
+    except Exception as e:
+        return jsonify({
+            'error': 'fetch_failed',
+            'message': str(e)
+        }), 500
+
+
+@analytics_bp.route('/revenue', methods=['GET'])
+@jwt_required()
+@admin_required
+def get_revenue_by_day():
+    """
+    Revenue, orders and average basket per day (admin only)
+
+    Query parameters:
+        - from: First day, YYYY-MM-DD (optional)
+        - to: Last day, YYYY-MM-DD (optional)
+
+    Returns:
+        200: Daily revenue
+        400: Invalid date range
+        403: Admin privileges required
+    """
+    try:
+        start, end = _date_range()
+    except ValueError as e:
+        return _invalid_range(e)
+
+    try:
+        days = sales_analytics.revenue_by_day(start, end)
+        return jsonify({
+            'from': start.isoformat(),
+            'to': end.isoformat(),
+            'days': days,
+            'count': len(days)
+        }), 200
+
+    except Exception as e:
+        return jsonify({
+            'error': 'fetch_failed',
+            'message': str(e)
+        }), 500
+
+
+@analytics_bp.route('/top-items', methods=['GET'])
+@jwt_required()
+@admin_required
+def get_top_items():
+    """
+    Best-selling menu items (admin only)
+
+    Query parameters:
+        - from: First day, YYYY-MM-DD (optional)
+        - to: Last day, YYYY-MM-DD (optional)
+        - limit: Number of items (optional, default 10, max 100)
+        - sort: 'quantity' (default) or 'revenue'
+
+    Returns:
+        200: Top items
+        400: Invalid date range, limit or sort
+        403: Admin privileges required
+    """
+    try:
+        start, end = _date_range()
+    except ValueError as e:
+        return _invalid_range(e)
+
+    sort = request.args.get('sort', 'quantity')
+    try:
+        limit = min(int(request.args.get('limit', 10)), TOP_ITEMS_LIMIT_MAX)
+        if limit < 1 or sort not in ('quantity', 'revenue'):
+            raise ValueError
+    except ValueError:
+        return jsonify({
+            'error': 'invalid_parameters',
+            'message': 'limit must be a positive integer and sort one of: quantity, revenue'
+        }), 400
+
+    try:
+        items = sales_analytics.top_items(start, end, limit, sort)
+        return jsonify({
+            'from': start.isoformat(),
+            'to': end.isoformat(),
+            'items': items,
+            'count': len(items)
+        }), 200
+
+    except Exception as e:
+        return jsonify({
+            'error': 'fetch_failed',
+            'message': str(e)
+        }), 500
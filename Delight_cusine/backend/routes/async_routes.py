@@ -0,0 +1,125 @@
+"""
+Async routes module
+Native ASGI handlers for the long-lived Server-Sent Event streams
+
+Under asgi.py these replace the blueprint views of the same paths, which
+hold a worker thread for as long as the client stays connected. Here an
+idle stream is a suspended coroutine, so one process can hold thousands.
+Everything else is served by the blueprints through utils.asgi_bridge.
+"""
+import asyncio
+from flask import jsonify
+from flask_jwt_extended import get_jwt_identity, verify_jwt_in_request
+from extensions.db import db
+from extensions.events import events
+from services import order_events, restaurant_status
+from utils.asgi_bridge import build_environ
+from utils.decorators import current_user_role
+
+SSE_HEADERS = [
+    (b'content-type', b'text/event-stream; charset=utf-8'),
+    (b'cache-control', b'no-cache'),
+    (b'x-accel-buffering', b'no'),
+    (b'access-control-allow-origin', b'*'),
+]
+
+
+def _last_event_id(value):
+    return int(value) if value and value.isdigit() else None
+
+
+async def _send_response(send, response):
+    """Send a complete (non-streaming) Flask response"""
+    # Error responses from the jwt loaders already carry flask-cors' header; a second copy fails CORS
+    if 'Access-Control-Allow-Origin' not in response.headers:
+        response.headers['Access-Control-Allow-Origin'] = '*'
+    headers = [(name.lower().encode('latin-1'), value.encode('latin-1')) for name, value in response.headers.items()]
+    await send({'type': 'http.response.start', 'status': response.status_code, 'headers': headers})
+    await send({'type': 'http.response.body', 'body': response.get_data()})
+
+
+async def _stream(receive, send, generator):
+    """Send an SSE generator until it ends or the client disconnects"""
+    async def pump():
+        await send({'type': 'http.response.start', 'status': 200, 'headers': SSE_HEADERS})
+        async for chunk in generator:
+            await send({'type': 'http.response.body', 'body': chunk.encode(), 'more_body': True})
+
+    async def disconnected():
+        while (await receive())['type'] != 'http.disconnect':
+            pass
+
+    tasks = [asyncio.create_task(pump()), asyncio.create_task(disconnected())]
+    try:
+        done, _ = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+        for task in done:
+            task.result()
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        await generator.aclose()
+
+
+def _authenticate(flask_app, environ):
+    """
+    Verify the token like the blueprint view: a header access token, or a ticket in ?jwt=
+
+    Runs on a worker thread: the revocation and user lookups may query the
+    database through the synchronous session.
+
+    Returns:
+        (topics, None) when authenticated, else (None, error response)
+    """
+    with flask_app.request_context(environ):
+        try:
+            verify_jwt_in_request(locations=['headers', 'query_string'])
+            if not order_events.query_token_is_ticket():
+                return None, flask_app.make_response((jsonify(order_events.TICKET_REQUIRED), 401))
+            return order_events.topics_for(get_jwt_identity(), current_user_role()), None
+        except Exception as e:
+            # The same error responses the blueprint view returns (jwt error loaders)
+            try:
+                rv = flask_app.handle_user_exception(e)
+            except Exception as unhandled:
+                rv = flask_app.handle_exception(unhandled)
+            return None, flask_app.make_response(rv)
+        finally:
+            db.session.remove()
+
+
+async def stream_order_events(bridge, scope, receive, send):
+    """
+    GET /api/orders/events - see order_routes.stream_order_events
+    """
+    environ = build_environ(scope, b'')
+    loop = asyncio.get_running_loop()
+    topics, error = await loop.run_in_executor(bridge.executor, _authenticate, bridge.wsgi_app, environ)
+    if error is not None:
+        await _send_response(send, error)
+        return
+
+    with bridge.wsgi_app.request_context(environ) as ctx:
+        last_event_id = _last_event_id(ctx.request.headers.get('Last-Event-ID')
+                                       or ctx.request.args.get('last_event_id'))
+    await _stream(receive, send, events.stream_async(topics, last_event_id))
+
+
+async def stream_status(bridge, scope, receive, send):
+    """
+    GET /api/restaurant/status/stream - see restaurant_routes.stream_status
+    """
+    last_event_id = None
+    for name, value in scope['headers']:
+        if name == b'last-event-id':
+            last_event_id = _last_event_id(value.decode('latin-1'))
+
+    with bridge.wsgi_app.app_context():
+        await _stream(receive, send, restaurant_status.status_events_async(last_event_id))
+
+
+# (method, path) -> handler(bridge, scope, receive, send)
+ROUTES = {
+    ('GET', '/api/orders/events'): stream_order_events,
+    ('GET', '/api/restaurant/status/stream'): stream_status,
+}
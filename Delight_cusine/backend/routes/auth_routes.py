@@ -5,19 +5,35 @@ Handles user registration, login, and JWT token management
 from flask import Blueprint, request, jsonify
 from flask_jwt_extended import (
     create_access_token,
-    create_refresh_token,  # ADD THIS LINE
+    decode_token,
     jwt_required,
+    get_jwt,
     get_jwt_identity
 )
-from werkzeug.security import generate_password_hash, check_password_hash
+from sqlalchemy.exc import IntegrityError
 from extensions.db import db
+from extensions.jwt import cache_user, load_user
+from extensions.rate_limit import limiter
 from models.user import User
-from utils.decorators import validate_request_data
+from services import passwords, token_revocation
+from utils.decorators import rate_limit, validate_request_data
 
 auth_bp = Blueprint('auth', __name__)
 
 
+def _hasher_busy():
+    """429 for a request turned away because the password hashing pool is saturated"""
+    response = jsonify({
+        'error': 'too_many_requests',
+        'message': 'The server is busy signing users in; please retry shortly'
+    })
+    response.status_code = 429
+    response.headers['Retry-After'] = '1'
+    return response
+
+
 @auth_bp.route('/register', methods=['POST'])
+@rate_limit('register')
 @validate_request_data(['email', 'password', 'name'])
 def register():
     """
@@ -26,6 +42,11 @@ def register():
     try:
         data = request.get_json()
 
+        # Attempts per email, from any address (the IP limit ran before parsing)
+        rejected = limiter.check_account('register', data['email'])
+        if rejected is not None:
+            return rejected
+
         # Check if user already exists
         if User.query.filter_by(email=data['email']).first():
             return jsonify({
@@ -34,7 +55,7 @@ def register():
             }), 409
 
         # Create new user
-        hashed_password = generate_password_hash(data['password'], method='pbkdf2:sha256')
+        hashed_password = passwords.hash_password(data['password'])
         new_user = User(
             email=data['email'],
             password=hashed_password,
@@ -44,10 +65,12 @@ def register():
 
         db.session.add(new_user)
         db.session.commit()
+        cache_user(new_user)  # Lets the role claim loader skip a lookup
 
         # Generate both tokens
         access_token = create_access_token(identity=new_user.id)
-        refresh_token = create_refresh_token(identity=new_user.id)
+        refresh_token = token_revocation.issue_refresh_token(new_user.id)
+        db.session.commit()
 
         return jsonify({
             'message': 'User registered successfully',
@@ -56,6 +79,9 @@ def register():
             'user': new_user.to_dict()
         }), 201
 
+    except passwords.PasswordHasherBusy:
+        return _hasher_busy()
+
     except Exception as e:
         db.session.rollback()
         return jsonify({
@@ -65,6 +91,7 @@ def register():
 
 
 @auth_bp.route('/login', methods=['POST'])
+@rate_limit('login')
 @validate_request_data(['email', 'password'])
 def login():
     """
@@ -73,19 +100,36 @@ def login():
     try:
         data = request.get_json()
 
+        # Attempts per account, wherever they come from: throttles stuffing spread over many
+        # addresses before any password is verified (the IP limit ran before parsing)
+        rejected = limiter.check_account('login', data['email'])
+        if rejected is not None:
+            return rejected
+
         # Find user
         user = User.query.filter_by(email=data['email']).first()
 
         # Verify user and password
-        if not user or not check_password_hash(user.password, data['password']):
+        if not user or not passwords.verify_password(user.password, data['password']):
             return jsonify({
                 'error': 'invalid_credentials',
                 'message': 'Invalid email or password'
             }), 401
 
+        # Hashed with an older PASSWORD_HASH_METHOD: store a hash with the current one
+        if passwords.needs_rehash(user.password):
+            try:
+                user.password = passwords.hash_password(data['password'])
+                db.session.commit()
+            except passwords.PasswordHasherBusy:
+                pass  # upgraded at a later login
+
+        cache_user(user)  # Lets the role claim loader skip a lookup
+
         # Generate both access and refresh tokens
         access_token = create_access_token(identity=user.id)
-        refresh_token = create_refresh_token(identity=user.id)
+        refresh_token = token_revocation.issue_refresh_token(user.id)
+        db.session.commit()
 
         return jsonify({
             'message': 'Login successful',
@@ -94,7 +138,11 @@ def login():
             'user': user.to_dict()
         }), 200
 
+    except passwords.PasswordHasherBusy:
+        return _hasher_busy()
+
     except Exception as e:
+        db.session.rollback()
         return jsonify({
             'error': 'login_failed',
             'message': str(e)
@@ -105,29 +153,87 @@ def login():
 @jwt_required(refresh=True)
 def refresh():
     """
-    Refresh access token using refresh token
+    Exchange a refresh token for a new access token and a new refresh token
+
+    Each refresh token can be used once (rotation): replaying it, or losing
+    a concurrent race to use it, gives 401. Replaying an older token also
+    ends the login it belongs to.
 
     Returns:
-        200: New access token
-        401: Invalid refresh token
+        200: New access and refresh tokens
+        401: Invalid, expired or already used refresh token
     """
     try:
         current_user_id = get_jwt_identity()
 
-        # Generate new access token
-        access_token = create_access_token(identity=current_user_id)
+        refresh_token = token_revocation.rotate(get_jwt())
+        try:
+            db.session.commit()
+        except IntegrityError:
+            db.session.rollback()
+            refresh_token = None
+
+        if refresh_token is None:
+            return jsonify({
+                'error': 'token_revoked',
+                'message': 'The token has been revoked'
+            }), 401
 
         return jsonify({
-            'access_token': access_token
+            'access_token': create_access_token(identity=current_user_id),
+            'refresh_token': refresh_token
         }), 200
 
     except Exception as e:
+        db.session.rollback()
         return jsonify({
             'error': 'refresh_failed',
             'message': str(e)
         }), 500
 
 
+@auth_bp.route('/logout', methods=['POST'])
+@jwt_required(verify_type=False)
+def logout():
+    """
+    Revoke the presented token (access or refresh) and, optionally, the
+    refresh token given in the body as refresh_token
+
+    Returns:
+        200: Tokens revoked
+        401: Invalid token
+    """
+    try:
+        token = get_jwt()
+        token_revocation.revoke(token)
+
+        data = request.get_json(silent=True) or {}
+        if data.get('refresh_token'):
+            try:
+                refresh_token = decode_token(data['refresh_token'])
+            except Exception:
+                refresh_token = None  # already expired or not ours: nothing to revoke
+            if refresh_token and refresh_token['type'] == 'refresh' and refresh_token['sub'] == token['sub'] \
+                    and not token_revocation.is_revoked(refresh_token):
+                token_revocation.revoke(refresh_token)
+
+        try:
+            db.session.commit()
+        except IntegrityError:
+            db.session.rollback()  # revoked concurrently; the outcome is the same
+
+        return jsonify({
+            'message': 'Logged out'
+        }), 200
+
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({
+            'error': 'logout_failed',
+            'message': str(e)
+        }), 500
+
+
 @auth_bp.route('/me', methods=['GET'])
 @jwt_required()
 def get_current_user():
@@ -135,17 +241,9 @@ def get_current_user():
     Get current authenticated user's information
     """
     try:
-        current_user_id = get_jwt_identity()
-        user = User.query.get(current_user_id)
-
-        if not user:
-            return jsonify({
-                'error': 'user_not_found',
-                'message': 'User not found'
-            }), 404
-
+        # Served from the user cache primed by the JWT user lookup loader
         return jsonify({
-            'user': user.to_dict()
+            'user': load_user(get_jwt_identity())
         }), 200
 
     except Exception as e:
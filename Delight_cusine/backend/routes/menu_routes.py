@@ -2,16 +2,98 @@
 Menu routes module
 Handles menu item CRUD operations
 """
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, Response, current_app, request, jsonify, stream_with_context
 from flask_jwt_extended import jwt_required
+from extensions.cache import cache
+from extensions.compression import compression
 from extensions.db import db
 from models.menu import MenuItem
-from utils.decorators import admin_required, validate_request_data
+from services import menu_import, menu_search
+from utils import serializers
+from utils.decorators import admin_required, conditional_get, validate_request_data
 
 menu_bp = Blueprint('menu', __name__)
 
+# Cache namespace for public menu responses; bumped by every menu write
+MENU_CACHE_NAMESPACE = 'menu'
+
+
+def _cached_json(key_parts, build):
+    """
+    Serve a JSON response from the menu cache, building it on a miss
+
+    Args:
+        key_parts: Values identifying the response (endpoint + filters)
+        build: Callable returning (payload dict, status code)
+
+    Returns:
+        Flask response tuple; only 200 responses are cached
+    """
+    key = cache.versioned_key(MENU_CACHE_NAMESPACE, *key_parts)
+    body = cache.get(key)
+
+    if body is None:
+        payload, status = build()
+        if status != 200:
+            return jsonify(payload), status
+
+        body = serializers.dumps(payload)
+        cache.set(key, body, current_app.config['MENU_CACHE_TTL'])
+
+    encoding = compression.negotiate('application/json', len(body))
+    if encoding is None:
+        return Response(body, mimetype='application/json'), 200
+
+    # Compressed bodies are cached next to the JSON, so a hit costs no compression
+    compressed_key = f'{key}:{encoding}'
+    compressed = cache.get(compressed_key)
+    if compressed is None:
+        compressed = compression.compress(body, encoding)
+        cache.set(compressed_key, compressed, current_app.config['MENU_CACHE_TTL'])
+    compression.record(encoding, len(body), len(compressed))
+
+    response = Response(compressed, mimetype='application/json')
+    compression.mark(response, encoding)
+    return response, 200
+
+
+def _fields_key(fields):
+    """Cache key part for a sparse fieldset"""
+    return ','.join(sorted(fields)) if fields else None
+
+
+def _menu_state(*args, **kwargs):
+    """
+    Cheap version source for menu ETags: latest updated_at and row count
+
+    Every menu write touches updated_at (or adds a row), so this pair
+    changes whenever any menu response would. The pair itself is cached
+    under the menu version, so repeat checks cost no query.
+    """
+    key = cache.versioned_key(MENU_CACHE_NAMESPACE, 'state')
+    state = cache.get(key)
+
+    if state is None:
+        last_updated, count = db.session.query(
+            db.func.max(MenuItem.updated_at), db.func.count(MenuItem.id)
+        ).one()
+        state = f'{last_updated.isoformat() if last_updated else ""}|{count}'.encode()
+        cache.set(key, state, current_app.config['MENU_CACHE_TTL'])
+
+    return (state,)
+
+
+def _invalidate_menu_cache():
+    """
+    Drop every cached menu response and apply the change to the search
+    index (call after a successful commit)
+    """
+    version = cache.bump_version(MENU_CACHE_NAMESPACE)
+    menu_search.refresh(version)
+
 
 @menu_bp.route('', methods=['GET'])
+@conditional_get(_menu_state)
 def get_menu_items():
     """
     Get all menu items (public endpoint)
@@ -22,35 +104,50 @@ def get_menu_items():
         - category: Filter by category (optional)
         - available: Filter by availability (optional, true/false)
         - include_deleted: Include soft-deleted items (optional, admin only)
+        - fields: Comma-separated fields to return per item (optional)
 
     Returns:
         200: List of menu items
+        400: Unknown field
     """
     try:
-        # Start with base query - exclude deleted items by default
-        query = MenuItem.query.filter_by(is_deleted=False)
+        fields = serializers.requested_fields(serializers.MENU_ITEM_FIELDS)
+    except ValueError as e:
+        return jsonify({
+            'error': 'invalid_fields',
+            'message': str(e)
+        }), 400
 
-        # Admin can request to see deleted items
+    try:
         include_deleted = request.args.get('include_deleted', 'false').lower() == 'true'
-        if include_deleted:
-            query = MenuItem.query  # Show all items including deleted
-
-        # Apply filters
         category = request.args.get('category')
-        if category:
-            query = query.filter_by(category=category)
-
         available = request.args.get('available')
         if available is not None:
-            available_bool = available.lower() == 'true'
-            query = query.filter_by(available=available_bool)
+            available = available.lower() == 'true'
 
-        menu_items = query.all()
+        def build():
+            # Start with base query - exclude deleted items by default
+            query = MenuItem.query.filter_by(is_deleted=False)
 
-        return jsonify({
-            'menu_items': [item.to_dict() for item in menu_items],
-            'count': len(menu_items)
-        }), 200
+            # Admin can request to see deleted items
+            if include_deleted:
+                query = MenuItem.query  # Show all items including deleted
+
+            # Apply filters
+            if category:
+                query = query.filter_by(category=category)
+
+            if available is not None:
+                query = query.filter_by(available=available)
+
+            menu_items = serializers.menu_items(query, fields)
+
+            return {
+                'menu_items': menu_items,
+                'count': len(menu_items)
+            }, 200
+
+        return _cached_json(('items', category, available, include_deleted, _fields_key(fields)), build)
 
     except Exception as e:
         return jsonify({
@@ -59,27 +156,98 @@ def get_menu_items():
         }), 500
 
 
+@menu_bp.route('/search', methods=['GET'])
+def search_menu_items():
+    """
+    Search non-deleted menu items by name, category and description (public endpoint)
+    Prefix and typo tolerant; results are ranked best match first
+
+    Query parameters:
+        - q: Search text (required)
+        - category: Filter by category (optional)
+        - available: Filter by availability (optional, true/false)
+        - limit: Maximum number of results (optional, default 20)
+
+    Returns:
+        200: Ranked menu items, each with a relevance score
+        400: Missing query or invalid limit
+    """
+    try:
+        text = request.args.get('q', '').strip()
+        if not text:
+            return jsonify({
+                'error': 'missing_query',
+                'message': 'Query parameter q is required'
+            }), 400
+
+        try:
+            limit = int(request.args.get('limit', 20))
+            if not 1 <= limit <= current_app.config['MENU_SEARCH_LIMIT_MAX']:
+                raise ValueError
+        except ValueError:
+            return jsonify({
+                'error': 'invalid_limit',
+                'message': f"limit must be between 1 and {current_app.config['MENU_SEARCH_LIMIT_MAX']}"
+            }), 400
+
+        available = request.args.get('available')
+        if available is not None:
+            available = available.lower() == 'true'
+
+        index = menu_search.get_index()
+        index.sync_if_stale(cache.get_version(MENU_CACHE_NAMESPACE))
+        results = index.search(text, request.args.get('category'), available, limit)
+
+        return serializers.json_response({
+            'query': text,
+            'results': [dict(item, score=score) for item, score in results],
+            'count': len(results)
+        })
+
+    except Exception as e:
+        return jsonify({
+            'error': 'search_failed',
+            'message': str(e)
+        }), 500
+
+
 @menu_bp.route('/<int:item_id>', methods=['GET'])
+@conditional_get(_menu_state)
 def get_menu_item(item_id):
     """
     Get a specific menu item by ID
 
+    Query parameters:
+        - fields: Comma-separated fields to return (optional)
+
     Returns:
         200: Menu item details
+        400: Unknown field
         404: Menu item not found
     """
     try:
-        menu_item = MenuItem.query.filter_by(id=item_id, is_deleted=False).first()
+        fields = serializers.requested_fields(serializers.MENU_ITEM_FIELDS)
+    except ValueError as e:
+        return jsonify({
+            'error': 'invalid_fields',
+            'message': str(e)
+        }), 400
 
-        if not menu_item:
-            return jsonify({
-                'error': 'item_not_found',
-                'message': 'Menu item not found'
-            }), 404
+    try:
+        def build():
+            menu_item = MenuItem.query.filter_by(id=item_id, is_deleted=False).first()
 
-        return jsonify({
-            'menu_item': menu_item.to_dict()
-        }), 200
+            if not menu_item:
+                return {
+                    'error': 'item_not_found',
+                    'message': 'Menu item not found'
+                }, 404
+
+            return {
+                'menu_item': serializers.select_fields(menu_item.to_dict(), fields)
+            }, 200
+
+        return _cached_json(('item', item_id, _fields_key(fields)), build)
 
     except Exception as e:
         return jsonify({
@@ -140,6 +308,7 @@ def create_menu_item():
 
         db.session.add(new_item)
         db.session.commit()
+        _invalidate_menu_cache()
 
         return jsonify({
             'message': 'Menu item created successfully',
@@ -206,6 +375,7 @@ def update_menu_item(item_id):
             menu_item.available = data['available']
 
         db.session.commit()
+        _invalidate_menu_cache()
 
         return jsonify({
             'message': 'Menu item updated successfully',
@@ -244,6 +414,7 @@ def toggle_item_availability(item_id):
 
         menu_item.available = not menu_item.available
         db.session.commit()
+        _invalidate_menu_cache()
 
         return jsonify({
             'message': f'Item {"enabled" if menu_item.available else "disabled"} successfully',
@@ -283,6 +454,7 @@ def delete_menu_item(item_id):
         # Soft delete - mark as deleted instead of removing from database
         menu_item.is_deleted = True
         db.session.commit()
+        _invalidate_menu_cache()
 
         return jsonify({
             'message': 'Menu item deleted successfully'
@@ -319,6 +491,7 @@ def restore_menu_item(item_id):
 
         menu_item.is_deleted = False
         db.session.commit()
+        _invalidate_menu_cache()
 
         return jsonify({
             'message': 'Menu item restored successfully',
@@ -334,6 +507,7 @@ def restore_menu_item(item_id):
 
 
 @menu_bp.route('/categories', methods=['GET'])
+@conditional_get(_menu_state)
 def get_categories():
     """
     Get all unique menu categories (only from non-deleted items)
@@ -342,16 +516,129 @@ def get_categories():
         200: List of categories
     """
     try:
-        categories = db.session.query(MenuItem.category).filter_by(is_deleted=False).distinct().all()
-        category_list = [cat[0] for cat in categories]
+        def build():
+            categories = db.session.query(MenuItem.category).filter_by(is_deleted=False).distinct().all()
+            category_list = [cat[0] for cat in categories]
 
-        return jsonify({
-            'categories': category_list,
-            'count': len(category_list)
-        }), 200
+            return {
+                'categories': category_list,
+                'count': len(category_list)
+            }, 200
+
+        return _cached_json(('categories',), build)
 
     except Exception as e:
         return jsonify({
             'error': 'fetch_failed',
             'message': str(e)
-        }), 500
\ No newline at end of file
+        }), 500
+
+@menu_bp.route('/import', methods=['POST'])
+@jwt_required()
+@admin_required
+def import_menu_items():
+    """
+    Bulk create/update menu items from a CSV or NDJSON upload (admin only)
+
+    The body is either the raw file (Content-Type text/csv or
+    application/x-ndjson) or a multipart form with a 'file' field. Rows are
+    parsed as they stream in, validated and written in batches, all inside
+    one transaction. A row with an id updates that item; a row without one
+    updates the non-deleted item with the same name, or creates a new item.
+
+    Columns / keys: id, name, description, price, category, image_url, available
+
+    Query parameters:
+        - format: csv or ndjson (optional; otherwise from the content type
+          or file extension)
+        - on_error: 'abort' (default) rolls back everything if any row is
+          invalid; 'skip' commits the valid rows
+        - dry_run: Validate only, write nothing (optional, true/false)
+
+    Returns:
+        200: Import summary with per-row errors
+        400: Invalid parameters
+        413: Too many rows
+        415: Unsupported format
+        422: Invalid rows, nothing imported (on_error=abort)
+        403: Admin privileges required
+    """
+    try:
+        on_error = request.args.get('on_error', 'abort')
+        if on_error not in ('abort', 'skip'):
+            return jsonify({
+                'error': 'invalid_on_error',
+                'message': "on_error must be 'abort' or 'skip'"
+            }), 400
+        dry_run = request.args.get('dry_run', 'false').lower() == 'true'
+
+        upload = request.files.get('file')
+        if upload:
+            stream, mimetype, filename = upload.stream, upload.mimetype, upload.filename
+        else:
+            stream, mimetype, filename = request.stream, request.mimetype, None
+
+        fmt = menu_import.detect_format(request.args.get('format'), mimetype, filename)
+        parse = menu_import.parse_csv if fmt == 'csv' else menu_import.parse_ndjson
+
+        result, committed = menu_import.import_rows(parse(stream), dry_run=dry_run, atomic=on_error == 'abort')
+        if committed:
+            _invalidate_menu_cache()
+
+        rejected = on_error == 'abort' and result.failed and not dry_run
+        return jsonify({
+            'message': 'Import rejected: no rows were imported' if rejected
+            else 'Dry run: no rows were imported' if dry_run
+            else 'Menu import completed',
+            'format': fmt,
+            'dry_run': dry_run,
+            'committed': committed,
+            **result.to_dict()
+        }), 422 if rejected else 200
+
+    except menu_import.MenuImportError as e:
+        db.session.rollback()
+        return jsonify(e.to_dict()), e.status_code
+
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({
+            'error': 'import_failed',
+            'message': str(e)
+        }), 500
+
+
+@menu_bp.route('/export', methods=['GET'])
+@jwt_required()
+@admin_required
+def export_menu_items():
+    """
+    Stream all menu items as CSV or NDJSON (admin only)
+
+    The output uses the import columns (plus is_deleted), so it can be
+    edited and uploaded back to /import.
+
+    Query parameters:
+        - format: csv (default) or ndjson
+        - include_deleted: Include soft-deleted items (optional, true/false)
+
+    Returns:
+        200: Streamed file
+        400: Unsupported format
+        403: Admin privileges required
+    """
+    fmt = request.args.get('format', 'csv').lower()
+    if fmt not in menu_import.FORMATS:
+        return jsonify({
+            'error': 'unsupported_format',
+            'message': 'format must be csv or ndjson'
+        }), 400
+
+    include_deleted = request.args.get('include_deleted', 'false').lower() == 'true'
+    export = menu_import.export_csv if fmt == 'csv' else menu_import.export_ndjson
+
+    return Response(
+        stream_with_context(export(include_deleted, current_app.config['MENU_IMPORT_BATCH_SIZE'])),
+        mimetype='text/csv' if fmt == 'csv' else 'application/x-ndjson',
+        headers={'Content-Disposition': f'attachment; filename=menu.{fmt}'}
+    )
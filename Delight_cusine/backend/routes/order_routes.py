@@ -2,19 +2,219 @@
 Order routes module
 Handles order creation, retrieval, and status management
 """
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, Response, current_app, request, jsonify, stream_with_context, url_for
 from flask_jwt_extended import jwt_required, get_jwt_identity
+from sqlalchemy import update
 from extensions.db import db
-from models.order import Order, OrderItem
-from models.menu import MenuItem
-from models.user import User
-from utils.decorators import admin_required, validate_request_data
+from extensions.events import events
+from models.order import Order
+from services import idempotency, order_events, order_intake, sales_analytics
+from services.order_pricing import OrderValidationError, price_cart, insert_order_items
+from utils import serializers
+from utils.decorators import admin_required, current_user_role, idempotent, rate_limit, validate_request_data
+from utils.pagination import decode_cursor, fetch_page, keyset_order, stream_ndjson
 
 order_bp = Blueprint('orders', __name__)
 
 
+def _load_order(order_id):
+    """Fetch a single order with its items and menu item names in one query"""
+    return Order.query.options(*Order.loader_options('detail')).filter_by(id=order_id).first()
+
+
+def _change_status(order, new_status):
+    """
+    Move an order to new_status, with its sales rollups (the caller commits)
+
+    The UPDATE only matches while the order still has the status this
+    request read. When two changes race (a customer cancel and an admin
+    update), only one applies and moves the rollups, so they never
+    subtract from the same old status twice.
+
+    Returns:
+        The previous status, or None if a concurrent change got there first
+    """
+    previous_status = order.status
+    result = db.session.execute(
+        update(Order).where(Order.id == order.id, Order.status == previous_status).values(status=new_status)
+    )
+    if result.rowcount != 1:
+        return None
+    sales_analytics.record_status_change(order, previous_status)
+    return previous_status
+
+
+def _status_conflict():
+    db.session.rollback()
+    return jsonify({
+        'error': 'status_conflict',
+        'message': 'The order status was changed by another request; reload the order and retry'
+    }), 409
+
+
+def _enqueue_order(user_id, data, order_lines, total_amount):
+    """
+    Hand a priced order to the intake queue (ORDER_INTAKE_MODE=queued)
+
+    Returns:
+        202 response with the order handle, or 503 if the queue is full
+    """
+    claim = idempotency.current_claim()
+    handle = order_intake.new_handle(user_id, claim[1] if claim else None)
+    status_url = url_for('orders.get_queued_order', handle=handle)
+    body = serializers.dumps({
+        'message': 'Order accepted and queued',
+        'order': {'id': handle, 'status': order_intake.QUEUED},
+        'status_url': status_url
+    })
+
+    job = order_intake.IntakeJob(
+        handle, user_id,
+        {
+            'delivery_address': data.get('delivery_address'),
+            'notes': data.get('notes'),
+            'order_mode': data.get('order_mode', 'Delivery'),
+            'payment_method': data.get('payment_method', 'Cash on Delivery'),
+        },
+        order_lines, total_amount, claim, body
+    )
+    try:
+        # A retry of a still-queued submission is not queued again; it gets the same body
+        order_intake.get_queue().enqueue(job)
+    except order_intake.IntakeQueueFull:
+        response = jsonify({
+            'error': 'intake_full',
+            'message': 'Too many orders are waiting to be placed; please retry shortly'
+        })
+        response.status_code = 503
+        response.headers['Retry-After'] = '1'
+        return response
+
+    response = Response(body, status=202, mimetype='application/json')
+    response.headers['Location'] = status_url
+    return response
+
+
+def _invalid_fields(error):
+    return jsonify({
+        'error': 'invalid_fields',
+        'message': str(error)
+    }), 400
+
+
+def _order_response(order):
+    """
+    200 with the order if the current user may see it, 403 otherwise
+
+    Honours a fields query parameter (sparse fieldset, 400 on unknown fields).
+    """
+    # Users can only view their own orders unless they're admin
+    if order.user_id != get_jwt_identity() and current_user_role() != 'admin':
+        return jsonify({
+            'error': 'unauthorized',
+            'message': 'Not authorized to view this order'
+        }), 403
+
+    try:
+        fields = serializers.requested_fields(serializers.ORDER_FIELDS)
+    except ValueError as e:
+        return _invalid_fields(e)
+
+    include_items = fields is None or 'items' in fields
+    return jsonify({
+        'order': serializers.select_fields(order.to_dict(include_items), fields)
+    }), 200
+
+
+def _wants_ndjson():
+    """Whether the client asked for a streamed NDJSON listing"""
+    return (request.args.get('stream') == 'ndjson'
+            or request.accept_mimetypes.best == 'application/x-ndjson')
+
+
+def _order_listing_response(query):
+    """
+    Build the response for an order listing query
+
+    Three modes, chosen by query parameters:
+        - stream=ndjson (or Accept: application/x-ndjson): one order per
+          line, fetched in keyset batches so memory stays bounded
+        - limit and/or cursor: one keyset page plus next_cursor
+        - neither: the full list (original behaviour)
+
+    Every mode honours fields (sparse fieldset); without 'items' in it the
+    order items are not loaded at all.
+
+    Pages and full lists are serialized from column tuples (utils.serializers);
+    the stream walks ORM objects in batches.
+
+    Args:
+        query: Filtered Order query without loader options
+
+    Returns:
+        Flask response tuple
+    """
+    try:
+        fields = serializers.requested_fields(serializers.ORDER_FIELDS)
+    except ValueError as e:
+        return _invalid_fields(e)
+
+    if _wants_ndjson():
+        include_items = fields is None or 'items' in fields
+        return Response(
+            stream_with_context(stream_ndjson(
+                query.options(*Order.loader_options('list' if include_items else 'summary')), Order,
+                lambda order: serializers.select_fields(order.to_dict(include_items), fields),
+                current_app.config['ORDERS_STREAM_BATCH_SIZE']
+            )),
+            mimetype='application/x-ndjson'
+        ), 200
+
+    limit = request.args.get('limit')
+    cursor = request.args.get('cursor')
+
+    query = query.with_entities(*serializers.ORDER_COLUMNS)
+
+    if limit is None and cursor is None:
+        orders = serializers.orders(keyset_order(query, Order).all(), fields)
+        return serializers.json_response({
+            'orders': orders,
+            'count': len(orders)
+        })
+
+    try:
+        max_limit = current_app.config['ORDERS_PAGE_SIZE_MAX']
+        limit = min(int(limit), max_limit) if limit is not None else max_limit
+        if limit < 1:
+            raise ValueError
+    except ValueError:
+        return jsonify({
+            'error': 'invalid_limit',
+            'message': 'limit must be a positive integer'
+        }), 400
+
+    try:
+        cursor = decode_cursor(cursor) if cursor else None
+    except ValueError:
+        return jsonify({
+            'error': 'invalid_cursor',
+            'message': 'Invalid pagination cursor'
+        }), 400
+
+    rows, next_cursor = fetch_page(query, Order, limit, cursor)
+    orders = serializers.orders(rows, fields)
+
+    return serializers.json_response({
+        'orders': orders,
+        'count': len(orders),
+        'next_cursor': next_cursor
+    })
+
+
 @order_bp.route('', methods=['POST'])
 @jwt_required()
+@rate_limit('create_order', per_user=True)
+@idempotent
 @validate_request_data(['items'])
 def create_order():
     """
@@ -27,61 +227,35 @@ def create_order():
         - delivery_address: Delivery address
         - notes: Order notes
 
+    Optional headers:
+        - Idempotency-Key: Client-generated key; retries with the same key
+          and body replay the first response instead of placing another order
+
+    With ORDER_INTAKE_MODE=queued the order is validated and priced, then
+    queued for a background writer: the response is 202 with a handle to
+    poll at GET /api/orders/<handle>.
+
     Returns:
         201: Order created successfully
+        202: Order queued (queued intake mode)
         400: Validation error
         404: Menu item not found
+        409: The same Idempotency-Key is still being processed
+        422: Idempotency-Key already used with a different body
+        503: Intake queue full (queued intake mode)
     """
     try:
         current_user_id = get_jwt_identity()
         data = request.get_json()
 
-        items_data = data.get('items', [])
-        if not items_data or len(items_data) == 0:
-            return jsonify({
-                'error': 'empty_cart',
-                'message': 'Order must contain at least one item'
-            }), 400
+        # Resolve and price every cart line with one menu lookup
+        try:
+            order_lines, total_amount = price_cart(data.get('items', []))
+        except OrderValidationError as e:
+            return jsonify(e.to_dict()), e.status_code
 
-        # Calculate total and validate items
-        total_amount = 0
-        order_items = []
-
-        for item_data in items_data:
-            if 'menu_item_id' not in item_data or 'quantity' not in item_data:
-                return jsonify({
-                    'error': 'invalid_item',
-                    'message': 'Each item must have menu_item_id and quantity'
-                }), 400
-
-            menu_item = MenuItem.query.get(item_data['menu_item_id'])
-            if not menu_item:
-                return jsonify({
-                    'error': 'item_not_found',
-                    'message': f'Menu item {item_data["menu_item_id"]} not found'
-                }), 404
-
-            if not menu_item.available:
-                return jsonify({
-                    'error': 'item_unavailable',
-                    'message': f'{menu_item.name} is currently unavailable'
-                }), 400
-
-            quantity = int(item_data['quantity'])
-            if quantity < 1:
-                return jsonify({
-                    'error': 'invalid_quantity',
-                    'message': 'Quantity must be at least 1'
-                }), 400
-
-            subtotal = menu_item.price * quantity
-            total_amount += subtotal
-
-            order_items.append({
-                'menu_item_id': menu_item.id,
-                'quantity': quantity,
-                'price': menu_item.price
-            })
+        if current_app.config['ORDER_INTAKE_MODE'] == 'queued':
+            return _enqueue_order(current_user_id, data, order_lines, total_amount)
 
         # Create order
         new_order = Order(
@@ -97,22 +271,23 @@ def create_order():
         db.session.add(new_order)
         db.session.flush()  # Get order ID without committing
 
-        # Create order items
-        for item_data in order_items:
-            order_item = OrderItem(
-                order_id=new_order.id,
-                menu_item_id=item_data['menu_item_id'],
-                quantity=item_data['quantity'],
-                price=item_data['price']
-            )
-            db.session.add(order_item)
+        # Create all order items with a single bulk insert
+        insert_order_items(new_order.id, order_lines)
+        sales_analytics.record_order_created(new_order, order_lines)
+
+        # Serialize before the commit expires the order (its items load in one
+        # query); an Idempotency-Key stores this exact body with the order
+        order = _load_order(new_order.id).to_dict()
+        body = serializers.dumps({
+            'message': 'Order created successfully',
+            'order': order
+        })
+        idempotency.remember(201, body)
 
         db.session.commit()
+        order_events.order_created(order)
 
-        return jsonify({
-            'message': 'Order created successfully',
-            'order': new_order.to_dict()
-        }), 201
+        return Response(body, status=201, mimetype='application/json')
 
     except Exception as e:
         db.session.rollback()
@@ -130,9 +305,14 @@ def get_user_orders_public():
 
     Query parameters:
         - status: Filter by status (optional)
+        - limit: Page size for keyset pagination (optional)
+        - cursor: next_cursor from the previous page (optional)
+        - stream: 'ndjson' to stream one order per line (optional)
+        - fields: Comma-separated fields to return per order (optional)
 
     Returns:
         200: List of user's orders or empty array
+        400: Invalid limit, cursor or fields
     """
     from flask_jwt_extended import get_jwt_identity, verify_jwt_in_request
     from flask_jwt_extended.exceptions import NoAuthorizationError
@@ -156,12 +336,7 @@ def get_user_orders_public():
         if status:
             query = query.filter_by(status=status)
 
-        orders = query.order_by(Order.created_at.desc()).all()
-
-        return jsonify({
-            'orders': [order.to_dict() for order in orders],
-            'count': len(orders)
-        }), 200
+        return _order_listing_response(query)
 
     except Exception as e:
         # On any error, return empty array
@@ -171,22 +346,74 @@ def get_user_orders_public():
         }), 200
 
 
+@order_bp.route('/events/ticket', methods=['POST'])
+@jwt_required()
+def create_events_ticket():
+    """
+    Issue a short-lived ticket for GET /events?jwt=<ticket>
+
+    Returns:
+        200: {ticket, expires_in}
+    """
+    ticket, ttl = order_events.issue_stream_ticket(get_jwt_identity())
+    return jsonify({'ticket': ticket, 'expires_in': ttl}), 200
+
+
+@order_bp.route('/events', methods=['GET'])
+@jwt_required(locations=['headers', 'query_string'])
+def stream_order_events():
+    """
+    Stream order changes as Server-Sent Events
+
+    Customers receive events for their own orders, admins for all orders.
+    EventSource cannot set headers, so instead of the access token a
+    ticket from POST /events/ticket may be passed as ?jwt=<ticket>.
+    The ticket is only checked when the stream opens.
+
+    Events:
+        - created: {order} - a new order, in full
+        - status: {id, status, previousStatus, updated_at} - status delta
+        - reset: missed events are unavailable; re-fetch the order list
+
+    Returns:
+        200: text/event-stream
+        401: ?jwt= carries an access token rather than a ticket
+    """
+    if not order_events.query_token_is_ticket():
+        return jsonify(order_events.TICKET_REQUIRED), 401
+
+    topics = order_events.topics_for(get_jwt_identity(), current_user_role())
+
+    last_event_id = request.headers.get('Last-Event-ID') or request.args.get('last_event_id')
+    last_event_id = int(last_event_id) if last_event_id and last_event_id.isdigit() else None
+
+    # The stream can stay open for hours; don't hold a pooled connection
+    db.session.remove()
+
+    return Response(
+        stream_with_context(events.stream(topics, last_event_id)),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
+
 @order_bp.route('/<int:order_id>', methods=['GET'])
 @jwt_required()
 def get_order(order_id):
     """
     Get a specific order by ID
 
+    Query parameters:
+        - fields: Comma-separated fields to return (optional)
+
     Returns:
         200: Order details
+        400: Unknown field
         403: Not authorized to view this order
         404: Order not found
     """
     try:
-        current_user_id = get_jwt_identity()
-        user = User.query.get(current_user_id)
-
-        order = Order.query.get(order_id)
+        order = _load_order(order_id)
 
         if not order:
             return jsonify({
@@ -194,16 +421,62 @@ def get_order(order_id):
                 'message': 'Order not found'
             }), 404
 
-        # Users can only view their own orders unless they're admin
-        if order.user_id != current_user_id and user.role != 'admin':
+        return _order_response(order)
+
+    except Exception as e:
+        return jsonify({
+            'error': 'fetch_failed',
+            'message': str(e)
+        }), 500
+
+
+@order_bp.route('/<handle>', methods=['GET'])
+@jwt_required()
+def get_queued_order(handle):
+    """
+    Get an order placed through the queued intake by its handle
+
+    Returns:
+        200: Order details, once the order is written
+        202: Order still queued
+        403: Not authorized to view this order
+        404: Unknown handle
+        422: The queued order could not be written
+    """
+    try:
+        order = Order.query.options(*Order.loader_options('detail')).filter_by(intake_handle=handle).first()
+        if order:
+            return _order_response(order)
+
+        state = order_intake.get_queue().status(handle)
+        if state is None:
+            # The writer may have committed between the two lookups
+            order = Order.query.options(*Order.loader_options('detail')).filter_by(intake_handle=handle).first()
+            if order:
+                return _order_response(order)
+            return jsonify({
+                'error': 'order_not_found',
+                'message': 'Order not found'
+            }), 404
+
+        if state['user_id'] != get_jwt_identity() and current_user_role() != 'admin':
             return jsonify({
                 'error': 'unauthorized',
                 'message': 'Not authorized to view this order'
             }), 403
 
-        return jsonify({
-            'order': order.to_dict()
-        }), 200
+        if state['status'] == order_intake.FAILED:
+            return jsonify({
+                'error': 'order_failed',
+                'message': state['message']
+            }), 422
+
+        response = jsonify({
+            'order': {'id': handle, 'status': order_intake.QUEUED}
+        })
+        response.status_code = 202
+        response.headers['Retry-After'] = '1'
+        return response
 
     except Exception as e:
         return jsonify({
@@ -222,9 +495,14 @@ def get_all_orders():
     Query parameters:
         - status: Filter by status (optional)
         - user_id: Filter by user (optional)
+        - limit: Page size for keyset pagination (optional)
+        - cursor: next_cursor from the previous page (optional)
+        - stream: 'ndjson' to stream one order per line (optional)
+        - fields: Comma-separated fields to return per order (optional)
 
     Returns:
         200: List of all orders
+        400: Invalid limit, cursor or fields
         403: Admin privileges required
     """
     try:
@@ -239,12 +517,7 @@ def get_all_orders():
         if user_id:
             query = query.filter_by(user_id=int(user_id))
 
-        orders = query.order_by(Order.created_at.desc()).all()
-
-        return jsonify({
-            'orders': [order.to_dict() for order in orders],
-            'count': len(orders)
-        }), 200
+        return _order_listing_response(query)
 
     except Exception as e:
         return jsonify({
@@ -269,9 +542,10 @@ def update_order_status(order_id):
         400: Invalid status
         404: Order not found
         403: Admin privileges required
+        409: The status changed concurrently
     """
     try:
-        order = Order.query.get(order_id)
+        order = _load_order(order_id)
 
         if not order:
             return jsonify({
@@ -290,8 +564,12 @@ def update_order_status(order_id):
                 'message': f'Status must be one of: {", ".join(valid_statuses)}'
             }), 400
 
-        order.status = new_status
+        previous_status = _change_status(order, new_status)
+        if previous_status is None:
+            return _status_conflict()
         db.session.commit()
+        order = _load_order(order_id)
+        order_events.order_status_changed(order, previous_status)
 
         return jsonify({
             'message': 'Order status updated successfully',
@@ -317,12 +595,13 @@ def cancel_order(order_id):
         400: Order cannot be cancelled
         403: Not authorized
         404: Order not found
+        409: The status changed concurrently
     """
     try:
         current_user_id = get_jwt_identity()
-        user = User.query.get(current_user_id)
+        role = current_user_role()
 
-        order = Order.query.get(order_id)
+        order = _load_order(order_id)
 
         if not order:
             return jsonify({
@@ -331,21 +610,25 @@ def cancel_order(order_id):
             }), 404
 
         # Users can only cancel their own orders unless they're admin
-        if order.user_id != current_user_id and user.role != 'admin':
+        if order.user_id != current_user_id and role != 'admin':
             return jsonify({
                 'error': 'unauthorized',
                 'message': 'Not authorized to cancel this order'
             }), 403
 
         # Only PLACED orders can be cancelled by users
-        if order.status != 'PLACED' and user.role != 'admin':
+        if order.status != 'PLACED' and role != 'admin':
             return jsonify({
                 'error': 'cannot_cancel',
                 'message': 'Only orders with PLACED status can be cancelled'
             }), 400
 
-        order.status = 'CANCELLED'
+        previous_status = _change_status(order, 'CANCELLED')
+        if previous_status is None:
+            return _status_conflict()
         db.session.commit()
+        order = _load_order(order_id)
+        order_events.order_status_changed(order, previous_status)
 
         return jsonify({
             'message': 'Order cancelled successfully',
@@ -2,22 +2,17 @@
 Restaurant routes module
 Handles restaurant status and settings management
 """
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, Response, request, jsonify, stream_with_context
 from flask_jwt_extended import jwt_required
 from extensions.db import db
-from utils.decorators import admin_required
+from services import restaurant_status
+from utils.decorators import admin_required, conditional_get
 
 restaurant_bp = Blueprint('restaurant', __name__)
 
-# In-memory storage for restaurant status (for simplicity)
-# In production, this would be stored in database
-restaurant_status = {
-    'is_open': True,
-    'message': 'We are currently accepting orders!'
-}
-
 
 @restaurant_bp.route('/status', methods=['GET'])
+@conditional_get(lambda: (restaurant_status.get_status()['version'],))
 def get_status():
     """
     Get restaurant status (public endpoint - NO AUTH REQUIRED)
@@ -25,10 +20,28 @@ def get_status():
     Returns:
         200: Restaurant status
     """
-    return jsonify({
-        'isOpen': restaurant_status['is_open'],
-        'message': restaurant_status['message']
-    }), 200
+    return jsonify(restaurant_status.to_public(restaurant_status.get_status())), 200
+
+
+@restaurant_bp.route('/status/stream', methods=['GET'])
+def stream_status():
+    """
+    Stream restaurant status changes as Server-Sent Events (public endpoint)
+
+    Clients use EventSource instead of polling /status. The current
+    status is sent first unless Last-Event-ID already matches it.
+
+    Returns:
+        200: text/event-stream of 'status' events
+    """
+    last_event_id = request.headers.get('Last-Event-ID')
+    last_version = int(last_event_id) if last_event_id and last_event_id.isdigit() else None
+
+    return Response(
+        stream_with_context(restaurant_status.status_events(last_version)),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
 
 
 @restaurant_bp.route('/status', methods=['PUT'])
@@ -49,21 +62,18 @@ def update_status():
     try:
         data = request.get_json() or {}
 
-        if 'is_open' in data:
-            restaurant_status['is_open'] = bool(data['is_open'])
-
-        if 'message' in data:
-            restaurant_status['message'] = data['message']
+        status = restaurant_status.update_status(
+            is_open=data.get('is_open'),
+            message=data.get('message')
+        )
 
         return jsonify({
             'message': 'Restaurant status updated successfully',
-            'status': {
-                'isOpen': restaurant_status['is_open'],
-                'message': restaurant_status['message']
-            }
+            'status': restaurant_status.to_public(status)
         }), 200
 
     except Exception as e:
+        db.session.rollback()
         return jsonify({
             'error': 'update_failed',
             'message': str(e)
@@ -82,24 +92,16 @@ def toggle_status():
         403: Admin privileges required
     """
     try:
-        restaurant_status['is_open'] = not restaurant_status['is_open']
-
-        # Update message based on status
-        restaurant_status['message'] = (
-            'We are currently accepting orders!' if restaurant_status['is_open']
-            else 'We are currently closed. Please check back later!'
-        )
+        status = restaurant_status.toggle_status()
 
         return jsonify({
             'message': 'Restaurant status toggled successfully',
-            'status': {
-                'isOpen': restaurant_status['is_open'],
-                'message': restaurant_status['message']
-            }
+            'status': restaurant_status.to_public(status)
         }), 200
 
     except Exception as e:
+        db.session.rollback()
         return jsonify({
             'error': 'toggle_failed',
             'message': str(e)
-        }), 500
\ No newline at end of file
+        }), 500
@@ -2,158 +2,166 @@
 Seed data module
 Contains functions to populate database with initial data
 """
+import click
+from flask import current_app
+from flask.cli import with_appcontext
+from sqlalchemy import insert
 from extensions.db import db
 from models.menu import MenuItem
 from models.user import User
 from werkzeug.security import generate_password_hash
 
 
+# Initial menu; seeding inserts any of these (by name) that are missing
+MENU_ITEMS = [
+    # Appetizers
+    dict(
+        name="Spring Rolls",
+        description="Crispy vegetable spring rolls served with sweet chili sauce",
+        price=5.99,
+        category="appetizer",
+        image_url="https://example.com/spring-rolls.jpg",
+        available=True
+    ),
+    dict(
+        name="Chicken Wings",
+        description="Spicy buffalo wings with blue cheese dip",
+        price=8.99,
+        category="appetizer",
+        image_url="https://example.com/wings.jpg",
+        available=True
+    ),
+    dict(
+        name="Garlic Bread",
+        description="Toasted bread with garlic butter and herbs",
+        price=4.99,
+        category="appetizer",
+        image_url="https://example.com/garlic-bread.jpg",
+        available=True
+    ),
+
+    # Main Courses
+    dict(
+        name="Margherita Pizza",
+        description="Classic pizza with tomato sauce, mozzarella, and fresh basil",
+        price=12.99,
+        category="main",
+        image_url="https://example.com/pizza.jpg",
+        available=True
+    ),
+    dict(
+        name="Grilled Chicken Pasta",
+        description="Penne pasta with grilled chicken in creamy alfredo sauce",
+        price=14.99,
+        category="main",
+        image_url="https://example.com/pasta.jpg",
+        available=True
+    ),
+    dict(
+        name="Beef Burger",
+        description="Juicy beef patty with lettuce, tomato, and special sauce",
+        price=11.99,
+        category="main",
+        image_url="https://example.com/burger.jpg",
+        available=True
+    ),
+    dict(
+        name="Grilled Salmon",
+        description="Fresh Atlantic salmon with lemon butter sauce",
+        price=18.99,
+        category="main",
+        image_url="https://example.com/salmon.jpg",
+        available=True
+    ),
+    dict(
+        name="Vegetable Stir Fry",
+        description="Mixed vegetables in Asian-style sauce with rice",
+        price=10.99,
+        category="main",
+        image_url="https://example.com/stir-fry.jpg",
+        available=True
+    ),
+
+    # Desserts
+    dict(
+        name="Chocolate Cake",
+        description="Rich chocolate cake with vanilla ice cream",
+        price=6.99,
+        category="dessert",
+        image_url="https://example.com/cake.jpg",
+        available=True
+    ),
+    dict(
+        name="Tiramisu",
+        description="Classic Italian dessert with coffee and mascarpone",
+        price=7.99,
+        category="dessert",
+        image_url="https://example.com/tiramisu.jpg",
+        available=True
+    ),
+    dict(
+        name="Cheesecake",
+        description="New York style cheesecake with berry compote",
+        price=7.49,
+        category="dessert",
+        image_url="https://example.com/cheesecake.jpg",
+        available=True
+    ),
+
+    # Beverages
+    dict(
+        name="Fresh Orange Juice",
+        description="Freshly squeezed orange juice",
+        price=3.99,
+        category="beverage",
+        image_url="https://example.com/orange-juice.jpg",
+        available=True
+    ),
+    dict(
+        name="Iced Coffee",
+        description="Cold brew coffee with ice and milk",
+        price=4.99,
+        category="beverage",
+        image_url="https://example.com/iced-coffee.jpg",
+        available=True
+    ),
+    dict(
+        name="Mango Smoothie",
+        description="Fresh mango blended with yogurt and honey",
+        price=5.49,
+        category="beverage",
+        image_url="https://example.com/smoothie.jpg",
+        available=True
+    ),
+    dict(
+        name="Soft Drink",
+        description="Choice of Coca-Cola, Sprite, or Fanta",
+        price=2.99,
+        category="beverage",
+        image_url="https://example.com/soft-drink.jpg",
+        available=True
+    ),
+]
+
+
 def seed_menu_items():
-    """Seed database with initial menu items if empty"""
+    """
+    Insert any MENU_ITEMS that are missing, matched by name
 
-    # Check if menu items already exist
-    if MenuItem.query.count() > 0:
+    Idempotent: one query reads the existing names and one bulk INSERT
+    adds the rest, so re-running never duplicates or overwrites items.
+    """
+    existing = {name for (name,) in db.session.query(MenuItem.name).all()}
+    missing = [item for item in MENU_ITEMS if item['name'] not in existing]
+
+    if not missing:
         print("✓ Menu items already exist")
         return
 
-    # Sample menu items
-    menu_items = [
-        # Appetizers
-        MenuItem(
-            name="Spring Rolls",
-            description="Crispy vegetable spring rolls served with sweet chili sauce",
-            price=5.99,
-            category="appetizer",
-            image_url="https://example.com/spring-rolls.jpg",
-            available=True
-        ),
-        MenuItem(
-            name="Chicken Wings",
-            description="Spicy buffalo wings with blue cheese dip",
-            price=8.99,
-            category="appetizer",
-            image_url="https://example.com/wings.jpg",
-            available=True
-        ),
-        MenuItem(
-            name="Garlic Bread",
-            description="Toasted bread with garlic butter and herbs",
-            price=4.99,
-            category="appetizer",
-            image_url="https://example.com/garlic-bread.jpg",
-            available=True
-        ),
-
-        # Main Courses
-        MenuItem(
-            name="Margherita Pizza",
-            description="Classic pizza with tomato sauce, mozzarella, and fresh basil",
-            price=12.99,
-            category="main",
-            image_url="https://example.com/pizza.jpg",
-            available=True
-        ),
-        MenuItem(
-            name="Grilled Chicken Pasta",
-            description="Penne pasta with grilled chicken in creamy alfredo sauce",
-            price=14.99,
-            category="main",
-            image_url="https://example.com/pasta.jpg",
-            available=True
-        ),
-        MenuItem(
-            name="Beef Burger",
-            description="Juicy beef patty with lettuce, tomato, and special sauce",
-            price=11.99,
-            category="main",
-            image_url="https://example.com/burger.jpg",
-            available=True
-        ),
-        MenuItem(
-            name="Grilled Salmon",
-            description="Fresh Atlantic salmon with lemon butter sauce",
-            price=18.99,
-            category="main",
-            image_url="https://example.com/salmon.jpg",
-            available=True
-        ),
-        MenuItem(
-            name="Vegetable Stir Fry",
-            description="Mixed vegetables in Asian-style sauce with rice",
-            price=10.99,
-            category="main",
-            image_url="https://example.com/stir-fry.jpg",
-            available=True
-        ),
-
-        # Desserts
-        MenuItem(
-            name="Chocolate Cake",
-            description="Rich chocolate cake with vanilla ice cream",
-            price=6.99,
-            category="dessert",
-            image_url="https://example.com/cake.jpg",
-            available=True
-        ),
-        MenuItem(
-            name="Tiramisu",
-            description="Classic Italian dessert with coffee and mascarpone",
-            price=7.99,
-            category="dessert",
-            image_url="https://example.com/tiramisu.jpg",
-            available=True
-        ),
-        MenuItem(
-            name="Cheesecake",
-            description="New York style cheesecake with berry compote",
-            price=7.49,
-            category="dessert",
-            image_url="https://example.com/cheesecake.jpg",
-            available=True
-        ),
-
-        # Beverages
-        MenuItem(
-            name="Fresh Orange Juice",
-            description="Freshly squeezed orange juice",
-            price=3.99,
-            category="beverage",
-            image_url="https://example.com/orange-juice.jpg",
-            available=True
-        ),
-        MenuItem(
-            name="Iced Coffee",
-            description="Cold brew coffee with ice and milk",
-            price=4.99,
-            category="beverage",
-            image_url="https://example.com/iced-coffee.jpg",
-            available=True
-        ),
-        MenuItem(
-            name="Mango Smoothie",
-            description="Fresh mango blended with yogurt and honey",
-            price=5.49,
-            category="beverage",
-            image_url="https://example.com/smoothie.jpg",
-            available=True
-        ),
-        MenuItem(
-            name="Soft Drink",
-            description="Choice of Coca-Cola, Sprite, or Fanta",
-            price=2.99,
-            category="beverage",
-            image_url="https://example.com/soft-drink.jpg",
-            available=True
-        ),
-    ]
-
-    # Add all menu items to the session
-    for item in menu_items:
-        db.session.add(item)
-
     try:
+        db.session.execute(insert(MenuItem), missing)
         db.session.commit()
-        print(f"✓ Successfully seeded {len(menu_items)} menu items")
+        print(f"✓ Successfully seeded {len(missing)} menu items")
     except Exception as e:
         db.session.rollback()
         print(f"✗ Error seeding menu items: {e}")
@@ -166,7 +174,7 @@ def create_default_admin():
     if not admin:
         admin = User(
             email='admin@delightcuisine.com',
-            password=generate_password_hash('admin123', method='pbkdf2:sha256'),
+            password=generate_password_hash('admin123', method=current_app.config['PASSWORD_HASH_METHOD']),
             name='Admin User',
             role='admin'
         )
@@ -186,4 +194,16 @@ def seed_all():
     print("\n=== Seeding Database ===")
     create_default_admin()
     seed_menu_items()
-    print("=== Seeding Complete ===\n")
\ No newline at end of file
+    print("=== Seeding Complete ===\n")
+
+
+@click.command('seed')
+@click.option('--with-admin', is_flag=True, help='Also create the default admin account')
+@with_appcontext
+def seed_command(with_admin):
+    """Seed the database with the initial menu (safe to re-run)"""
+    if with_admin:
+        seed_all()
+    else:
+        seed_menu_items()
+        print("💡 To create an admin user, run: python create_admin.py")
\ No newline at end of file
@@ -0,0 +1,4 @@
+"""
+Services package
+Business logic shared by the route blueprints
+"""
\ No newline at end of file
@@ -0,0 +1,183 @@
+"""
+Idempotency service module
+Idempotency-Key handling for write endpoints: stored responses with a TTL,
+replayed to retries, and coalescing of concurrent duplicates
+
+A successful response is stored in the same transaction as the write it
+describes, so a key either has both or neither. Retries of a completed
+request get the stored response back after one primary-key lookup.
+Duplicates that arrive while the first request is still running wait for
+it in this process; across worker processes the key's primary key makes
+the second commit fail, and that request then replays the winner's response.
+"""
+import hashlib
+import json
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from flask import Response, current_app, g
+from extensions.db import db
+from models.idempotency import IdempotencyKey
+
+IDEMPOTENCY_HEADER = 'Idempotency-Key'
+REPLAYED_HEADER = 'Idempotent-Replayed'
+MAX_KEY_LENGTH = IdempotencyKey.key.type.length
+
+# How often (seconds, per process) expired keys are deleted
+PURGE_INTERVAL = 300
+
+_inflight = {}
+_inflight_lock = threading.Lock()
+_last_purge = 0.0
+
+
+class IdempotencyError(Exception):
+    """Raised when an Idempotency-Key cannot be used for a request"""
+
+    def __init__(self, error, message, status_code=400):
+        super().__init__(message)
+        self.error = error
+        self.message = message
+        self.status_code = status_code
+
+    def to_dict(self):
+        return {
+            'error': self.error,
+            'message': self.message
+        }
+
+
+def validate_key(key):
+    """
+    Check an Idempotency-Key header value
+
+    Raises:
+        IdempotencyError: If the key is empty or too long
+    """
+    if not key or len(key) > MAX_KEY_LENGTH:
+        raise IdempotencyError(
+            'invalid_idempotency_key',
+            f'{IDEMPOTENCY_HEADER} must be 1 to {MAX_KEY_LENGTH} characters'
+        )
+
+
+def fingerprint(payload):
+    """SHA-256 of a request payload in canonical JSON form"""
+    canonical = json.dumps(payload, sort_keys=True, separators=(',', ':'))
+    return hashlib.sha256(canonical.encode()).hexdigest()
+
+
+@contextmanager
+def coalesced(user_id, key):
+    """
+    Run at most one request per (user, key) at a time in this process
+
+    A duplicate waits until the running request finishes (bounded by
+    IDEMPOTENCY_WAIT_TIMEOUT), then proceeds and normally finds the stored
+    response.
+    """
+    slot = (user_id, key)
+    deadline = time.monotonic() + current_app.config['IDEMPOTENCY_WAIT_TIMEOUT']
+    while True:
+        with _inflight_lock:
+            running = _inflight.get(slot)
+            if running is None:
+                done = _inflight[slot] = threading.Event()
+                break
+        remaining = deadline - time.monotonic()
+        if remaining <= 0 or not running.wait(remaining):
+            raise IdempotencyError(
+                'idempotency_key_in_use',
+                'A request with this Idempotency-Key is still being processed',
+                409
+            )
+
+    try:
+        yield
+    finally:
+        with _inflight_lock:
+            del _inflight[slot]
+        done.set()
+
+
+def lookup(user_id, key, request_hash):
+    """
+    Stored response for a key, if it exists and has not expired
+
+    Args:
+        user_id: Key owner
+        key: Idempotency-Key value
+        request_hash: fingerprint() of the current request
+
+    Returns:
+        Replay Response, or None
+
+    Raises:
+        IdempotencyError: If the key was used with a different request
+    """
+    stored = db.session.get(IdempotencyKey, (user_id, key))
+    if stored is None:
+        return None
+
+    if stored.expires_at <= datetime.utcnow():
+        db.session.execute(IdempotencyKey.__table__.delete().where(
+            IdempotencyKey.user_id == user_id, IdempotencyKey.key == key
+        ))
+        db.session.expunge(stored)
+        return None
+
+    if stored.request_hash != request_hash:
+        raise IdempotencyError(
+            'idempotency_key_reused',
+            f'This {IDEMPOTENCY_HEADER} was already used with a different request',
+            422
+        )
+
+    response = Response(stored.response_body, status=stored.status_code, mimetype='application/json')
+    response.headers[REPLAYED_HEADER] = 'true'
+    return response
+
+
+def current_claim():
+    """(user_id, key, request_hash) of the current request's Idempotency-Key, or None"""
+    return g.get('idempotency_claim')
+
+
+def remember(status_code, body, claim=None):
+    """
+    Store a response for the current request's key, if it has one
+
+    Adds the key to the session; it is committed with the caller's write.
+
+    Args:
+        status_code: Response status
+        body: Encoded JSON response body (bytes)
+        claim: Claim to store instead of the current request's (for
+            writes completed outside the request, e.g. queued orders)
+    """
+    claim = claim or current_claim()
+    if claim is None:
+        return
+
+    _purge_expired()
+    user_id, key, request_hash = claim
+    now = datetime.utcnow()
+    db.session.add(IdempotencyKey(
+        user_id=user_id,
+        key=key,
+        request_hash=request_hash,
+        status_code=status_code,
+        response_body=body.decode(),
+        created_at=now,
+        expires_at=now + timedelta(seconds=current_app.config['IDEMPOTENCY_TTL'])
+    ))
+
+
+def _purge_expired():
+    """Delete expired keys, at most once per PURGE_INTERVAL in this process"""
+    global _last_purge
+    if time.monotonic() - _last_purge < PURGE_INTERVAL:
+        return
+    _last_purge = time.monotonic()
+    db.session.execute(IdempotencyKey.__table__.delete().where(IdempotencyKey.expires_at <= datetime.utcnow()))
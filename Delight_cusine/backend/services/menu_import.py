@@ -0,0 +1,350 @@
+"""
+Menu import/export service module
+Streamed CSV/NDJSON parsing, batch validation and bulk upsert of menu
+items, and streamed export in the same formats
+"""
+import codecs
+import csv
+import io
+import json
+import math
+from datetime import datetime
+from flask import current_app
+from sqlalchemy import insert, select, update
+from extensions.db import db
+from models.menu import MenuItem
+
+FORMATS = ('csv', 'ndjson')
+
+# Columns read on import; export writes the same columns plus is_deleted,
+# so an export can be edited and re-imported as-is
+IMPORT_FIELDS = ('id', 'name', 'description', 'price', 'category', 'image_url', 'available')
+EXPORT_FIELDS = IMPORT_FIELDS + ('is_deleted',)
+
+MAX_LENGTHS = {
+    'name': MenuItem.name.type.length,
+    'category': MenuItem.category.type.length,
+    'image_url': MenuItem.image_url.type.length,
+}
+
+TRUE_VALUES = ('true', '1', 'yes', 'y')
+FALSE_VALUES = ('false', '0', 'no', 'n')
+
+# Errors listed in the response; the rest are only counted
+MAX_REPORTED_ERRORS = 100
+
+
+class MenuImportError(Exception):
+    """Raised when the upload as a whole cannot be imported"""
+
+    def __init__(self, error, message, status_code=400):
+        super().__init__(message)
+        self.error = error
+        self.message = message
+        self.status_code = status_code
+
+    def to_dict(self):
+        return {
+            'error': self.error,
+            'message': self.message
+        }
+
+
+def detect_format(requested, mimetype, filename):
+    """
+    Pick the upload format from ?format=, the content type or the file extension
+
+    Returns:
+        'csv' or 'ndjson'
+
+    Raises:
+        MenuImportError: If the format cannot be determined or is unsupported
+    """
+    if requested:
+        fmt = requested.lower()
+    elif mimetype in ('text/csv', 'application/csv'):
+        fmt = 'csv'
+    elif mimetype in ('application/x-ndjson', 'application/ndjson', 'application/jsonl'):
+        fmt = 'ndjson'
+    elif filename and '.' in filename:
+        fmt = {'csv': 'csv', 'ndjson': 'ndjson', 'jsonl': 'ndjson'}.get(filename.rsplit('.', 1)[1].lower())
+    else:
+        fmt = None
+
+    if fmt not in FORMATS:
+        raise MenuImportError('unsupported_format', 'Upload must be CSV or NDJSON (set ?format=csv|ndjson)', 415)
+    return fmt
+
+
+def parse_csv(stream):
+    """
+    Yield (line number, row dict or None, parse error) from a binary CSV stream
+
+    The stream is decoded and parsed line by line; the header row names
+    the columns (unknown columns are ignored).
+    """
+    reader = csv.DictReader(codecs.iterdecode(stream, 'utf-8-sig'))
+    try:
+        for row in reader:
+            if None in row:
+                yield reader.line_num, None, 'More values than header columns'
+            else:
+                yield reader.line_num, row, None
+    except (csv.Error, UnicodeDecodeError) as e:
+        yield reader.line_num, None, f'Unreadable CSV: {e}'
+
+
+def parse_ndjson(stream):
+    """Yield (line number, row dict or None, parse error) from a binary NDJSON stream"""
+    for line_number, line in enumerate(stream, start=1):
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError as e:
+            yield line_number, None, f'Invalid JSON: {e}'
+            continue
+        if not isinstance(row, dict):
+            yield line_number, None, 'Each line must be a JSON object'
+            continue
+        yield line_number, row, None
+
+
+def _parse_bool(value):
+    if isinstance(value, bool):
+        return value
+    text = str(value).strip().lower()
+    if text in TRUE_VALUES:
+        return True
+    if text in FALSE_VALUES:
+        return False
+    raise ValueError
+
+
+def validate_row(row, allowed_categories):
+    """
+    Validate and normalize one uploaded row
+
+    Args:
+        row: Raw row dictionary (CSV strings or JSON values)
+        allowed_categories: Set of allowed categories, or None for any
+
+    Returns:
+        Tuple of (clean dictionary, None) or (None, (error code, message))
+    """
+    def text(name):
+        value = row.get(name)
+        if value is None:
+            return None
+        value = str(value).strip()
+        return value or None
+
+    clean = {}
+
+    item_id = text('id')
+    if item_id is not None:
+        try:
+            clean['id'] = int(item_id)
+        except ValueError:
+            return None, ('invalid_id', f'id must be an integer, got {item_id!r}')
+
+    for name in ('name', 'category'):
+        value = text(name)
+        if value is None:
+            return None, ('missing_field', f'{name} is required')
+        if len(value) > MAX_LENGTHS[name]:
+            return None, ('too_long', f'{name} exceeds {MAX_LENGTHS[name]} characters')
+        clean[name] = value
+
+    clean['category'] = clean['category'].lower()
+    if allowed_categories is not None and clean['category'] not in allowed_categories:
+        return None, ('invalid_category', f'Unknown category {clean["category"]!r}')
+
+    try:
+        if isinstance(row.get('price'), bool):
+            raise ValueError
+        clean['price'] = float(text('price'))
+        if clean['price'] < 0 or not math.isfinite(clean['price']):
+            raise ValueError
+    except (TypeError, ValueError):
+        return None, ('invalid_price', 'Price must be a non-negative number')
+
+    clean['description'] = text('description')
+
+    image_url = text('image_url')
+    if image_url is not None and len(image_url) > MAX_LENGTHS['image_url']:
+        return None, ('too_long', f'image_url exceeds {MAX_LENGTHS["image_url"]} characters')
+    clean['image_url'] = image_url
+
+    available = row.get('available')
+    if available is None or (isinstance(available, str) and not available.strip()):
+        clean['available'] = True
+    else:
+        try:
+            clean['available'] = _parse_bool(available)
+        except ValueError:
+            return None, ('invalid_available', 'available must be true or false')
+
+    return clean, None
+
+
+class ImportResult:
+    """Counts and per-row errors of one import"""
+
+    def __init__(self):
+        self.created = 0
+        self.updated = 0
+        self.failed = 0
+        self.errors = []
+
+    def fail(self, line, error, message):
+        self.failed += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append({'line': line, 'error': error, 'message': message})
+
+    def to_dict(self):
+        return {
+            'created': self.created,
+            'updated': self.updated,
+            'failed': self.failed,
+            'errors': sorted(self.errors, key=lambda error: error['line']),
+            'errors_truncated': self.failed > len(self.errors)
+        }
+
+
+def _write_batch(batch, result, seen_names):
+    """
+    Resolve a batch of valid rows against existing items and bulk upsert it
+
+    Rows with an id update that item; rows without one update the
+    non-deleted item with the same name, or create a new item. One SELECT
+    resolves the whole batch, then one bulk UPDATE and one bulk INSERT.
+    """
+    ids = {clean['id'] for _, clean in batch if 'id' in clean}
+    names = {clean['name'] for _, clean in batch if 'id' not in clean}
+
+    existing_ids = set()
+    if ids:
+        existing_ids = set(db.session.scalars(select(MenuItem.id).where(MenuItem.id.in_(ids))))
+    by_name = {}
+    if names:
+        by_name = dict(db.session.execute(
+            select(MenuItem.name, MenuItem.id).where(MenuItem.name.in_(names), MenuItem.is_deleted.is_(False))
+        ).all())
+
+    now = datetime.utcnow()
+    inserts, updates = [], []
+    for line, clean in batch:
+        first_line = seen_names.setdefault(clean['name'].lower(), line)
+        if first_line != line:
+            result.fail(line, 'duplicate_name', f'{clean["name"]!r} already appears on line {first_line}')
+            continue
+
+        item_id = clean.get('id', by_name.get(clean['name']))
+        if 'id' in clean and item_id not in existing_ids:
+            result.fail(line, 'item_not_found', f'Menu item {item_id} not found')
+        elif item_id is None:
+            inserts.append(dict(clean, is_deleted=False, created_at=now, updated_at=now))
+        else:
+            updates.append(dict(clean, id=item_id, updated_at=now))
+
+    if inserts:
+        db.session.execute(insert(MenuItem), inserts)
+        result.created += len(inserts)
+    if updates:
+        db.session.execute(update(MenuItem), updates)
+        result.updated += len(updates)
+
+
+def import_rows(rows, dry_run=False, atomic=True):
+    """
+    Validate and upsert parsed rows in batches, inside a single transaction
+
+    Args:
+        rows: Iterable of (line number, row dict or None, parse error)
+        dry_run: Validate and resolve everything, then roll back
+        atomic: Roll back everything if any row fails (otherwise commit
+            the valid rows and report the failures)
+
+    Returns:
+        Tuple of (ImportResult, committed flag)
+
+    Raises:
+        MenuImportError: If the upload has more rows than MENU_IMPORT_MAX_ROWS
+    """
+    batch_size = current_app.config['MENU_IMPORT_BATCH_SIZE']
+    max_rows = current_app.config['MENU_IMPORT_MAX_ROWS']
+    allowed = current_app.config['MENU_CATEGORIES']
+    allowed_categories = {category.lower() for category in allowed} if allowed else None
+
+    result = ImportResult()
+    seen_names = {}
+    batch = []
+    count = 0
+
+    for line, row, parse_error in rows:
+        count += 1
+        if count > max_rows:
+            db.session.rollback()
+            raise MenuImportError('too_many_rows', f'Uploads are limited to {max_rows} rows', 413)
+
+        if parse_error:
+            result.fail(line, 'parse_error', parse_error)
+            continue
+
+        clean, error = validate_row(row, allowed_categories)
+        if error:
+            result.fail(line, *error)
+            continue
+
+        batch.append((line, clean))
+        if len(batch) >= batch_size:
+            _write_batch(batch, result, seen_names)
+            batch = []
+
+    if batch:
+        _write_batch(batch, result, seen_names)
+
+    if dry_run or (atomic and result.failed) or not (result.created or result.updated):
+        db.session.rollback()
+        return result, False
+
+    db.session.commit()
+    return result, True
+
+
+def _export_rows(include_deleted, batch_size):
+    """Yield export rows as tuples, walking menu_items in id batches"""
+    columns = [getattr(MenuItem, name) for name in EXPORT_FIELDS]
+    last_id = 0
+    while True:
+        query = select(*columns).where(MenuItem.id > last_id).order_by(MenuItem.id).limit(batch_size)
+        if not include_deleted:
+            query = query.where(MenuItem.is_deleted.is_(False))
+        rows = db.session.execute(query).all()
+        if not rows:
+            return
+        yield rows
+        last_id = rows[-1].id
+        if len(rows) < batch_size:
+            return
+
+
+def export_csv(include_deleted=False, batch_size=500):
+    """Yield the menu as CSV, one chunk per batch"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(EXPORT_FIELDS)
+    for rows in _export_rows(include_deleted, batch_size):
+        writer.writerows(rows)
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue()
+
+
+def export_ndjson(include_deleted=False, batch_size=500):
+    """Yield the menu as NDJSON, one chunk per batch"""
+    for rows in _export_rows(include_deleted, batch_size):
+        yield ''.join(json.dumps(dict(zip(EXPORT_FIELDS, row))) + '\n' for row in rows)
@@ -0,0 +1,283 @@
+"""
+Menu search service module
+In-memory inverted index over menu item names, categories and descriptions
+
+Each app holds one index (app.extensions['menu_search']). It is built from
+MenuItem rows on the first search and then kept current incrementally:
+menu write routes call refresh() after their commit, and searches re-sync
+when the menu cache version changes or MENU_SEARCH_SYNC_INTERVAL passes
+(covering writes made by other worker processes). A sync only reads rows
+updated since shortly before the previous sync.
+
+Query terms match index terms exactly, by prefix (search-as-you-type) or
+within one edit (typos, via a deletion index). Items are ranked by how many
+query terms they match, then by a field-weighted TF-IDF score.
+"""
+import bisect
+import heapq
+import math
+import re
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from flask import current_app
+from models.menu import MenuItem
+from utils import serializers
+
+# A term in the name counts more than in the category, then the description
+FIELD_WEIGHTS = (('name', 3.0), ('category', 2.0), ('description', 1.0))
+
+STOP_WORDS = frozenset({'a', 'an', 'and', 'the', 'with', 'of', 'in', 'on', 'or', 'for', 'to'})
+
+# Match quality multipliers
+EXACT_MATCH = 1.0
+PREFIX_MATCH = 0.8
+TYPO_MATCH = 0.6
+
+MIN_PREFIX_LENGTH = 2
+MAX_PREFIX_TERMS = 50
+MIN_TYPO_LENGTH = 4
+
+# Added per matched query term; larger than any single term's score
+COVERAGE_BONUS = 1000.0
+
+# Recent query results, kept until the index next changes
+RESULT_CACHE_SIZE = 256
+
+# Each sync re-reads rows updated up to this long before the previous sync
+# started, so a transaction that committed after that sync read (with an
+# older updated_at) is not missed
+SYNC_OVERLAP = timedelta(seconds=30)
+
+_TOKEN_RE = re.compile(r'[a-z0-9]+')
+
+
+def tokenize(text):
+    """Lowercase, accent-free word tokens of a text, stop words removed"""
+    if not text:
+        return []
+    text = unicodedata.normalize('NFKD', text).encode('ascii', 'ignore').decode().lower()
+    return [token for token in _TOKEN_RE.findall(text) if token not in STOP_WORDS]
+
+
+def _deletions(term):
+    """Every string obtained by deleting one character of term"""
+    return {term[:i] + term[i + 1:] for i in range(len(term))}
+
+
+def _within_one_edit(a, b):
+    """True if a and b differ by one insertion, deletion, substitution or adjacent transposition"""
+    if a == b:
+        return True
+    if abs(len(a) - len(b)) > 1:
+        return False
+    if len(a) > len(b):
+        a, b = b, a
+
+    i = 0
+    while i < len(a) and a[i] == b[i]:
+        i += 1
+    if len(a) == len(b):
+        return a[i + 1:] == b[i + 1:] or (a[i + 1:i + 2] == b[i:i + 1] and a[i:i + 1] == b[i + 1:i + 2]
+                                         and a[i + 2:] == b[i + 2:])
+    return a[i:] == b[i + 1:]
+
+
+class MenuSearchIndex:
+    """Thread-safe inverted index of the non-deleted menu items"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._sync_lock = threading.Lock()
+        self._docs = {}         # item id -> serialized item (MenuItem.to_dict shape)
+        self._doc_terms = {}    # item id -> {term: weight}
+        self._postings = {}     # term -> {item id: weight}
+        self._terms = []        # sorted index terms, for prefix ranges
+        self._deletes = {}      # one-deletion variant -> set of terms
+        self._results = OrderedDict()
+        self.built = False
+        self.version = None
+        self.watermark = None
+        self.synced_at = 0.0
+
+    # -- maintenance -------------------------------------------------------
+
+    def _add_term(self, term):
+        self._postings[term] = {}
+        bisect.insort(self._terms, term)
+        if len(term) >= MIN_TYPO_LENGTH:
+            for variant in _deletions(term):
+                self._deletes.setdefault(variant, set()).add(term)
+
+    def _drop_term(self, term):
+        del self._postings[term]
+        del self._terms[bisect.bisect_left(self._terms, term)]
+        if len(term) >= MIN_TYPO_LENGTH:
+            for variant in _deletions(term):
+                terms = self._deletes[variant]
+                terms.discard(term)
+                if not terms:
+                    del self._deletes[variant]
+
+    def _remove(self, item_id):
+        self._docs.pop(item_id, None)
+        for term in self._doc_terms.pop(item_id, ()):
+            postings = self._postings[term]
+            del postings[item_id]
+            if not postings:
+                self._drop_term(term)
+
+    def _index(self, item):
+        if self._docs.get(item['id']) == item:
+            return
+        self._results.clear()
+        self._remove(item['id'])
+        if item['is_deleted']:
+            return
+
+        weights = {}
+        for field, weight in FIELD_WEIGHTS:
+            for term in set(tokenize(item[field])):
+                weights[term] = weights.get(term, 0.0) + weight
+
+        self._docs[item['id']] = item
+        self._doc_terms[item['id']] = weights
+        for term, weight in weights.items():
+            if term not in self._postings:
+                self._add_term(term)
+            self._postings[term][item['id']] = weight
+
+    def sync(self, version=None):
+        """
+        Apply menu rows changed since the last sync (all rows on the first one)
+
+        Args:
+            version: Menu cache version the sync corresponds to
+        """
+        with self._sync_lock:
+            started = datetime.utcnow()
+            query = MenuItem.query
+            if self.built:
+                query = query.filter(MenuItem.updated_at >= self.watermark)
+            items = serializers.menu_items(query)
+
+            with self._lock:
+                for item in items:
+                    self._index(item)
+                self.watermark = started - SYNC_OVERLAP
+                self.built = True
+                self.version = version
+                self.synced_at = time.monotonic()
+
+    def sync_if_stale(self, version):
+        """Sync when never built, the menu version moved, or the sync interval passed"""
+        interval = current_app.config['MENU_SEARCH_SYNC_INTERVAL']
+        if self.built and self.version == version and time.monotonic() - self.synced_at < interval:
+            return
+        if self.built and self._sync_lock.locked():
+            return  # another request is syncing; serve the current index
+        self.sync(version)
+
+    # -- queries -----------------------------------------------------------
+
+    def _matches(self, token):
+        """Index terms matching a query token, with their match quality"""
+        matches = {}
+        if token in self._postings:
+            matches[token] = EXACT_MATCH
+
+        if len(token) >= MIN_PREFIX_LENGTH:
+            start = bisect.bisect_left(self._terms, token)
+            for term in self._terms[start:start + MAX_PREFIX_TERMS + 1]:
+                if not term.startswith(token):
+                    break
+                matches.setdefault(term, PREFIX_MATCH * (0.5 + 0.5 * len(token) / len(term)))
+
+        if len(token) >= MIN_TYPO_LENGTH:
+            variants = _deletions(token)
+            candidates = set(self._deletes.get(token, ()))
+            candidates.update(variant for variant in variants if variant in self._postings)
+            for variant in variants:
+                candidates.update(self._deletes.get(variant, ()))
+            for term in candidates:
+                if term not in matches and _within_one_edit(token, term):
+                    matches[term] = TYPO_MATCH
+
+        return matches
+
+    def search(self, text, category=None, available=None, limit=20):
+        """
+        Rank menu items against a free-text query
+
+        Args:
+            text: Query text
+            category: Only items in this category (optional)
+            available: Only items with this availability (optional)
+            limit: Maximum number of results
+
+        Returns:
+            List of (item dictionary, score), best match first
+        """
+        tokens = tuple(dict.fromkeys(tokenize(text)))
+        if not tokens:
+            return []
+
+        key = (tokens, category, available, limit)
+        with self._lock:
+            results = self._results.get(key)
+            if results is not None:
+                self._results.move_to_end(key)
+                return results
+
+            total = len(self._docs) or 1
+            scores = {}
+            for token in tokens:
+                best = {}
+                for term, quality in self._matches(token).items():
+                    postings = self._postings[term]
+                    factor = quality * math.log(1 + total / len(postings))
+                    if not best:
+                        best = {item_id: weight * factor for item_id, weight in postings.items()}
+                        continue
+                    for item_id, weight in postings.items():
+                        score = weight * factor
+                        if score > best.get(item_id, 0.0):
+                            best[item_id] = score
+                # Every matched query term outranks any score difference
+                for item_id, score in best.items():
+                    scores[item_id] = scores.get(item_id, 0.0) + COVERAGE_BONUS + score
+
+            docs = self._docs
+            if category is not None or available is not None:
+                scores = {
+                    item_id: score for item_id, score in scores.items()
+                    if (category is None or docs[item_id]['category'] == category)
+                    and (available is None or docs[item_id]['available'] == available)
+                }
+            top = heapq.nsmallest(limit, scores.items(), key=lambda entry: (-entry[1], docs[entry[0]]['name']))
+            results = [(docs[item_id], round(score, 4)) for item_id, score in top]
+
+            self._results[key] = results
+            if len(self._results) > RESULT_CACHE_SIZE:
+                self._results.popitem(last=False)
+            return results
+
+
+def get_index():
+    """The current app's search index (created on first use)"""
+    return current_app.extensions.setdefault('menu_search', MenuSearchIndex())
+
+
+def refresh(version):
+    """
+    Apply committed menu writes to this process's index (no-op until the
+    first search has built it)
+
+    Args:
+        version: Menu cache version after the write
+    """
+    index = get_index()
+    if index.built:
+        index.sync(version)
@@ -0,0 +1,89 @@
+"""
+Order events service module
+Publishes order changes on the event bus as incremental deltas
+
+Topics:
+    - 'orders': every order (admin / kitchen dashboard)
+    - 'orders:user:<id>': one customer's orders
+"""
+from datetime import timedelta
+from flask import current_app
+from flask_jwt_extended import create_access_token, get_jwt, get_jwt_request_location
+from extensions.events import events
+
+ALL_ORDERS_TOPIC = 'orders'
+
+# Endpoint a stream ticket is valid for (its 'scope' claim; enforced in extensions.jwt)
+STREAM_ENDPOINT = 'orders.stream_order_events'
+
+TICKET_REQUIRED = {
+    'error': 'ticket_required',
+    'message': 'Pass a ticket from POST /api/orders/events/ticket as ?jwt=, not an access token',
+}
+
+
+def user_topic(user_id):
+    """Topic carrying a single customer's order events"""
+    return f'orders:user:{user_id}'
+
+
+def topics_for(user_id, role):
+    """Topics a user may subscribe to: admins see every order, customers their own"""
+    return (ALL_ORDERS_TOPIC,) if role == 'admin' else (user_topic(user_id),)
+
+
+def issue_stream_ticket(user_id):
+    """
+    Short-lived token for opening the order event stream
+
+    EventSource cannot set headers, so the stream authenticates from the
+    URL, where proxies and access logs record it. A ticket expires after
+    ORDER_EVENTS_TICKET_TTL seconds and only authenticates the stream.
+
+    Args:
+        user_id: JWT identity of the subscriber
+
+    Returns:
+        (ticket, lifetime in seconds)
+    """
+    ttl = current_app.config['ORDER_EVENTS_TICKET_TTL']
+    ticket = create_access_token(identity=user_id, expires_delta=timedelta(seconds=ttl),
+                                 additional_claims={'scope': STREAM_ENDPOINT})
+    return ticket, ttl
+
+
+def query_token_is_ticket():
+    """False if the verified token came from ?jwt= but is a full access token"""
+    return get_jwt_request_location() != 'query_string' or get_jwt().get('scope') == STREAM_ENDPOINT
+
+
+def _topics(order):
+    return (ALL_ORDERS_TOPIC, user_topic(order.user_id))
+
+
+def order_created(order):
+    """
+    Publish a newly placed order
+
+    The full order is sent once so subscribers can insert it without a fetch.
+
+    Args:
+        order: Committed order as returned by Order.to_dict()
+    """
+    events.publish('created', (ALL_ORDERS_TOPIC, user_topic(order['user_id'])), {'order': order})
+
+
+def order_status_changed(order, previous_status):
+    """
+    Publish a status change (including cancellation)
+
+    Args:
+        order: Committed order
+        previous_status: Status before the change
+    """
+    events.publish('status', _topics(order), {
+        'id': str(order.id),
+        'status': order.status,
+        'previousStatus': previous_status,
+        'updated_at': order.updated_at.isoformat()
+    })
@@ -0,0 +1,296 @@
+"""
+Order intake service module
+Queued order intake: requests validate, price and enqueue; a background
+writer commits the queued orders in batched transactions
+
+Enabled with ORDER_INTAKE_MODE=queued. POST /api/orders then answers 202
+with a handle ('q' + 32 hex digits) that GET /api/orders/<handle> resolves
+to the order once it is written. Each worker process has its own queue and
+writer thread (app.extensions['order_intake']); handle states are mirrored
+to the cache so any worker can answer a poll (use CACHE_BACKEND=sqlite with
+more than one worker).
+
+Orders are accepted into memory: a worker that is killed before its writer
+drains loses the orders still queued. Normal shutdown drains the queue.
+"""
+import atexit
+import hashlib
+import json
+import queue
+import threading
+import time
+import uuid
+from datetime import datetime
+from flask import current_app
+from sqlalchemy import insert
+from extensions.cache import cache
+from extensions.db import db
+from models.order import Order, OrderItem
+from services import idempotency, order_events, sales_analytics
+
+QUEUED = 'QUEUED'
+FAILED = 'FAILED'
+
+STATUS_CACHE_PREFIX = 'order_intake'
+
+# Longest wait for the queue to drain at shutdown (seconds)
+SHUTDOWN_TIMEOUT = 30
+
+
+class IntakeQueueFull(Exception):
+    """Raised when the intake queue cannot accept more orders"""
+
+
+class IntakeJob:
+    """An accepted, priced order waiting for the writer"""
+
+    __slots__ = ('handle', 'user_id', 'fields', 'order_lines', 'total_amount', 'created_at', 'claim', 'body')
+
+    def __init__(self, handle, user_id, fields, order_lines, total_amount, claim=None, body=None):
+        self.handle = handle
+        self.user_id = user_id
+        self.fields = fields
+        self.order_lines = order_lines
+        self.total_amount = total_amount
+        self.created_at = datetime.utcnow()
+        self.claim = claim
+        self.body = body
+
+
+def new_handle(user_id, idempotency_key=None):
+    """
+    Handle for a queued order
+
+    With an Idempotency-Key the handle is derived from it, so a retried
+    submission maps to the same handle (and the same order).
+    """
+    if idempotency_key is None:
+        return 'q' + uuid.uuid4().hex
+    return 'q' + hashlib.sha256(f'{user_id}:{idempotency_key}'.encode()).hexdigest()[:32]
+
+
+def _status_key(handle):
+    return f'{STATUS_CACHE_PREFIX}:{handle}'
+
+
+class OrderIntakeQueue:
+    """Bounded in-process queue of accepted orders and its batch writer thread"""
+
+    def __init__(self, app):
+        self.app = app
+        self.batch_size = app.config['ORDER_INTAKE_BATCH_SIZE']
+        self.linger = app.config['ORDER_INTAKE_LINGER']
+        self.status_ttl = app.config['ORDER_INTAKE_STATUS_TTL']
+        self._queue = queue.Queue(maxsize=app.config['ORDER_INTAKE_QUEUE_SIZE'])
+        self._pending = {}  # handle -> user_id of jobs not yet committed
+        self._lock = threading.Lock()
+        self._thread = None
+        self.batches = 0
+        self.written = 0
+        self.failed = 0
+
+    def enqueue(self, job):
+        """
+        Accept a job for the writer
+
+        Returns:
+            False if a job with the same handle is already queued here
+
+        Raises:
+            IntakeQueueFull: If ORDER_INTAKE_QUEUE_SIZE jobs are waiting
+        """
+        with self._lock:
+            if job.handle in self._pending:
+                return False
+            self._pending[job.handle] = job.user_id
+
+        try:
+            self._queue.put_nowait(job)
+        except queue.Full:
+            with self._lock:
+                del self._pending[job.handle]
+            raise IntakeQueueFull
+
+        cache.set(_status_key(job.handle), json.dumps({'status': QUEUED, 'user_id': job.user_id}), self.status_ttl)
+        self._ensure_writer()
+        return True
+
+    def status(self, handle):
+        """
+        State of a handle that has no order row yet
+
+        Returns:
+            Dictionary with status (QUEUED or FAILED), user_id and, for
+            failures, message; None if the handle is unknown
+        """
+        with self._lock:
+            user_id = self._pending.get(handle)
+        if user_id is not None:
+            return {'status': QUEUED, 'user_id': user_id}
+
+        state = cache.get(_status_key(handle))
+        return json.loads(state) if state is not None else None
+
+    def pending(self):
+        """Number of accepted jobs not yet committed"""
+        with self._lock:
+            return len(self._pending)
+
+    def wait_idle(self, timeout=None):
+        """Block until every accepted job is committed or failed; False on timeout"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while self.pending():
+            if deadline is not None and time.monotonic() >= deadline:
+                return False
+            time.sleep(0.005)
+        return True
+
+    def _ensure_writer(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                # A writer that died is replaced rather than left holding the queue
+                if self._thread is None:
+                    atexit.register(self.stop)
+                self._thread = threading.Thread(target=self._run, name='order-intake-writer', daemon=True)
+                self._thread.start()
+
+    def stop(self, timeout=SHUTDOWN_TIMEOUT):
+        """Write out the queued jobs and stop the writer"""
+        if self._thread is not None and self._thread.is_alive():
+            self._queue.put(None)
+            self._thread.join(timeout)
+
+    # -- writer ------------------------------------------------------------
+
+    def _run(self):
+        with self.app.app_context():
+            stopping = False
+            while not stopping:
+                job = self._queue.get()
+                if job is None:
+                    break
+
+                # Take whatever else is waiting (up to a batch), lingering briefly for stragglers
+                batch = [job]
+                deadline = time.monotonic() + self.linger
+                while len(batch) < self.batch_size:
+                    try:
+                        job = self._queue.get(timeout=max(deadline - time.monotonic(), 0))
+                    except queue.Empty:
+                        break
+                    if job is None:
+                        stopping = True
+                        break
+                    batch.append(job)
+
+                try:
+                    self._write(batch)
+                except Exception:
+                    # One bad batch (e.g. the database going away mid-_fail) must not stop the writer
+                    current_app.logger.exception('Order intake batch of %d jobs failed', len(batch))
+                    self._abandon(batch)
+                finally:
+                    db.session.remove()
+
+    def _write(self, batch):
+        """Commit a batch in one transaction; on failure retry its jobs one by one"""
+        try:
+            order_ids = self._insert(batch)
+            db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            if len(batch) > 1:
+                for job in batch:
+                    self._write([job])
+            else:
+                self._fail(batch[0], e)
+            return
+
+        self._finish(batch, order_ids)
+
+    def _insert(self, batch):
+        orders = [
+            Order(
+                user_id=job.user_id,
+                total_amount=job.total_amount,
+                status='PLACED',
+                intake_handle=job.handle,
+                created_at=job.created_at,
+                updated_at=job.created_at,
+                **job.fields
+            )
+            for job in batch
+        ]
+        db.session.add_all(orders)
+        db.session.flush()
+
+        db.session.execute(insert(OrderItem), [
+            dict(line, order_id=order.id)
+            for order, job in zip(orders, batch)
+            for line in job.order_lines
+        ])
+        sales_analytics.record_orders_created([(order, job.order_lines) for order, job in zip(orders, batch)])
+
+        for job in batch:
+            if job.claim is not None:
+                idempotency.remember(202, job.body, claim=job.claim)
+
+        return [order.id for order in orders]
+
+    def _finish(self, batch, order_ids):
+        with self._lock:
+            for job in batch:
+                del self._pending[job.handle]
+        for job in batch:
+            cache.delete(_status_key(job.handle))
+
+        self.batches += 1
+        self.written += len(batch)
+
+        orders = Order.query.options(*Order.loader_options('list')).filter(Order.id.in_(order_ids)).all()
+        for order in orders:
+            order_events.order_created(order.to_dict())
+
+    def _fail(self, job, error):
+        # A duplicate submission (same handle) already written elsewhere is not a failure
+        duplicate = db.session.query(Order.id).filter_by(intake_handle=job.handle).first() is not None
+
+        if duplicate:
+            cache.delete(_status_key(job.handle))
+        else:
+            self.failed += 1
+            current_app.logger.error('Queued order %s could not be written: %s', job.handle, error)
+            self._mark_failed(job)
+
+        with self._lock:
+            del self._pending[job.handle]
+
+    def _mark_failed(self, job):
+        cache.set(_status_key(job.handle), json.dumps({
+            'status': FAILED,
+            'user_id': job.user_id,
+            'message': 'The order could not be placed; please submit it again'
+        }), self.status_ttl)
+
+    def _abandon(self, batch):
+        """Fail the jobs of a crashed batch that are still pending, so none stays QUEUED forever"""
+        with self._lock:
+            jobs = [job for job in batch if self._pending.pop(job.handle, None) is not None]
+        for job in jobs:
+            self.failed += 1
+            try:
+                self._mark_failed(job)
+            except Exception:
+                # Without a cache entry the handle is unknown (404) rather than stuck
+                current_app.logger.exception('Could not record the failure of queued order %s', job.handle)
+
+
+def get_queue():
+    """The current app's intake queue (created on first use)"""
+    app = current_app._get_current_object()
+    intake = app.extensions.get('order_intake')
+    if intake is None:
+        intake = app.extensions.setdefault('order_intake', OrderIntakeQueue(app))
+    return intake
@@ -0,0 +1,126 @@
+"""
+Order pricing service module
+Resolves, validates and prices cart lines in a single round trip
+"""
+from sqlalchemy import insert
+from extensions.db import db
+from models.menu import MenuItem
+from models.order import OrderItem
+
+
+class OrderValidationError(Exception):
+    """Raised when a cart cannot be turned into an order"""
+
+    def __init__(self, error, message, status_code=400):
+        super().__init__(message)
+        self.error = error
+        self.message = message
+        self.status_code = status_code
+
+    def to_dict(self):
+        """
+        Convert error to the API's error response format
+
+        Returns:
+            Dictionary with error code and message
+        """
+        return {
+            'error': self.error,
+            'message': self.message
+        }
+
+
+def _parse_menu_item_id(item_data):
+    """Coerce the cart line's menu_item_id (the frontend sends strings) to int"""
+    try:
+        return int(item_data['menu_item_id'])
+    except (TypeError, ValueError):
+        raise OrderValidationError(
+            'item_not_found',
+            f'Menu item {item_data["menu_item_id"]} not found',
+            404
+        )
+
+
+def price_cart(items_data):
+    """
+    Validate and price every cart line
+
+    All referenced menu items are fetched with one IN query and every
+    line is checked against that in-memory map, so the number of
+    queries does not grow with the size of the cart.
+
+    Args:
+        items_data: List of {menu_item_id, quantity} dictionaries
+
+    Returns:
+        Tuple of (order lines, total amount). Each line is a dictionary
+        with menu_item_id, quantity and price (price at time of order).
+
+    Raises:
+        OrderValidationError: If any line is malformed, unknown,
+            deleted, unavailable or has an invalid quantity
+    """
+    if not items_data:
+        raise OrderValidationError('empty_cart', 'Order must contain at least one item')
+
+    for item_data in items_data:
+        if not isinstance(item_data, dict) or 'menu_item_id' not in item_data or 'quantity' not in item_data:
+            raise OrderValidationError(
+                'invalid_item',
+                'Each item must have menu_item_id and quantity'
+            )
+
+    menu_item_ids = {_parse_menu_item_id(item_data) for item_data in items_data}
+    menu_items = {
+        menu_item.id: menu_item
+        for menu_item in MenuItem.query.filter(MenuItem.id.in_(menu_item_ids)).all()
+    }
+
+    total_amount = 0
+    order_lines = []
+
+    for item_data in items_data:
+        menu_item = menu_items.get(_parse_menu_item_id(item_data))
+        if not menu_item or menu_item.is_deleted:
+            raise OrderValidationError(
+                'item_not_found',
+                f'Menu item {item_data["menu_item_id"]} not found',
+                404
+            )
+
+        if not menu_item.available:
+            raise OrderValidationError(
+                'item_unavailable',
+                f'{menu_item.name} is currently unavailable'
+            )
+
+        try:
+            quantity = int(item_data['quantity'])
+        except (TypeError, ValueError):
+            quantity = 0
+        if quantity < 1:
+            raise OrderValidationError('invalid_quantity', 'Quantity must be at least 1')
+
+        total_amount += menu_item.price * quantity
+        order_lines.append({
+            'menu_item_id': menu_item.id,
+            'quantity': quantity,
+            'price': menu_item.price
+        })
+
+    return order_lines, total_amount
+
+
+def insert_order_items(order_id, order_lines):
+    """
+    Write all order item rows for an order with a single bulk INSERT
+
+    Args:
+        order_id: ID of the (flushed) parent order
+        order_lines: Lines returned by price_cart
+    """
+    db.session.execute(
+        insert(OrderItem),
+        [dict(line, order_id=order_id) for line in order_lines]
+    )
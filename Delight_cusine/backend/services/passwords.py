@@ -0,0 +1,161 @@
+"""
+Password hashing service module
+Runs the password KDF on a bounded process pool instead of request threads
+
+Hashing and verifying a password costs tens to hundreds of milliseconds of
+CPU by design. Done inline, every login holds a request worker (and, for
+scrypt, the GIL) for that long, and a burst of logins starves every other
+endpoint. Here the KDF runs in PASSWORD_HASH_WORKERS child processes per
+worker process (created on first use, so each forked worker gets its own),
+and at most PASSWORD_HASH_MAX_PENDING calls may be running or waiting at
+once; beyond that callers get PasswordHasherBusy, which routes answer with
+429 and Retry-After. PASSWORD_HASH_WORKERS=0 hashes in the calling thread
+(still bounded by PASSWORD_HASH_MAX_PENDING).
+
+PASSWORD_HASH_METHOD uses werkzeug's method syntax ('pbkdf2:sha256:600000',
+'scrypt:32768:8:1'). Stored hashes record their method, so needs_rehash()
+spots hashes made with other parameters and login upgrades them.
+"""
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from flask import current_app
+from werkzeug.security import DEFAULT_PBKDF2_ITERATIONS, check_password_hash, generate_password_hash
+
+# werkzeug's scrypt defaults (n, r, p)
+DEFAULT_SCRYPT_PARAMETERS = (2 ** 15, 8, 1)
+
+
+class PasswordHasherBusy(Exception):
+    """Raised when PASSWORD_HASH_MAX_PENDING hashing calls are already pending"""
+
+
+def normalize_method(method):
+    """
+    Spell out a werkzeug hashing method with all its parameters, as it
+    appears in stored hashes ('pbkdf2' -> 'pbkdf2:sha256:600000')
+
+    Raises:
+        ValueError: If the method is not pbkdf2 or scrypt
+    """
+    name, *args = method.split(':')
+    if name == 'pbkdf2':
+        digest = args[0] if args else 'sha256'
+        iterations = int(args[1]) if len(args) > 1 else DEFAULT_PBKDF2_ITERATIONS
+        return f'pbkdf2:{digest}:{iterations}'
+    if name == 'scrypt':
+        n, r, p = map(int, args) if args else DEFAULT_SCRYPT_PARAMETERS
+        return f'scrypt:{n}:{r}:{p}'
+    raise ValueError(f'Unsupported PASSWORD_HASH_METHOD: {method}')
+
+
+def _hash(password, method):
+    return generate_password_hash(password, method=method)
+
+
+def _verify(stored, password):
+    return check_password_hash(stored, password)
+
+
+class PasswordHasher:
+    """Per-process KDF pool with a bound on pending calls"""
+
+    def __init__(self, method, workers, max_pending, timeout):
+        self.method = normalize_method(method)
+        self.workers = workers
+        self.timeout = timeout
+        self._slots = threading.BoundedSemaphore(max_pending)
+        self._lock = threading.Lock()
+        self._pool = None
+        self._pid = None
+
+    def _executor(self):
+        # A pool inherited through fork has no live children; start a new one per process
+        if self._pool is None or self._pid != os.getpid():
+            with self._lock:
+                if self._pool is None or self._pid != os.getpid():
+                    self._pool = ProcessPoolExecutor(self.workers, mp_context=multiprocessing.get_context('spawn'))
+                    self._pid = os.getpid()
+        return self._pool
+
+    def _call(self, fn, *args):
+        if not self._slots.acquire(blocking=False):
+            raise PasswordHasherBusy
+        if not self.workers:
+            try:
+                return fn(*args)
+            finally:
+                self._slots.release()
+
+        try:
+            future = self._executor().submit(fn, *args)
+        except BaseException:
+            self._slots.release()
+            raise
+        # The slot is freed when the call really ends: a timed-out KDF keeps its process
+        # busy, so releasing on timeout would let the pool's backlog grow past max_pending
+        future.add_done_callback(lambda _: self._slots.release())
+        try:
+            return future.result(self.timeout)
+        except FutureTimeoutError:
+            future.cancel()  # only stops a call still waiting for a process
+            raise PasswordHasherBusy
+
+    def hash(self, password):
+        """
+        Hash a password with PASSWORD_HASH_METHOD
+
+        Raises:
+            PasswordHasherBusy: If the pool is saturated
+        """
+        return self._call(_hash, password, self.method)
+
+    def verify(self, stored, password):
+        """
+        Check a password against a stored hash (any supported method)
+
+        Raises:
+            PasswordHasherBusy: If the pool is saturated
+        """
+        return self._call(_verify, stored, password)
+
+    def needs_rehash(self, stored):
+        """True if a stored hash was made with a method other than PASSWORD_HASH_METHOD"""
+        return stored.split('$', 1)[0] != self.method
+
+    def shutdown(self):
+        if self._pool is not None and self._pid == os.getpid():
+            self._pool.shutdown(wait=False, cancel_futures=True)
+        self._pool = None
+
+
+def get_hasher():
+    """The current app's password hasher (created on first use)"""
+    app = current_app._get_current_object()
+    hasher = app.extensions.get('passwords')
+    if hasher is None:
+        config = app.config
+        hasher = app.extensions.setdefault('passwords', PasswordHasher(
+            config['PASSWORD_HASH_METHOD'],
+            config['PASSWORD_HASH_WORKERS'],
+            config['PASSWORD_HASH_MAX_PENDING'],
+            config['PASSWORD_HASH_TIMEOUT']
+        ))
+    return hasher
+
+
+def hash_password(password):
+    """Hash a password with the configured method (see PasswordHasher.hash)"""
+    return get_hasher().hash(password)
+
+
+def verify_password(stored, password):
+    """Check a password against a stored hash (see PasswordHasher.verify)"""
+    return get_hasher().verify(stored, password)
+
+
+def needs_rehash(stored):
+    """True if a stored hash should be replaced with one using the configured method"""
+    return get_hasher().needs_rehash(stored)
@@ -0,0 +1,243 @@
+"""
+Restaurant status service module
+Database-backed open/closed status with a versioned read-through cache
+"""
+import asyncio
+import json
+import threading
+import time
+from flask import current_app
+from sqlalchemy import inspect, select
+from extensions.async_db import async_db
+from extensions.cache import cache
+from extensions.db import db
+from models.restaurant import RestaurantSettings
+
+STATUS_CACHE_KEY = 'restaurant:status'
+SETTINGS_ID = 1
+
+OPEN_MESSAGE = 'We are currently accepting orders!'
+CLOSED_MESSAGE = 'We are currently closed. Please check back later!'
+
+# Wakes this process's status streams as soon as a local write commits;
+# changes made by other workers are picked up on the next poll
+_status_changed = threading.Condition()
+
+# The same for status streams served on an ASGI event loop: (loop, asyncio.Event),
+# plus the task per loop that polls for other workers' changes (_poll_status)
+_async_waiters = set()
+_async_pollers = {}
+
+
+def _store(status):
+    cache.set(STATUS_CACHE_KEY, json.dumps(status).encode(),
+              current_app.config['RESTAURANT_STATUS_CACHE_TTL'])
+
+
+def get_status():
+    """
+    Get the current restaurant status
+
+    Served from the cache; on a miss the settings row is read on a
+    short-lived connection (so long-running streams never pin a pooled
+    connection) and cached for RESTAURANT_STATUS_CACHE_TTL seconds.
+
+    Returns:
+        Dictionary with is_open, message and version
+    """
+    cached = cache.get(STATUS_CACHE_KEY)
+    if cached is not None:
+        return json.loads(cached)
+
+    with db.engine.connect() as conn:
+        row = conn.execute(_status_query()).first()
+    return _cache_row(row)
+
+
+async def get_status_async():
+    """get_status() for the ASGI event loop: cache misses read through the async engine"""
+    cached = cache.get(STATUS_CACHE_KEY)
+    if cached is not None:
+        return json.loads(cached)
+
+    async with async_db.connect() as conn:
+        row = (await conn.execute(_status_query())).first()
+    return _cache_row(row)
+
+
+def _status_query():
+    table = RestaurantSettings.__table__
+    return select(table.c.is_open, table.c.message, table.c.version).where(table.c.id == SETTINGS_ID)
+
+
+def _cache_row(row):
+    if row is None:
+        status = {'is_open': True, 'message': OPEN_MESSAGE, 'version': 0}
+    else:
+        status = {'is_open': bool(row.is_open), 'message': row.message, 'version': row.version}
+
+    _store(status)
+    return status
+
+
+def _load_settings_for_update():
+    settings = db.session.query(RestaurantSettings).with_for_update().filter_by(id=SETTINGS_ID).first()
+    if settings is None:
+        settings = RestaurantSettings(id=SETTINGS_ID, is_open=True, message=OPEN_MESSAGE, version=0)
+        db.session.add(settings)
+    return settings
+
+
+def _commit(settings):
+    """Bump the version, commit, refresh the cache and wake local streams"""
+    if inspect(settings).persistent:
+        settings.version = RestaurantSettings.version + 1
+    else:
+        # First write of a missing row: an INSERT cannot reference the row's own column
+        settings.version = 1
+    db.session.commit()
+
+    status = settings.to_dict()
+    _store(status)
+    with _status_changed:
+        _status_changed.notify_all()
+    for loop, changed in list(_async_waiters):
+        try:
+            loop.call_soon_threadsafe(changed.set)
+        except RuntimeError:
+            pass  # loop closed
+    return status
+
+
+def update_status(is_open=None, message=None):
+    """
+    Update the restaurant status
+
+    Args:
+        is_open: New open flag, or None to keep it
+        message: New status message, or None to keep it
+
+    Returns:
+        Updated status dictionary
+    """
+    settings = _load_settings_for_update()
+    if is_open is not None:
+        settings.is_open = bool(is_open)
+    if message is not None:
+        settings.message = message
+    return _commit(settings)
+
+
+def toggle_status():
+    """
+    Flip open/closed and reset the message to match
+
+    Returns:
+        Updated status dictionary
+    """
+    settings = _load_settings_for_update()
+    settings.is_open = not settings.is_open
+    settings.message = OPEN_MESSAGE if settings.is_open else CLOSED_MESSAGE
+    return _commit(settings)
+
+
+def to_public(status):
+    """Frontend (camelCase) representation of a status dictionary"""
+    return {
+        'isOpen': status['is_open'],
+        'message': status['message']
+    }
+
+
+def status_events(last_version=None):
+    """
+    Server-Sent Events stream of status changes
+
+    Sends the current status unless the client already has it
+    (Last-Event-ID), then one event per version change. Idle
+    connections get a comment heartbeat so proxies keep them open.
+
+    Args:
+        last_version: Version the client last received, if any
+
+    Yields:
+        SSE-formatted strings
+    """
+    poll_interval = current_app.config['SSE_POLL_INTERVAL']
+    heartbeat_interval = current_app.config['SSE_HEARTBEAT_INTERVAL']
+    last_sent = time.monotonic()
+
+    while True:
+        status = get_status()
+        if status['version'] != last_version:
+            last_version = status['version']
+            last_sent = time.monotonic()
+            yield f"id: {last_version}\nevent: status\ndata: {json.dumps(to_public(status))}\n\n"
+        elif time.monotonic() - last_sent >= heartbeat_interval:
+            last_sent = time.monotonic()
+            yield ': heartbeat\n\n'
+
+        with _status_changed:
+            _status_changed.wait(poll_interval)
+
+
+async def _poll_status(poll_interval):
+    """
+    Wake this loop's async streams when the version changes
+
+    One poller per event loop, instead of every stream re-reading the status
+    each poll interval; it picks up changes committed by other workers and
+    exits when the loop has no streams left.
+    """
+    loop = asyncio.get_running_loop()
+    last_version = None
+    try:
+        while True:
+            waiters = [changed for waiter_loop, changed in _async_waiters if waiter_loop is loop]
+            if not waiters:
+                return
+            status = await get_status_async()
+            if status['version'] != last_version:
+                last_version = status['version']
+                for changed in waiters:
+                    changed.set()
+            await asyncio.sleep(poll_interval)
+    finally:
+        _async_pollers.pop(loop, None)
+
+
+async def status_events_async(last_version=None):
+    """
+    Async generator version of status_events(), for ASGI: an idle stream
+    is a suspended coroutine woken by a change or its next heartbeat
+
+    Yields:
+        SSE-formatted strings
+    """
+    poll_interval = current_app.config['SSE_POLL_INTERVAL']
+    heartbeat_interval = current_app.config['SSE_HEARTBEAT_INTERVAL']
+    last_sent = time.monotonic()
+    loop = asyncio.get_running_loop()
+    waiter = (loop, asyncio.Event())
+    _async_waiters.add(waiter)
+    if loop not in _async_pollers:
+        _async_pollers[loop] = asyncio.create_task(_poll_status(poll_interval))
+
+    try:
+        while True:
+            waiter[1].clear()
+            status = await get_status_async()
+            if status['version'] != last_version:
+                last_version = status['version']
+                last_sent = time.monotonic()
+                yield f"id: {last_version}\nevent: status\ndata: {json.dumps(to_public(status))}\n\n"
+            elif time.monotonic() - last_sent >= heartbeat_interval:
+                last_sent = time.monotonic()
+                yield ': heartbeat\n\n'
+
+            try:
+                await asyncio.wait_for(waiter[1].wait(), max(last_sent + heartbeat_interval - time.monotonic(), 0))
+            except asyncio.TimeoutError:
+                pass
+    finally:
+        _async_waiters.discard(waiter)
@@ -0,0 +1,317 @@
+"""
+Sales analytics service module
+Maintains the daily sales rollups and answers date-range queries from them
+
+Rollups are keyed by the order's creation day and its current status.
+Order writes add their deltas inside the same transaction as the order
+change, so the rollups are exactly as consistent as the orders table.
+Status changes are conditional on the status they move from (see
+order_routes._change_status), so racing changes never apply the same
+delta twice.
+Revenue figures exclude cancelled orders.
+"""
+from collections import defaultdict
+from datetime import datetime, timedelta
+import click
+from flask.cli import AppGroup
+from sqlalchemy import delete, func, insert, select
+from extensions.db import db
+from models.analytics import DailyItemSales, DailyOrderSales
+from models.menu import MenuItem
+from models.order import Order, OrderItem
+
+EXCLUDED_STATUS = 'CANCELLED'
+DEFAULT_RANGE_DAYS = 30
+REBUILD_INSERT_BATCH = 1000
+
+
+def _add(model, counters, deltas):
+    """
+    Add deltas to rollup rows, creating missing rows (one upsert per key)
+
+    Args:
+        model: Rollup model
+        counters: Names of the additive columns
+        deltas: Dictionary of primary key tuple -> list of counter deltas
+    """
+    if not deltas:
+        return
+
+    table = model.__table__
+    keys = [column.name for column in table.primary_key.columns]
+    rows = [dict(zip(keys, key), **dict(zip(counters, values))) for key, values in deltas.items()]
+    dialect = db.session.get_bind().dialect.name
+
+    if dialect in ('sqlite', 'postgresql'):
+        if dialect == 'sqlite':
+            from sqlalchemy.dialects.sqlite import insert as dialect_insert
+        else:
+            from sqlalchemy.dialects.postgresql import insert as dialect_insert
+        statement = dialect_insert(table)
+        statement = statement.on_conflict_do_update(
+            index_elements=keys,
+            set_={name: table.c[name] + statement.excluded[name] for name in counters}
+        )
+        db.session.execute(statement, rows)
+        return
+
+    # Other databases: update, then insert the rows that did not exist
+    for row in rows:
+        updated = db.session.execute(
+            table.update()
+            .where(*(table.c[key] == row[key] for key in keys))
+            .values({name: table.c[name] + row[name] for name in counters})
+        ).rowcount
+        if not updated:
+            db.session.execute(table.insert().values(row))
+
+
+def _item_deltas(day, status, lines, sign):
+    deltas = defaultdict(lambda: [0, 0.0])
+    for menu_item_id, quantity, price in lines:
+        delta = deltas[(day, menu_item_id, status)]
+        delta[0] += sign * quantity
+        delta[1] += sign * quantity * price
+    return deltas
+
+
+def record_order_created(order, order_lines):
+    """
+    Add a new order to the rollups (call before the order's commit)
+
+    Args:
+        order: Flushed order (created_at populated)
+        order_lines: Lines returned by price_cart
+    """
+    record_orders_created([(order, order_lines)])
+
+
+def record_orders_created(entries):
+    """
+    Add a batch of new orders to the rollups with one upsert per table
+    (call before the orders' commit)
+
+    Args:
+        entries: List of (flushed order, lines returned by price_cart)
+    """
+    item_deltas = defaultdict(lambda: [0, 0.0])
+    order_deltas = defaultdict(lambda: [0, 0.0])
+    for order, order_lines in entries:
+        day = order.created_at.date()
+        lines = [(line['menu_item_id'], line['quantity'], line['price']) for line in order_lines]
+        for key, (quantity, revenue) in _item_deltas(day, order.status, lines, 1).items():
+            item_deltas[key][0] += quantity
+            item_deltas[key][1] += revenue
+        order_deltas[(day, order.status)][0] += 1
+        order_deltas[(day, order.status)][1] += order.total_amount
+
+    _add(DailyItemSales, ('quantity', 'revenue'), item_deltas)
+    _add(DailyOrderSales, ('orders', 'revenue'), order_deltas)
+
+
+def record_status_change(order, previous_status):
+    """
+    Move an order's figures from its previous status to its current one
+    (call in the status change's transaction, once its UPDATE has matched
+    the previous status)
+
+    Args:
+        order: Order with its items loaded and the new status set
+        previous_status: Status before the change
+    """
+    if order.status == previous_status:
+        return
+
+    day = order.created_at.date()
+    lines = [(item.menu_item_id, item.quantity, item.price) for item in order.items]
+
+    item_deltas = _item_deltas(day, previous_status, lines, -1)
+    item_deltas.update(_item_deltas(day, order.status, lines, 1))
+    _add(DailyItemSales, ('quantity', 'revenue'), item_deltas)
+    _add(DailyOrderSales, ('orders', 'revenue'), {
+        (day, previous_status): [-1, -order.total_amount],
+        (day, order.status): [1, order.total_amount],
+    })
+
+
+def default_range():
+    """Last DEFAULT_RANGE_DAYS days, today (UTC, like created_at) included"""
+    end = datetime.utcnow().date()
+    return end - timedelta(days=DEFAULT_RANGE_DAYS - 1), end
+
+
+def revenue_by_day(start, end):
+    """
+    Revenue, order count and average basket per day
+
+    Args:
+        start: First day (inclusive)
+        end: Last day (inclusive)
+
+    Returns:
+        List of dictionaries, oldest day first; days without orders are omitted
+    """
+    rows = db.session.execute(
+        select(DailyOrderSales.day, func.sum(DailyOrderSales.orders), func.sum(DailyOrderSales.revenue))
+        .where(DailyOrderSales.day.between(start, end), DailyOrderSales.status != EXCLUDED_STATUS)
+        .group_by(DailyOrderSales.day)
+        .order_by(DailyOrderSales.day)
+    )
+    return [
+        {
+            'date': day.isoformat(),
+            'orders': orders,
+            'revenue': round(revenue, 2),
+            'average_basket': round(revenue / orders, 2) if orders else 0.0
+        }
+        for day, orders, revenue in rows if orders
+    ]
+
+
+def top_items(start, end, limit=10, sort='quantity'):
+    """
+    Best-selling menu items in a date range
+
+    Args:
+        start: First day (inclusive)
+        end: Last day (inclusive)
+        limit: Number of items
+        sort: 'quantity' or 'revenue'
+
+    Returns:
+        List of dictionaries, best seller first
+    """
+    quantity = func.sum(DailyItemSales.quantity).label('quantity')
+    revenue = func.sum(DailyItemSales.revenue).label('revenue')
+    rows = db.session.execute(
+        select(DailyItemSales.menu_item_id, quantity, revenue)
+        .where(DailyItemSales.day.between(start, end), DailyItemSales.status != EXCLUDED_STATUS)
+        .group_by(DailyItemSales.menu_item_id)
+        .having(quantity > 0)
+        .order_by((revenue if sort == 'revenue' else quantity).desc(), DailyItemSales.menu_item_id)
+        .limit(limit)
+    ).all()
+
+    names = dict(db.session.execute(
+        select(MenuItem.id, MenuItem.name).where(MenuItem.id.in_([row.menu_item_id for row in rows]))
+    ).all())
+    return [
+        {
+            'menu_item_id': row.menu_item_id,
+            'name': names.get(row.menu_item_id, 'Unknown Item'),
+            'quantity': row.quantity,
+            'revenue': round(row.revenue, 2)
+        }
+        for row in rows
+    ]
+
+
+def summary(start, end):
+    """
+    Totals for a date range
+
+    Returns:
+        Dictionary with revenue, orders, average_basket and per-status order counts
+    """
+    rows = db.session.execute(
+        select(DailyOrderSales.status, func.sum(DailyOrderSales.orders), func.sum(DailyOrderSales.revenue))
+        .where(DailyOrderSales.day.between(start, end))
+        .group_by(DailyOrderSales.status)
+    ).all()
+
+    by_status = {status: orders for status, orders, _ in rows if orders}
+    orders = sum(count for status, count, _ in rows if status != EXCLUDED_STATUS)
+    revenue = sum(total for status, _, total in rows if status != EXCLUDED_STATUS)
+    return {
+        'from': start.isoformat(),
+        'to': end.isoformat(),
+        'orders': orders,
+        'revenue': round(revenue, 2),
+        'average_basket': round(revenue / orders, 2) if orders else 0.0,
+        'orders_by_status': by_status
+    }
+
+
+def rebuild(batch_size=500, echo=print):
+    """
+    Recompute both rollups from the order history
+
+    Orders are read in keyset batches, each on its own short read, and
+    aggregated in memory (bounded by days x menu items x statuses, not by
+    order count). The rollup tables are then replaced in one transaction.
+    Status changes committed while the history is being read are not
+    reflected, so run it while order traffic is quiet.
+
+    Args:
+        batch_size: Orders read per SELECT
+        echo: Progress output function
+
+    Returns:
+        Number of orders aggregated
+    """
+    items = defaultdict(lambda: [0, 0.0])
+    orders = defaultdict(lambda: [0, 0.0])
+    order_table = Order.__table__
+    item_table = OrderItem.__table__
+    last_id = 0
+    total = 0
+
+    while True:
+        with db.engine.connect() as conn:
+            batch = conn.execute(
+                select(order_table.c.id, order_table.c.created_at, order_table.c.status,
+                       order_table.c.total_amount)
+                .where(order_table.c.id > last_id)
+                .order_by(order_table.c.id)
+                .limit(batch_size)
+            ).all()
+            if not batch:
+                break
+            lines = conn.execute(
+                select(item_table.c.order_id, item_table.c.menu_item_id, item_table.c.quantity,
+                       item_table.c.price)
+                .where(item_table.c.order_id.in_([row.id for row in batch]))
+            ).all()
+
+        keys = {}
+        for order_id, created_at, status, total_amount in batch:
+            keys[order_id] = (created_at.date(), status)
+            entry = orders[keys[order_id]]
+            entry[0] += 1
+            entry[1] += total_amount
+        for order_id, menu_item_id, quantity, price in lines:
+            day, status = keys[order_id]
+            entry = items[(day, menu_item_id, status)]
+            entry[0] += quantity
+            entry[1] += quantity * price
+
+        total += len(batch)
+        last_id = batch[-1].id
+        echo(f'  … {total} orders read')
+
+    item_rows = [{'day': day, 'menu_item_id': menu_item_id, 'status': status, 'quantity': q, 'revenue': r}
+                 for (day, menu_item_id, status), (q, r) in items.items()]
+    order_rows = [{'day': day, 'status': status, 'orders': n, 'revenue': r}
+                  for (day, status), (n, r) in orders.items()]
+
+    with db.engine.begin() as conn:
+        conn.execute(delete(DailyItemSales.__table__))
+        conn.execute(delete(DailyOrderSales.__table__))
+        for start in range(0, len(item_rows), REBUILD_INSERT_BATCH):
+            conn.execute(insert(DailyItemSales.__table__), item_rows[start:start + REBUILD_INSERT_BATCH])
+        for start in range(0, len(order_rows), REBUILD_INSERT_BATCH):
+            conn.execute(insert(DailyOrderSales.__table__), order_rows[start:start + REBUILD_INSERT_BATCH])
+
+    echo(f'  ✓ rebuilt {len(order_rows)} daily order rows and {len(item_rows)} daily item rows')
+    return total
+
+
+analytics_cli = AppGroup('analytics', help='Sales analytics commands')
+
+
+@analytics_cli.command('backfill')
+@click.option('--batch-size', default=500, show_default=True, help='Orders read per batch')
+def backfill_command(batch_size):
+    """Rebuild the sales rollups from the order history"""
+    total = rebuild(batch_size, echo=click.echo)
+    click.echo(f'✓ Sales rollups rebuilt from {total} orders')
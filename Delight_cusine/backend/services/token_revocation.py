@@ -0,0 +1,321 @@
+"""
+Token revocation service module
+Revoked JWT store: rows in revoked_tokens, fronted in each worker by a bloom
+filter so that checking a token that is not revoked (almost every request)
+costs a few hashes and no I/O, plus single-use refresh tokens through
+refresh token families
+
+Each worker keeps a bloom filter of the jtis of every unexpired revoked token
+(app.extensions['token_revocation']). A jti the filter has never seen is not
+revoked. A filter hit is confirmed with a primary-key lookup, and the answer
+is cached. The filter learns revocations made by this worker immediately.
+A background thread per worker learns those made by other workers within
+TOKEN_REVOCATION_SYNC_INTERVAL seconds, by reading rows revoked since its
+previous sync. Filters cannot forget, so the same thread rebuilds it from the
+unexpired rows every REBUILD_INTERVAL (deleting expired rows) or when it grows
+past its capacity. Requests never sync or rebuild, except for the first one in
+a process, which builds the initial filter.
+
+Refresh tokens are rotated without writing a revocation per refresh. Each
+login starts a refresh_families row; its refresh tokens carry the family id
+('fam') and a generation ('gen'), and only the current generation can be
+exchanged (rotate()). A token from an older generation means it was used
+twice, so the whole family is revoked. Only logouts write revoked_tokens
+rows, so the filter grows with logouts, not with refresh traffic.
+"""
+import hashlib
+import math
+import os
+import threading
+import time
+import uuid
+from datetime import datetime, timedelta
+from flask import current_app
+from flask_jwt_extended import create_refresh_token
+from sqlalchemy import select
+from sqlalchemy.pool import StaticPool
+from extensions.cache import cache
+from extensions.db import db
+from models.token import RefreshFamily, RevokedToken
+
+CACHE_PREFIX = 'revoked'
+
+# Revocation state cached after a filter hit: revoked tokens for their
+# remaining lifetime, false positives for one sync interval
+REVOKED = b'1'
+NOT_REVOKED = b'0'
+
+# Each sync re-reads rows revoked up to this long before the previous sync
+# started, so a revocation committed just after that sync read is not missed
+SYNC_OVERLAP = timedelta(seconds=5)
+
+# How often each worker rebuilds its filter without the expired tokens (seconds)
+REBUILD_INTERVAL = 3600
+
+# A refresh token one generation old that was rotated this recently is a
+# concurrent refresh (e.g. two tabs) rather than a replay: it gets 401, but
+# the family survives (seconds)
+ROTATION_GRACE = 10
+
+
+class BloomFilter:
+    """Fixed-size bloom filter over strings (no removal)"""
+
+    def __init__(self, capacity, error_rate):
+        self.capacity = capacity
+        self.size = max(8, int(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self.count = 0
+        self._bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, value):
+        # Double hashing: k positions from the two halves of one 128-bit digest
+        digest = hashlib.blake2b(value.encode(), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], 'little')
+        h2 = int.from_bytes(digest[8:], 'little') | 1
+        return [(h1 + i * h2) % self.size for i in range(self.hashes)]
+
+    def add(self, value):
+        """Add a value; count only grows for values not already present"""
+        bits = self._bits
+        added = False
+        for position in self._positions(value):
+            mask = 1 << (position & 7)
+            if not bits[position >> 3] & mask:
+                bits[position >> 3] |= mask
+                added = True
+        self.count += added
+
+    def __contains__(self, value):
+        bits = self._bits
+        return all(bits[position >> 3] & (1 << (position & 7)) for position in self._positions(value))
+
+
+def _cache_key(jti):
+    return f'{CACHE_PREFIX}:{jti}'
+
+
+class RevocationStore:
+    """One worker's bloom filter of revoked jtis, kept in step with revoked_tokens"""
+
+    def __init__(self, capacity, error_rate, sync_interval):
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.sync_interval = sync_interval
+        self._filter = None
+        self._lock = threading.Lock()
+        self._pid = None
+        self.watermark = None
+        self.synced_at = 0.0
+        self.rebuilt_at = 0.0
+        self.lookups = 0
+
+    def rebuild(self):
+        """Delete expired rows and refill a fresh filter with the unexpired jtis"""
+        started = datetime.utcnow()
+        table = RevokedToken.__table__
+        families = RefreshFamily.__table__
+        with db.engine.begin() as connection:
+            connection.execute(table.delete().where(table.c.expires_at <= started))
+            connection.execute(families.delete().where(families.c.expires_at <= started))
+            jtis = connection.execute(select(table.c.jti).where(table.c.expires_at > started)).scalars().all()
+
+        capacity = self.capacity
+        while capacity < len(jtis) * 2:
+            capacity *= 2
+        bloom = BloomFilter(capacity, self.error_rate)
+        for jti in jtis:
+            bloom.add(jti)
+
+        self._filter = bloom
+        self.capacity = capacity
+        self.watermark = started - SYNC_OVERLAP
+        self.synced_at = self.rebuilt_at = time.monotonic()
+
+    def sync(self):
+        """Add rows revoked (by any worker) since the previous sync to the filter"""
+        started = datetime.utcnow()
+        table = RevokedToken.__table__
+        with db.engine.connect() as connection:
+            jtis = connection.execute(select(table.c.jti).where(table.c.revoked_at >= self.watermark)).scalars().all()
+        bloom = self._filter
+        for jti in jtis:
+            bloom.add(jti)
+        self.watermark = started - SYNC_OVERLAP
+        self.synced_at = time.monotonic()
+
+    def maintain(self):
+        """One background step: rebuild when due (or the filter is full), otherwise sync"""
+        with self._lock:
+            if time.monotonic() - self.rebuilt_at >= REBUILD_INTERVAL or self._filter.count >= self._filter.capacity:
+                self.rebuild()
+            else:
+                self.sync()
+
+    def _ensure_ready(self):
+        if self._filter is None or self._pid != os.getpid():
+            self._start()
+
+    def _start(self):
+        """Build the initial filter and start this process's syncer (first use per process)"""
+        app = current_app._get_current_object()
+        with self._lock:
+            if self._filter is None:
+                self.rebuild()
+            # A syncer inherited through fork is not running; start one per process
+            if self._pid == os.getpid():
+                return
+            self._pid = os.getpid()
+            # An in-memory database is one connection in one process: this process's revocations
+            # reach the filter directly, and a second thread must not share that connection
+            if not isinstance(db.engine.pool, StaticPool):
+                threading.Thread(target=self._run, args=(app,), name='token-revocation-sync', daemon=True).start()
+
+    def _run(self, app):
+        with app.app_context():
+            while True:
+                time.sleep(self.sync_interval)
+                try:
+                    self.maintain()
+                except Exception:
+                    app.logger.exception('Revoked token filter sync failed')
+
+    def add(self, jti):
+        """Record a revocation made by this worker"""
+        self._ensure_ready()
+        self._filter.add(jti)
+        cache.delete(_cache_key(jti))
+
+    def is_revoked(self, jti):
+        """
+        Whether a token has been revoked
+
+        Args:
+            jti: Token's unique identifier claim
+
+        Returns:
+            True if revoked_tokens holds the jti
+        """
+        self._ensure_ready()
+        if jti not in self._filter:
+            return False
+
+        state = cache.get(_cache_key(jti))
+        if state is None:
+            self.lookups += 1
+            row = db.session.get(RevokedToken, jti)
+            if row is None:
+                state = NOT_REVOKED
+                ttl = self.sync_interval
+            else:
+                state = REVOKED
+                ttl = max(int((row.expires_at - datetime.utcnow()).total_seconds()), 1)
+            cache.set(_cache_key(jti), state, ttl)
+        return state == REVOKED
+
+
+def get_store():
+    """The current app's revocation store (created on first use)"""
+    app = current_app._get_current_object()
+    store = app.extensions.get('token_revocation')
+    if store is None:
+        config = app.config
+        store = app.extensions.setdefault('token_revocation', RevocationStore(
+            config['TOKEN_REVOCATION_BLOOM_CAPACITY'],
+            config['TOKEN_REVOCATION_BLOOM_ERROR_RATE'],
+            config['TOKEN_REVOCATION_SYNC_INTERVAL']
+        ))
+    return store
+
+
+def is_revoked(jwt_payload):
+    """True if the decoded token has been revoked"""
+    if jwt_payload.get('fam') is not None:
+        return False  # checked against its family row by rotate()
+    return get_store().is_revoked(jwt_payload['jti'])
+
+
+def _family_token(user_id, family_id, generation):
+    return create_refresh_token(identity=user_id, additional_claims={'fam': family_id, 'gen': generation})
+
+
+def issue_refresh_token(user_id):
+    """
+    Start a refresh token family (a login) and return its first refresh token
+
+    Adds the family to the session; the caller commits.
+    """
+    now = datetime.utcnow()
+    family = RefreshFamily(id=str(uuid.uuid4()), user_id=int(user_id), generation=0, revoked=False,
+                           rotated_at=now, expires_at=now + current_app.config['JWT_REFRESH_TOKEN_EXPIRES'])
+    db.session.add(family)
+    return _family_token(user_id, family.id, 0)
+
+
+def rotate(jwt_payload):
+    """
+    Exchange a refresh token once for the next one in its family
+
+    The family's generation only advances if it still equals the token's,
+    so of two uses of one token exactly one succeeds. The caller commits;
+    tokens issued before families existed are made single-use with a
+    revoked_tokens row (a reuse fails that commit with IntegrityError).
+
+    Args:
+        jwt_payload: Decoded refresh token claims
+
+    Returns:
+        The new refresh token, or None if this one was already used or revoked
+    """
+    user_id = jwt_payload['sub']
+    family_id = jwt_payload.get('fam')
+    if family_id is None:
+        revoke(jwt_payload)
+        return issue_refresh_token(user_id)
+
+    now = datetime.utcnow()
+    table = RefreshFamily.__table__
+    generation = jwt_payload['gen']
+    rotated = db.session.execute(
+        table.update()
+        .where(table.c.id == family_id, table.c.generation == generation, table.c.revoked.is_(False))
+        .values(generation=generation + 1, rotated_at=now,
+                expires_at=now + current_app.config['JWT_REFRESH_TOKEN_EXPIRES'])
+    ).rowcount
+    if rotated == 1:
+        return _family_token(user_id, family_id, generation + 1)
+
+    family = db.session.get(RefreshFamily, family_id)
+    concurrent = family is not None and family.generation == generation + 1 \
+        and now - family.rotated_at < timedelta(seconds=ROTATION_GRACE)
+    if family is not None and not concurrent:
+        # An old token came back: it or its successor may be stolen, so end the login
+        family.revoked = True
+    return None
+
+
+def revoke(jwt_payload):
+    """
+    Revoke a decoded token until it expires
+
+    A refresh token ends its whole family. Any other token gets a
+    revoked_tokens row added to the session; it takes effect when the
+    caller commits (a second revocation of the same token fails at that
+    commit).
+
+    Args:
+        jwt_payload: Decoded token claims (jti, sub, type, exp)
+    """
+    if jwt_payload.get('fam') is not None:
+        table = RefreshFamily.__table__
+        db.session.execute(table.update().where(table.c.id == jwt_payload['fam']).values(revoked=True))
+        return
+
+    get_store().add(jwt_payload['jti'])
+    db.session.add(RevokedToken(
+        jti=jwt_payload['jti'],
+        user_id=int(jwt_payload['sub']),
+        token_type=jwt_payload['type'],
+        revoked_at=datetime.utcnow(),
+        expires_at=datetime.utcfromtimestamp(jwt_payload['exp'])
+    ))
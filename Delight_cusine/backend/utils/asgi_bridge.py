@@ -0,0 +1,154 @@
+"""
+ASGI bridge module
+Runs a WSGI application (the Flask app) under an ASGI server
+
+The request body is received and the response sent on the event loop; only
+the WSGI call itself runs on a bounded thread pool. Slow uploads, slow
+downloads and idle keep-alive connections therefore cost the server a
+coroutine, not a thread. Streaming responses (NDJSON listings, exports)
+hold their thread while they stream, with backpressure from the client.
+"""
+import asyncio
+import io
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+# Response chunks buffered between a streaming WSGI iterator and the client
+STREAM_BUFFER = 16
+
+
+def build_environ(scope, body):
+    """WSGI environ for an ASGI HTTP scope and its complete request body"""
+    server = scope.get('server') or ('localhost', 80)
+    client = scope.get('client') or ('', 0)
+    environ = {
+        'REQUEST_METHOD': scope['method'],
+        'SCRIPT_NAME': scope.get('root_path', '').encode().decode('latin-1'),
+        'PATH_INFO': scope['path'].encode().decode('latin-1'),
+        'QUERY_STRING': scope['query_string'].decode('latin-1'),
+        'SERVER_NAME': server[0],
+        'SERVER_PORT': str(server[1]),
+        'SERVER_PROTOCOL': f"HTTP/{scope['http_version']}",
+        'REMOTE_ADDR': client[0],
+        'REMOTE_PORT': str(client[1]),
+        'CONTENT_LENGTH': str(len(body)),
+        'wsgi.version': (1, 0),
+        'wsgi.url_scheme': scope.get('scheme', 'http'),
+        'wsgi.input': io.BytesIO(body),
+        'wsgi.errors': sys.stderr,
+        'wsgi.multithread': True,
+        'wsgi.multiprocess': True,
+        'wsgi.run_once': False,
+    }
+    for name, value in scope['headers']:
+        name = name.decode('latin-1').upper().replace('-', '_')
+        value = value.decode('latin-1')
+        if name == 'CONTENT_LENGTH':
+            continue
+        key = name if name == 'CONTENT_TYPE' else f'HTTP_{name}'
+        environ[key] = f'{environ[key]},{value}' if key in environ else value
+    return environ
+
+
+class ClientGone(Exception):
+    """Raised in the WSGI thread when the client disconnected mid-stream"""
+
+
+class WSGIBridge:
+    """ASGI application serving a WSGI application from a thread pool"""
+
+    def __init__(self, wsgi_app, threads, max_body_size):
+        self.wsgi_app = wsgi_app
+        self.max_body_size = max_body_size
+        self.executor = ThreadPoolExecutor(threads, thread_name_prefix='wsgi')
+
+    async def _read_body(self, receive):
+        body = bytearray()
+        while True:
+            message = await receive()
+            if message['type'] == 'http.disconnect':
+                return None
+            body += message.get('body', b'')
+            if len(body) > self.max_body_size:
+                return False
+            if not message.get('more_body'):
+                return bytes(body)
+
+    async def __call__(self, scope, receive, send):
+        body = await self._read_body(receive)
+        if body is None:
+            return
+        if body is False:
+            await send({'type': 'http.response.start', 'status': 413,
+                        'headers': [(b'content-type', b'application/json')]})
+            await send({'type': 'http.response.body',
+                        'body': b'{"error":"payload_too_large","message":"Request body is too large"}'})
+            return
+
+        loop = asyncio.get_running_loop()
+        messages = asyncio.Queue(STREAM_BUFFER)
+        gone = threading.Event()
+
+        def put(message):
+            # Blocks the WSGI thread while the client is slower than the response
+            if gone.is_set():
+                raise ClientGone
+            asyncio.run_coroutine_threadsafe(messages.put(message), loop).result()
+
+        def run():
+            started = []
+
+            def start_response(status, headers, exc_info=None):
+                started[:] = [int(status.split(' ', 1)[0]),
+                              [(name.lower().encode('latin-1'), value.encode('latin-1')) for name, value in headers]]
+
+            iterable = None
+            try:
+                iterable = self.wsgi_app(build_environ(scope, body), start_response)
+                sent_start = False
+                for chunk in iterable:
+                    if not sent_start:
+                        put({'type': 'http.response.start', 'status': started[0], 'headers': started[1]})
+                        sent_start = True
+                    if chunk:
+                        put({'type': 'http.response.body', 'body': chunk, 'more_body': True})
+                if not sent_start:
+                    put({'type': 'http.response.start', 'status': started[0], 'headers': started[1]})
+                put({'type': 'http.response.body', 'body': b''})
+            except ClientGone:
+                pass
+            finally:
+                if hasattr(iterable, 'close'):
+                    iterable.close()
+                asyncio.run_coroutine_threadsafe(messages.put(None), loop).result()
+
+        async def watch_disconnect():
+            while (await receive())['type'] != 'http.disconnect':
+                pass
+            gone.set()
+            # Wake a WSGI thread waiting on a full buffer and the sender loop
+            while not messages.empty():
+                messages.get_nowait()
+            messages.put_nowait(None)
+
+        worker = loop.run_in_executor(self.executor, run)
+        watcher = asyncio.create_task(watch_disconnect())
+        try:
+            while not gone.is_set():
+                message = await messages.get()
+                if message is None:
+                    break
+                await send(message)
+        finally:
+            watcher.cancel()
+            gone.set()
+            while not worker.done():
+                while not messages.empty():
+                    messages.get_nowait()
+                await asyncio.wait([worker], timeout=0.05)
+        # Re-raise an error from the WSGI thread to the server
+        worker.result()
+
+    def shutdown(self):
+        self.executor.shutdown(wait=False, cancel_futures=True)
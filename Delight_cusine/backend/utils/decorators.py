@@ -2,10 +2,30 @@
 Utility decorators module
 Role-based access control and other custom decorators
 """
+import hashlib
 from functools import wraps
-from flask import jsonify
-from flask_jwt_extended import get_jwt_identity
-from models.user import User
+from flask import g, jsonify, make_response, request
+from flask_jwt_extended import get_current_user, get_jwt, get_jwt_identity
+from extensions.rate_limit import limiter
+from services import idempotency
+
+def current_user_role():
+    """
+    Get the authenticated user's role without a database query
+
+    Reads the 'role' claim embedded at token creation. Tokens issued
+    before role claims existed fall back to the cached user lookup.
+    Must be called inside a @jwt_required() view.
+
+    Returns:
+        Role string, or None if the user no longer exists
+    """
+    role = get_jwt().get('role')
+    if role is None:
+        user = get_current_user()
+        role = user['role'] if user else None
+    return role
+
 
 def admin_required(fn):
     """
@@ -20,16 +40,15 @@ def admin_required(fn):
     """
     @wraps(fn)
     def wrapper(*args, **kwargs):
-        current_user_id = get_jwt_identity()
-        user = User.query.get(current_user_id)
+        role = current_user_role()
 
-        if not user:
+        if role is None:
             return jsonify({
                 'error': 'user_not_found',
                 'message': 'User not found'
             }), 404
 
-        if user.role != 'admin':
+        if role != 'admin':
             return jsonify({
                 'error': 'admin_required',
                 'message': 'Admin privileges required for this action'
@@ -40,6 +59,39 @@ def admin_required(fn):
     return wrapper
 
 
+def rate_limit(name, per_user=False):
+    """
+    Decorator applying a RATE_LIMITS rule; over the limit returns 429 with
+    Retry-After before the view (or any decorator below this one) runs
+
+    Place it above @validate_request_data so rejected requests are never
+    parsed. With per_user=True it must be used after @jwt_required(), and
+    the rule's 'user' scope is keyed by the JWT identity. The 'account'
+    scope needs the parsed body; views check it with
+    limiter.check_account().
+
+    Args:
+        name: Rule name in RATE_LIMITS
+        per_user: Also apply the rule's 'user' scope
+
+    Usage:
+        @rate_limit('login')
+        @validate_request_data(['email', 'password'])
+        def login():
+            pass
+    """
+    def decorator(fn):
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            rejected = limiter.check(name, get_jwt_identity() if per_user else None)
+            if rejected is not None:
+                return rejected
+            return fn(*args, **kwargs)
+
+        return wrapper
+    return decorator
+
+
 def validate_request_data(required_fields):
     """
     Decorator to validate request JSON data contains required fields
@@ -75,4 +127,92 @@ def validate_request_data(required_fields):
             return fn(*args, **kwargs)
 
         return wrapper
-    return decorator
\ No newline at end of file
+    return decorator
+
+
+def conditional_get(etag_source):
+    """
+    Decorator adding strong ETags and If-None-Match handling to a GET route
+
+    etag_source is called with the view's arguments and must cheaply
+    return values that change whenever the response body would. When
+    the client already holds the current ETag a bodiless 304 is returned
+    without calling the view.
+
+    Args:
+        etag_source: Callable returning a tuple of version values
+
+    Usage:
+        @conditional_get(lambda item_id: (item_id, menu_version()))
+        def get_item(item_id):
+            pass
+    """
+    def decorator(fn):
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            parts = (request.full_path,) + tuple(etag_source(*args, **kwargs))
+            etag = hashlib.sha1(repr(parts).encode()).hexdigest()
+
+            # Weak comparison: compressed responses carry the ETag as W/"..."
+            if request.if_none_match.contains_weak(etag):
+                response = make_response('', 304)
+                response.set_etag(etag, weak=not request.if_none_match.is_strong(etag))
+            else:
+                response = make_response(fn(*args, **kwargs))
+                if response.status_code != 200:
+                    return response
+                response.set_etag(etag)
+
+            response.headers['Cache-Control'] = 'no-cache'
+            return response
+
+        return wrapper
+    return decorator
+
+def idempotent(fn):
+    """
+    Decorator honouring an Idempotency-Key header on a write route
+    Must be used after @jwt_required(); keys are scoped to the user
+
+    Requests without the header run unchanged. With it, a retry of a
+    completed request gets the stored response (Idempotent-Replayed: true)
+    without running the view, and concurrent duplicates run one at a time.
+    The view stores its successful response with idempotency.remember()
+    before committing.
+
+    Usage:
+        @jwt_required()
+        @idempotent
+        def create_thing():
+            pass
+    """
+    @wraps(fn)
+    def wrapper(*args, **kwargs):
+        key = request.headers.get(idempotency.IDEMPOTENCY_HEADER)
+        if key is None:
+            return fn(*args, **kwargs)
+
+        try:
+            idempotency.validate_key(key)
+            user_id = get_jwt_identity()
+            request_hash = idempotency.fingerprint(request.get_json(silent=True))
+
+            with idempotency.coalesced(user_id, key):
+                replay = idempotency.lookup(user_id, key, request_hash)
+                if replay is not None:
+                    return replay
+
+                g.idempotency_claim = (user_id, key, request_hash)
+                response = make_response(fn(*args, **kwargs))
+
+                if response.status_code >= 500:
+                    # A duplicate handled by another worker may have taken the key first
+                    replay = idempotency.lookup(user_id, key, request_hash)
+                    if replay is not None:
+                        return replay
+                return response
+
+        except idempotency.IdempotencyError as e:
+            return jsonify(e.to_dict()), e.status_code
+
+    return wrapper
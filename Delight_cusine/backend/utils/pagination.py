@@ -0,0 +1,127 @@
+"""
+Pagination utilities module
+Keyset (cursor) pagination and NDJSON streaming for large listings
+"""
+import base64
+from datetime import datetime
+from flask import current_app
+from sqlalchemy import and_, or_
+from extensions.db import db
+
+
+def encode_cursor(created_at, row_id):
+    """
+    Encode a (created_at, id) position as an opaque URL-safe cursor
+
+    Args:
+        created_at: Timestamp of the last row on the page
+        row_id: Primary key of the last row on the page
+
+    Returns:
+        Cursor string
+    """
+    raw = f'{created_at.isoformat()}|{row_id}'.encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def decode_cursor(cursor):
+    """
+    Decode a cursor produced by encode_cursor
+
+    Args:
+        cursor: Cursor string from the client
+
+    Returns:
+        Tuple of (created_at, id)
+
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        created_at, row_id = base64.urlsafe_b64decode(padded.encode()).decode().split('|')
+        return datetime.fromisoformat(created_at), int(row_id)
+    except (TypeError, ValueError, UnicodeDecodeError) as e:
+        raise ValueError('Invalid cursor') from e
+
+
+def keyset_order(query, model):
+    """Order a query newest first with id as the tie-breaker"""
+    return query.order_by(model.created_at.desc(), model.id.desc())
+
+
+def keyset_after(query, model, cursor):
+    """
+    Restrict a newest-first query to rows strictly after the cursor
+
+    Args:
+        query: Query ordered with keyset_order
+        model: Model with created_at and id columns
+        cursor: Decoded (created_at, id) tuple, or None for the first page
+
+    Returns:
+        Filtered query
+    """
+    if cursor is None:
+        return query
+
+    created_at, row_id = cursor
+    return query.filter(or_(
+        model.created_at < created_at,
+        and_(model.created_at == created_at, model.id < row_id)
+    ))
+
+
+def fetch_page(query, model, limit, cursor=None):
+    """
+    Fetch one keyset page
+
+    Args:
+        query: Base (filtered) query
+        model: Model with created_at and id columns
+        limit: Maximum number of rows to return
+        cursor: Decoded cursor, or None for the first page
+
+    Returns:
+        Tuple of (rows, next cursor string or None)
+    """
+    rows = keyset_order(keyset_after(query, model, cursor), model).limit(limit + 1).all()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1].created_at, rows[-1].id)
+
+    return rows, next_cursor
+
+
+def stream_ndjson(query, model, serialize, batch_size):
+    """
+    Yield one JSON document per row, walking the query in keyset batches
+
+    Only one batch is held in memory at a time: the session is cleared
+    after each batch is written out.
+
+    Args:
+        query: Base (filtered) query
+        model: Model with created_at and id columns
+        serialize: Callable converting a row to a dictionary
+        batch_size: Rows fetched per SELECT
+
+    Yields:
+        Newline-terminated JSON strings
+    """
+    cursor = None
+    while True:
+        rows = keyset_order(keyset_after(query, model, cursor), model).limit(batch_size).all()
+        if not rows:
+            return
+
+        for row in rows:
+            yield current_app.json.dumps(serialize(row)) + '\n'
+
+        if len(rows) < batch_size:
+            return
+
+        cursor = (rows[-1].created_at, rows[-1].id)
+        db.session.expunge_all()
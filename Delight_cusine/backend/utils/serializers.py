@@ -0,0 +1,209 @@
+"""
+Serializers module
+Fast listing serialization: column tuples instead of ORM objects, encoded
+with orjson when it is installed
+
+Each serializer produces exactly what the model's to_dict() produces; the
+to_dict() methods stay the reference implementation for single objects.
+Listings and single objects accept a sparse fieldset (?fields=id,name,price)
+so clients receive only the fields they render.
+"""
+import time
+from flask import Response, current_app, request
+from extensions.db import db
+from extensions.instrumentation import instrumentation, record_serialization
+from models.menu import MenuItem
+from models.order import Order, OrderItem
+
+try:
+    import orjson
+except ImportError:  # optional dependency; fall back to the app's JSON provider
+    orjson = None
+
+MENU_ITEM_COLUMNS = (
+    MenuItem.id, MenuItem.name, MenuItem.description, MenuItem.price, MenuItem.category,
+    MenuItem.image_url, MenuItem.available, MenuItem.is_deleted, MenuItem.created_at, MenuItem.updated_at,
+)
+
+# Orders per item SELECT, as selectinload does: keeps the IN list on the index
+# and under SQLite's bound-parameter limit
+IN_BATCH_SIZE = 500
+
+ORDER_COLUMNS = (
+    Order.id, Order.user_id, Order.status, Order.total_amount, Order.delivery_address, Order.notes,
+    Order.order_mode, Order.payment_method, Order.created_at, Order.updated_at,
+)
+
+# Field names accepted by ?fields= (the keys of to_dict())
+MENU_ITEM_FIELDS = (
+    'id', 'name', 'description', 'price', 'category', 'image_url', 'available', 'is_deleted',
+    'created_at', 'updated_at',
+)
+ORDER_FIELDS = (
+    'id', 'user_id', 'status', 'total', 'delivery_address', 'notes', 'timestamp', 'orderMode',
+    'paymentMethod', 'created_at', 'updated_at', 'items',
+)
+
+
+def requested_fields(allowed):
+    """
+    Sparse fieldset from the fields query parameter (comma-separated)
+
+    Args:
+        allowed: Field names the endpoint serializes
+
+    Returns:
+        frozenset of field names, or None for every field
+
+    Raises:
+        ValueError: If a field is not in allowed
+    """
+    fields = frozenset(name.strip() for name in request.args.get('fields', '').split(',') if name.strip())
+    if not fields:
+        return None
+    unknown = fields.difference(allowed)
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(sorted(unknown))} (allowed: {', '.join(allowed)})")
+    return fields
+
+
+def select_fields(data, fields):
+    """Keep only the fields of a serialized object (all of them when fields is None)"""
+    if fields is None:
+        return data
+    return {name: value for name, value in data.items() if name in fields}
+
+
+def dumps(payload):
+    """
+    Encode a payload with the same options as jsonify (sorted keys,
+    indented in debug mode)
+
+    Args:
+        payload: JSON-serializable object
+
+    Returns:
+        UTF-8 encoded JSON bytes
+    """
+    provider = current_app.json
+    if orjson is None:
+        return provider.dumps(payload).encode()
+
+    option = orjson.OPT_SORT_KEYS if provider.sort_keys else 0
+    if provider.compact is False or (provider.compact is None and current_app.debug):
+        option |= orjson.OPT_INDENT_2
+
+    if not instrumentation.enabled:
+        return orjson.dumps(payload, option=option)
+    started = time.perf_counter()
+    body = orjson.dumps(payload, option=option)
+    record_serialization(time.perf_counter() - started)
+    return body
+
+
+def json_response(payload, status=200):
+    """Build a JSON response with dumps() (drop-in for jsonify(payload), status)"""
+    return Response(dumps(payload), status=status, mimetype='application/json')
+
+
+def menu_items(query, fields=None):
+    """
+    Serialize a MenuItem query as MenuItem.to_dict() would
+
+    Args:
+        query: Filtered MenuItem query
+        fields: Sparse fieldset (see requested_fields), None for every field
+
+    Returns:
+        List of dictionaries
+    """
+    items = [
+        {
+            'id': item_id,
+            'name': name,
+            'description': description,
+            'price': price,
+            'category': category,
+            'image_url': image_url,
+            'available': available,
+            'is_deleted': is_deleted,
+            'created_at': created_at.isoformat(),
+            'updated_at': updated_at.isoformat()
+        }
+        for (item_id, name, description, price, category, image_url,
+             available, is_deleted, created_at, updated_at) in query.with_entities(*MENU_ITEM_COLUMNS)
+    ]
+    if fields is None:
+        return items
+    return [select_fields(item, fields) for item in items]
+
+
+def _order_item_rows(order_ids):
+    """Item rows with menu item names, one SELECT per IN_BATCH_SIZE orders"""
+    for start in range(0, len(order_ids), IN_BATCH_SIZE):
+        yield from db.session.query(
+            OrderItem.id, OrderItem.order_id, OrderItem.quantity, OrderItem.menu_item_id,
+            OrderItem.price, MenuItem.name
+        ).outerjoin(MenuItem, MenuItem.id == OrderItem.menu_item_id).filter(
+            OrderItem.order_id.in_(order_ids[start:start + IN_BATCH_SIZE])
+        )
+
+
+def _order_items(order_ids):
+    """Items of many orders grouped by order, in id order"""
+    items = {order_id: [] for order_id in order_ids}
+
+    # Sorted here: ORDER BY id would make SQLite walk the whole table by rowid
+    for item_id, order_id, quantity, menu_item_id, price, name in sorted(_order_item_rows(order_ids)):
+        items[order_id].append({
+            'id': str(item_id),
+            'order_id': order_id,
+            'quantity': quantity,
+            'menuItem': {
+                'id': menu_item_id,
+                'name': name if name is not None else 'Unknown Item',
+                'price': price
+            }
+        })
+    return items
+
+
+def orders(rows, fields=None):
+    """
+    Serialize Order column rows as Order.to_dict() would, items included
+
+    Args:
+        rows: Result rows of a query selecting ORDER_COLUMNS
+        fields: Sparse fieldset (see requested_fields), None for every field;
+            without 'items' the item queries are skipped
+
+    Returns:
+        List of dictionaries
+    """
+    order_ids = [row[0] for row in rows]
+    if fields is not None and 'items' not in fields:
+        items = dict.fromkeys(order_ids)  # placeholders, dropped by select_fields
+    else:
+        items = _order_items(order_ids)
+
+    serialized = [
+        {
+            'id': str(order_id),
+            'user_id': user_id,
+            'status': status,
+            'total': total_amount,
+            'delivery_address': delivery_address,
+            'notes': notes,
+            'timestamp': created_at.strftime('%Y-%m-%d %H:%M'),
+            'orderMode': order_mode,
+            'paymentMethod': payment_method,
+            'created_at': created_at.isoformat(),
+            'updated_at': updated_at.isoformat(),
+            'items': items[order_id]
+        }
+        for (order_id, user_id, status, total_amount, delivery_address, notes,
+             order_mode, payment_method, created_at, updated_at) in rows
+    ]
+    if fields is None:
+        return serialized
+    return [select_fields(order, fields) for order in serialized]
@@ -1,5 +1,6 @@
-import React, { useState } from 'react';
+import React, { useEffect, useState } from 'react';
 import { MenuItem } from '../types';
+import { db } from '../db';
 
 interface MenuPageProps {
   items: MenuItem[];
@@ -12,6 +13,26 @@ interface MenuPageProps {
 const MenuPage: React.FC<MenuPageProps> = ({ items, onAddToCart, isClosed, isLoggedIn, onPromptLogin }) => {
   const [searchTerm, setSearchTerm] = useState('');
   const [selectedCategory, setSelectedCategory] = useState('ALL');
+  // Ranked item IDs from the search API; null falls back to local substring matching
+  const [rankedIds, setRankedIds] = useState<string[] | null>(null);
+
+  useEffect(() => {
+    const query = searchTerm.trim();
+    if (!query) {
+      setRankedIds(null);
+      return;
+    }
+    let cancelled = false;
+    const timer = setTimeout(() => {
+      db.searchMenu(query)
+        .then(ids => { if (!cancelled) setRankedIds(ids); })
+        .catch(() => { if (!cancelled) setRankedIds(null); });
+    }, 150);
+    return () => {
+      cancelled = true;
+      clearTimeout(timer);
+    };
+  }, [searchTerm]);
 
   // Extract unique categories and capitalize them properly
   const uniqueCategories = Array.from(new Set(items.map(item => item.category?.toLowerCase() || 'other')));
@@ -35,9 +56,15 @@ const MenuPage: React.FC<MenuPageProps> = ({ items, onAddToCart, isClosed, isLog
     return isClosed || !item.available;
   };
 
-  // Filter items based on search and category
-  const filteredItems = items.filter(item => {
-    const matchesSearch = item.name.toLowerCase().includes(searchTerm.toLowerCase()) ||
+  // Filter items based on search and category (in search rank order when available)
+  const itemsById = new Map(items.map(item => [item.id, item]));
+  const searchedItems = rankedIds && searchTerm.trim()
+    ? rankedIds.map(id => itemsById.get(id)).filter((item): item is MenuItem => !!item)
+    : null;
+
+  const filteredItems = (searchedItems || items).filter(item => {
+    const matchesSearch = searchedItems !== null ||
+      item.name.toLowerCase().includes(searchTerm.toLowerCase()) ||
       item.description.toLowerCase().includes(searchTerm.toLowerCase());
     const matchesCategory = selectedCategory === 'ALL' ||
       item.category?.toLowerCase() === selectedCategory.toLowerCase();
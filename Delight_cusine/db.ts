@@ -31,6 +31,22 @@ export function getAuthToken(): string | null {
   return authToken;
 }
 
+// Ensure order, item and menu item IDs are strings
+function normalizeOrder(order: any): Order {
+  return {
+    ...order,
+    id: String(order.id),
+    items: order.items?.map((item: any) => ({
+      ...item,
+      id: String(item.id),
+      menuItem: {
+        ...item.menuItem,
+        id: String(item.menuItem?.id || item.menu_item_id)
+      }
+    })) || []
+  };
+}
+
 // Helper to handle camelCase to snake_case conversion
 function toSnakeCase(obj: any): any {
   if (Array.isArray(obj)) {
@@ -218,6 +234,12 @@ export const db = {
     }
   },
 
+  // Ranked full-text search; returns matching item IDs, best match first
+  async searchMenu(query: string): Promise<string[]> {
+    const data = await apiCall(`/menu/search?q=${encodeURIComponent(query)}&limit=50`);
+    return (data.results || []).map((item: any) => String(item.id));
+  },
+
   async addMenuItem(item: Omit<MenuItem, 'id'>): Promise<void> {
     try {
       await apiCall('/menu', {
@@ -309,22 +331,7 @@ export const db = {
       }
 
       // Ensure all IDs are strings
-      const withStringIds = Array.isArray(ordersArray)
-        ? ordersArray.map((order: any) => ({
-          ...order,
-          id: String(order.id),
-          items: order.items?.map((item: any) => ({
-            ...item,
-            id: String(item.id),
-            menuItem: {
-              ...item.menuItem,
-              id: String(item.menuItem?.id || item.menu_item_id)
-            }
-          })) || []
-        }))
-        : [];
-
-      return withStringIds;
+      return Array.isArray(ordersArray) ? ordersArray.map(normalizeOrder) : [];
     } catch (error) {
       console.error('Failed to fetch orders:', error);
       return [];
@@ -344,10 +351,20 @@ export const db = {
         payment_method: order.paymentMethod || order.payment_method || 'Cash on Delivery',
       };
 
-      await apiCall('/orders', {
-        method: 'POST',
-        body: JSON.stringify(orderData),
-      });
+      // Network failures are retried with the same key, so the server places the order once
+      const idempotencyKey = crypto.randomUUID();
+      for (let attempt = 1; ; attempt++) {
+        try {
+          await apiCall('/orders', {
+            method: 'POST',
+            headers: { 'Idempotency-Key': idempotencyKey },
+            body: JSON.stringify(orderData),
+          });
+          return;
+        } catch (error) {
+          if (!(error instanceof TypeError) || attempt >= 3) throw error;
+        }
+      }
     } catch (error) {
       console.error('Failed to save order:', error);
       throw error;
@@ -366,6 +383,74 @@ export const db = {
     }
   },
 
+  // Live order changes via Server-Sent Events: customers get their own orders,
+  // admins every order. EventSource cannot send headers, so each connection
+  // authenticates with a short-lived ticket in the URL rather than the access token.
+  // A stream the server closes (e.g. a browser reconnect whose ticket has expired)
+  // is reopened with a fresh ticket, resuming after the last event received.
+  subscribeOrders(handlers: {
+    onCreated: (order: Order) => void;
+    onStatus: (orderId: string, status: OrderStatus) => void;
+    onReset: () => void;
+  }): () => void {
+    let source: EventSource | null = null;
+    let retryTimer: ReturnType<typeof setTimeout> | undefined;
+    let lastEventId = '';
+    let failures = 0;
+    let closed = false;
+
+    const reconnect = () => {
+      source?.close();
+      source = null;
+      if (closed) return;
+      failures += 1;
+      retryTimer = setTimeout(connect, Math.min(30000, 1000 * 2 ** failures));
+    };
+
+    const track = (event: Event) => {
+      lastEventId = (event as MessageEvent).lastEventId || lastEventId;
+      return JSON.parse((event as MessageEvent).data);
+    };
+
+    const connect = async () => {
+      let ticket: string;
+      try {
+        ticket = (await apiCall('/orders/events/ticket', { method: 'POST' })).ticket;
+      } catch (error) {
+        console.error('Failed to get an order events ticket:', error);
+        reconnect();
+        return;
+      }
+      if (closed) return;
+
+      const resume = lastEventId ? `&last_event_id=${encodeURIComponent(lastEventId)}` : '';
+      source = new EventSource(`${API_BASE_URL}/orders/events?jwt=${encodeURIComponent(ticket)}${resume}`);
+      source.onopen = () => { failures = 0; };
+      source.onerror = () => {
+        // The browser retries dropped connections itself; a closed stream needs a new ticket
+        if (source?.readyState === EventSource.CLOSED) reconnect();
+      };
+      source.addEventListener('created', (event) => {
+        handlers.onCreated(normalizeOrder(track(event).order));
+      });
+      source.addEventListener('status', (event) => {
+        const data = track(event);
+        handlers.onStatus(String(data.id), data.status);
+      });
+      source.addEventListener('reset', (event) => {
+        lastEventId = (event as MessageEvent).lastEventId || lastEventId;
+        handlers.onReset();
+      });
+    };
+
+    connect();
+    return () => {
+      closed = true;
+      clearTimeout(retryTimer);
+      source?.close();
+    };
+  },
+
   // Restaurant status operations
   async getRestaurantStatus(): Promise<any> {
     try {
@@ -381,6 +466,32 @@ export const db = {
     }
   },
 
+  // Whether the server holds Server-Sent Event streams cheaply (asgi.py or threaded workers).
+  // Under sync workers every open stream pins a worker, so the app polls instead.
+  async supportsLiveUpdates(): Promise<boolean> {
+    try {
+      const data = await apiCall('/health');
+      return data.sse === true;
+    } catch (error) {
+      console.error('Failed to fetch server health:', error);
+      return false;
+    }
+  },
+
+  // Live restaurant status via Server-Sent Events (only when supportsLiveUpdates())
+  subscribeRestaurantStatus(onChange: (status: RestaurantStatus) => void): () => void {
+    const source = new EventSource(`${API_BASE_URL}/restaurant/status/stream`);
+    source.addEventListener('status', (event) => {
+      const data = JSON.parse((event as MessageEvent).data);
+      console.log('Restaurant status event:', data);
+      onChange({
+        isOpen: data.isOpen ?? true,
+        message: data.message || ''
+      });
+    });
+    return () => source.close();
+  },
+
   async saveRestaurantStatus(status: any): Promise<void> {
     try {
       console.log('Saving restaurant status:', status);